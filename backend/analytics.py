@@ -0,0 +1,269 @@
+"""
+Lead analytics for the SYNERGY INDIA admin panel
+
+Keeps a columnar (pandas) snapshot of the leads table in memory and answers
+the reporting queries with vectorized group-bys over that snapshot, so the
+dashboard charts cost one incremental fetch instead of one query per chart.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+
+# Columns needed for reporting - the message/contact fields stay in the database
+SNAPSHOT_COLUMNS = ["id", "service_interested", "project_type", "status", "created_at", "updated_at"]
+
+# Lead pipeline stages in funnel order (matches the admin panel status filter)
+LEAD_STATUSES = ["New", "In Progress", "Closed"]
+
+# pandas offset aliases for the supported time buckets
+BUCKET_FREQUENCIES = {
+    "day": "D",
+    "week": "W-MON",
+    "month": "MS",
+}
+
+PAGE_SIZE = 1000  # PostgREST default max rows per request
+
+# How far behind the high-water mark an incremental refresh re-reads. A row
+# can land with an updated_at older than the newest one already seen (the
+# lead journal inserts with the submission time, app servers' clocks drift),
+# and would otherwise never be picked up before the next full reload.
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+
+def _empty_frame():
+    frame = pd.DataFrame({column: pd.Series(dtype="object") for column in SNAPSHOT_COLUMNS})
+    frame["created_at"] = pd.to_datetime(frame["created_at"], utc=True)
+    frame["updated_at"] = pd.to_datetime(frame["updated_at"], utc=True)
+    return frame
+
+
+def _to_frame(rows: List[Dict[str, Any]]):
+    """Convert raw lead rows into a typed snapshot frame"""
+    if not rows:
+        return _empty_frame()
+
+    frame = pd.DataFrame.from_records(rows, columns=SNAPSHOT_COLUMNS)
+    frame["created_at"] = pd.to_datetime(frame["created_at"], utc=True, format="ISO8601")
+    frame["updated_at"] = pd.to_datetime(frame["updated_at"], utc=True, format="ISO8601")
+    for column in ("service_interested", "project_type", "status"):
+        frame[column] = frame[column].fillna("Unknown").astype(str)
+    return frame
+
+
+class LeadSnapshot:
+    """In-memory columnar copy of the leads table with incremental refresh.
+
+    The first refresh loads every lead. Later refreshes only fetch rows whose
+    ``updated_at`` is at or past the high-water mark less ``overlap`` and merge
+    them by ``id`` (in a worker thread, like the fetch). Deletes are not
+    visible to an ``updated_at`` scan, so callers report them through
+    ``discard``; a periodic full reload catches anything missed.
+
+    ``archive_loader`` returns the leads already tiered out to cold storage.
+    Archived rows never change, so they are only re-read on a full reload.
+    """
+
+    def __init__(self, repository_getter, archive_loader=None, min_refresh_interval: float = 5.0,
+                 full_reload_interval: float = 900.0, overlap: timedelta = REFRESH_OVERLAP):
+        self._repository_getter = repository_getter
+        self._archive_loader = archive_loader
+        self.min_refresh_interval = min_refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.overlap = overlap
+        self._hot = None
+        self._archived = None
+        self._frame = None
+        self._high_water: Optional[str] = None
+        self._last_refresh = 0.0
+        self._last_full_reload = 0.0
+        # Leads discarded while a refresh is merging, dropped again from its result
+        self._discarded: set = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._frame is not None
+
+    @property
+    def refreshed_at(self) -> Optional[datetime]:
+        if not self._last_refresh:
+            return None
+        return datetime.fromtimestamp(self._last_refresh, tz=timezone.utc)
+
+    def _fetch_since(self, high_water: Optional[str]) -> List[Dict[str, Any]]:
+        """Page through leads changed at or after ``high_water`` less the overlap (all leads when None)"""
+        repository = self._repository_getter()
+        where = []
+        if high_water:
+            since = pd.Timestamp(high_water).to_pydatetime() - self.overlap
+            where = [('updated_at', 'gte', since.isoformat())]
+        rows: List[Dict[str, Any]] = []
+        after = None
+        while True:
+            # Keyset pages, as backup.py: an offset rescans the skipped rows and
+            # drifts when a row's updated_at moves past the page being read
+            page = repository.select(
+                'leads', where, order=[('updated_at', False), ('id', False)],
+                limit=PAGE_SIZE, columns=SNAPSHOT_COLUMNS, after=after
+            )
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            after = (page[-1]['updated_at'], page[-1]['id'])
+
+    def _load_archived(self):
+        if self._archive_loader is None:
+            return None
+        archived = self._archive_loader()
+        if archived is None or archived.empty:
+            return None
+        return archived[SNAPSHOT_COLUMNS]
+
+    def _merge(self, rows: List[Dict[str, Any]], full: bool, hot, archived):
+        """The new hot and combined frames (pure, so it can run off the event loop)"""
+        changed = _to_frame(rows)
+        if full or hot is None:
+            hot = changed
+        elif not changed.empty:
+            hot = pd.concat([hot, changed], ignore_index=True)
+            # Re-read rows (the overlap window) replace the copy already held
+            hot = hot.drop_duplicates(subset="id", keep="last").reset_index(drop=True)
+        return hot, _combine(archived, hot)
+
+    async def refresh(self, force: bool = False):
+        """Bring the snapshot up to date, at most once per ``min_refresh_interval``.
+
+        Returns True when the database was queried, False when the snapshot
+        was fresh enough to serve as is.
+        """
+        async with self._lock:
+            now = time.monotonic()
+            if not force and self.loaded and now - self._last_refresh < self.min_refresh_interval:
+                return False
+
+            full = force or not self.loaded or now - self._last_full_reload >= self.full_reload_interval
+            high_water = None if full else self._high_water
+            self._discarded = set()
+            rows = await asyncio.to_thread(self._fetch_since, high_water)
+            archived = await asyncio.to_thread(self._load_archived) if full else self._archived
+            hot, frame = await asyncio.to_thread(self._merge, rows, full, self._hot, archived)
+            self._archived, self._hot, self._frame = archived, hot, frame
+            if self._discarded:
+                self._drop(self._discarded)
+            if rows:
+                # Rows are ordered by updated_at, so the last one carries the new mark
+                self._high_water = rows[-1]["updated_at"]
+
+            self._last_refresh = now
+            if full:
+                self._last_full_reload = now
+            return True
+
+    def _drop(self, lead_ids):
+        self._hot = self._hot[~self._hot["id"].isin(lead_ids)]
+        self._frame = _combine(self._archived, self._hot)
+
+    def discard(self, lead_id: str):
+        """Drop a deleted lead from the snapshot"""
+        self._discarded.add(lead_id)
+        if self._hot is not None:
+            self._drop({lead_id})
+
+    def invalidate(self):
+        """Force the next refresh to reload the whole table"""
+        self._last_full_reload = 0.0
+        self._last_refresh = 0.0
+
+    def frame(self):
+        return self._frame if self._frame is not None else _empty_frame()
+
+
+def _combine(archived, hot):
+    if archived is None:
+        return hot
+    # A row can briefly exist in both tiers mid-archive; the hot copy wins
+    frame = pd.concat([archived, hot], ignore_index=True)
+    return frame.drop_duplicates(subset="id", keep="last").reset_index(drop=True)
+
+
+def _window(frame, start: Optional[datetime], end: Optional[datetime]):
+    if start is not None:
+        frame = frame[frame["created_at"] >= _as_utc(start)]
+    if end is not None:
+        frame = frame[frame["created_at"] < _as_utc(end)]
+    return frame
+
+
+def _as_utc(value: datetime):
+    stamp = pd.Timestamp(value)
+    return stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp.tz_convert("UTC")
+
+
+def time_buckets(frame, bucket: str = "day") -> List[Dict[str, Any]]:
+    """Lead counts per day/week/month by creation time"""
+    if frame.empty:
+        return []
+    # Label each bucket by its first instant (weeks start on Monday)
+    grouper = pd.Grouper(key="created_at", freq=BUCKET_FREQUENCIES[bucket], closed="left", label="left")
+    counts = frame.groupby(grouper).size()
+    return [
+        {"period": period.to_pydatetime(), "count": int(count)}
+        for period, count in counts.items()
+    ]
+
+
+def status_funnel(frame) -> List[Dict[str, Any]]:
+    """Per-status counts with the share of leads that reached each stage"""
+    counts = frame["status"].value_counts()
+    total = int(len(frame))
+
+    stages = list(LEAD_STATUSES) + sorted(set(counts.index) - set(LEAD_STATUSES))
+    funnel = []
+    reached = int(counts.reindex(LEAD_STATUSES, fill_value=0).sum())
+    previous_reached = None
+    for stage in stages:
+        count = int(counts.get(stage, 0))
+        in_pipeline = stage in LEAD_STATUSES
+        entry = {
+            "status": stage,
+            "count": count,
+            "share": round(count / total, 4) if total else 0.0,
+            "reached": reached if in_pipeline else count,
+            "conversion": None,
+        }
+        if in_pipeline:
+            if previous_reached is not None:
+                entry["conversion"] = round(reached / previous_reached, 4) if previous_reached else 0.0
+            previous_reached = reached
+            reached -= count
+        funnel.append(entry)
+    return funnel
+
+
+def service_project_breakdown(frame) -> List[Dict[str, Any]]:
+    """Lead counts for every service_interested x project_type pair"""
+    if frame.empty:
+        return []
+    grouped = frame.groupby(["service_interested", "project_type"], sort=True).size()
+    return [
+        {"service_interested": service, "project_type": project_type, "count": int(count)}
+        for (service, project_type), count in grouped.items()
+    ]
+
+
+def summarize(frame, bucket: str = "day", start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, Any]:
+    """Run every report over one filtered view of the snapshot"""
+    frame = _window(frame, start, end)
+    return {
+        "total_leads": int(len(frame)),
+        "bucket": bucket,
+        "time_series": time_buckets(frame, bucket),
+        "status_funnel": status_funnel(frame),
+        "service_project_breakdown": service_project_breakdown(frame),
+    }
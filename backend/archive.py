@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Cold-storage tiering for SYNERGY INDIA
+Moves leads and login history older than N days out of the hot tables into
+zstd-compressed Parquet files partitioned by year/month. The CSV export and
+lead analytics read these files alongside the hot table.
+
+Every file is uploaded to the private bucket (storage.private_from_env())
+before its rows are deleted; ARCHIVE_DIR is only a local cache of it, filled
+in again on read by whichever instance needs it. Without a private bucket the
+job refuses to run unless PERSISTENT_DISK says ARCHIVE_DIR survives deploys.
+
+Usage: python archive.py --days 180
+"""
+
+import argparse
+import functools
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import storage
+
+ROOT_DIR = Path(__file__).parent
+ARCHIVE_DIR = Path(os.environ.get('ARCHIVE_DIR', ROOT_DIR / 'archive'))
+
+BATCH_SIZE = 1000
+DELETE_CHUNK = 200  # ids per delete request, keeps the PostgREST URL short
+# Object path prefix in the private bucket
+STORAGE_PREFIX = "archive"
+
+# Archivable tables: the column that ages a row, the column that tells two
+# copies of a row apart (newest wins), and the Parquet schema
+ARCHIVE_TABLES: Dict[str, Dict[str, Any]] = {
+    "leads": {
+        "time_column": "created_at",
+        "version_column": "updated_at",
+        "schema": pa.schema([
+            ("id", pa.string()),
+            ("name", pa.string()),
+            ("phone", pa.string()),
+            ("email", pa.string()),
+            ("service_interested", pa.string()),
+            ("project_type", pa.string()),
+            ("message", pa.string()),
+            ("status", pa.string()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+            ("updated_at", pa.timestamp("us", tz="UTC")),
+        ]),
+    },
+    "login_history": {
+        "time_column": "login_time",
+        "version_column": None,
+        "schema": pa.schema([
+            ("id", pa.string()),
+            ("username", pa.string()),
+            ("ip_address", pa.string()),
+            ("user_agent", pa.string()),
+            ("login_time", pa.timestamp("us", tz="UTC")),
+            ("success", pa.bool_()),
+        ]),
+    },
+}
+
+
+def _parse_time(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00").replace(" ", "T", 1))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _table_path(table: str, archive_dir: Optional[Path] = None) -> Path:
+    return Path(archive_dir or ARCHIVE_DIR) / table
+
+
+def write_partitioned(table: str, rows: List[Dict[str, Any]], archive_dir: Optional[Path] = None,
+                      store: Optional[storage.BlockingStorage] = None) -> List[Path]:
+    """Write rows into year=/month= partitions (and upload them to ``store``); returns the files written"""
+    spec = ARCHIVE_TABLES[table]
+    schema = spec["schema"]
+    time_column = spec["time_column"]
+
+    partitions: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        stamp = _parse_time(row[time_column])
+        partitions.setdefault((stamp.year, stamp.month), []).append(row)
+
+    written = []
+    for (year, month), part_rows in sorted(partitions.items()):
+        columns = {}
+        for field in schema:
+            values = [row.get(field.name) for row in part_rows]
+            if pa.types.is_timestamp(field.type):
+                values = [_parse_time(value) for value in values]
+            elif pa.types.is_string(field.type):
+                values = [None if value is None else str(value) for value in values]
+            columns[field.name] = values
+
+        directory = _table_path(table, archive_dir) / f"year={year}" / f"month={month:02d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f"part-{uuid.uuid4().hex}.parquet"
+        tmp = directory / f".{target.name}.tmp"  # dot-prefixed files are skipped by readers
+
+        pq.write_table(pa.table(columns, schema=schema), tmp, compression="zstd")
+        with open(tmp, "rb+") as handle:
+            os.fsync(handle.fileno())
+        os.replace(tmp, target)  # readers never see a half-written file
+        if store is not None:
+            store.upload(_object_path(target, archive_dir), target)
+        written.append(target)
+    return written
+
+
+def _object_path(local: Path, archive_dir: Optional[Path] = None) -> str:
+    return f"{STORAGE_PREFIX}/{local.relative_to(Path(archive_dir or ARCHIVE_DIR)).as_posix()}"
+
+
+def pull(table: str, store: Optional[storage.BlockingStorage], archive_dir: Optional[Path] = None) -> int:
+    """Download the table's archive files this instance doesn't have yet; returns how many"""
+    if store is None:
+        return 0
+    root = Path(archive_dir or ARCHIVE_DIR)
+    fetched = 0
+    for info in store.list(f"{STORAGE_PREFIX}/{table}"):
+        local = root / info.path[len(STORAGE_PREFIX) + 1:]
+        if not local.exists():
+            store.download(info.path, local)
+            fetched += 1
+    return fetched
+
+
+def archive_table(repository, table: str, older_than_days: int, archive_dir: Optional[Path] = None,
+                  store: Optional[storage.BlockingStorage] = None) -> int:
+    """Move rows older than the cutoff from the hot table into Parquet.
+
+    Each batch is written and fsynced to a Parquet file, and uploaded to
+    ``store``, before its rows are deleted, so a crash can at worst leave a
+    row in both tiers (readers de-duplicate by id), never in neither.
+    """
+    storage.require_durable(store, "Archives")
+    time_column = ARCHIVE_TABLES[table]["time_column"]
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+
+    moved = 0
+    while True:
+        rows = repository.select(
+            table, [(time_column, 'lt', cutoff)],
+            order=[(time_column, False), ('id', False)], limit=BATCH_SIZE
+        )
+        if not rows:
+            return moved
+
+        write_partitioned(table, rows, archive_dir, store)
+
+        ids = [row["id"] for row in rows]
+        for start in range(0, len(ids), DELETE_CHUNK):
+            repository.delete(table, [('id', 'in', ids[start:start + DELETE_CHUNK])])
+        moved += len(rows)
+
+
+def archive_all(repository, older_than_days: int, archive_dir: Optional[Path] = None,
+                store: Optional[storage.BlockingStorage] = None) -> Dict[str, int]:
+    """Run the tiering job over every archivable table"""
+    storage.require_durable(store, "Archives")
+    return {
+        table: archive_table(repository, table, older_than_days, archive_dir, store)
+        for table in ARCHIVE_TABLES
+    }
+
+
+def _dataset(table: str, archive_dir: Optional[Path] = None):
+    path = _table_path(table, archive_dir)
+    if not path.exists() or not any(path.rglob("*.parquet")):
+        return None
+    return ds.dataset(
+        path,
+        format="parquet",
+        partitioning="hive",
+        schema=ARCHIVE_TABLES[table]["schema"],
+    )
+
+
+def _latest(table: str, data: pa.Table) -> pa.Table:
+    """One row per id: a batch archived twice (a retry after a failed delete) leaves two copies"""
+    version_column = ARCHIVE_TABLES[table]["version_column"]
+    keys = [("id", "ascending")] + ([(version_column, "descending")] if version_column else [])
+    data = data.sort_by(keys)
+    ids = data.column("id").to_pylist()
+    return data.take([index for index, row_id in enumerate(ids) if index == 0 or row_id != ids[index - 1]])
+
+
+def read_frame(table: str, columns: Optional[List[str]] = None, archive_dir: Optional[Path] = None,
+               store: Optional[storage.BlockingStorage] = None):
+    """Archived rows as a pandas DataFrame (None when nothing is archived)"""
+    pull(table, store, archive_dir)
+    dataset = _dataset(table, archive_dir)
+    if dataset is None:
+        return None
+    if columns is None:
+        return _latest(table, dataset.to_table()).to_pandas()
+    version_column = ARCHIVE_TABLES[table]["version_column"]
+    needed = list(dict.fromkeys(columns + ["id"] + ([version_column] if version_column else [])))
+    return _latest(table, dataset.to_table(columns=needed)).select(columns).to_pandas()
+
+
+def read_rows(table: str, archive_dir: Optional[Path] = None,
+              store: Optional[storage.BlockingStorage] = None) -> List[Dict[str, Any]]:
+    """Archived rows as dicts shaped like PostgREST rows, newest first"""
+    pull(table, store, archive_dir)
+    dataset = _dataset(table, archive_dir)
+    if dataset is None:
+        return []
+
+    time_column = ARCHIVE_TABLES[table]["time_column"]
+    rows = _latest(table, dataset.to_table()).sort_by([(time_column, "descending")]).to_pylist()
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, datetime):
+                row[key] = value.isoformat()
+    return rows
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    import repository
+
+    load_dotenv(ROOT_DIR / '.env')
+
+    parser = argparse.ArgumentParser(description="Archive old leads and login history to Parquet")
+    parser.add_argument("--days", type=int, default=int(os.environ.get('ARCHIVE_AFTER_DAYS', 180)),
+                        help="archive rows older than this many days")
+    parser.add_argument("--archive-dir", type=Path, default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    private = storage.private_from_env(functools.cache(repository.supabase_from_env))
+    store = storage.BlockingStorage(private) if private else None
+    print("🗄️  Archiving rows older than", args.days, "days into", args.archive_dir)
+    for table, moved in archive_all(repository.from_env(repository.supabase_from_env), args.days,
+                                    args.archive_dir, store).items():
+        print(f"✅ {table}: moved {moved} rows")
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Incremental backup and restore for SYNERGY INDIA
+Streams every table to gzip-compressed NDJSON chunks using keyset pagination
+and records a manifest with per-table high-water marks. Incremental runs only
+copy rows changed since the previous backup; restore replays the chain of
+backups with parallel bulk upserts.
+
+Chunks and manifests are uploaded to the private bucket
+(storage.private_from_env()); BACKUP_DIR is a local working copy. Without a
+bucket, backups only run when PERSISTENT_DISK says BACKUP_DIR survives
+deploys.
+
+One backup or restore runs at a time across all workers: the job holds an
+flock on BACKUP_DIR/.jobs/lock, and its progress is kept in
+BACKUP_DIR/.jobs/<job_id>.json for any worker to report.
+
+Usage:
+    python backup.py backup [--full]
+    python backup.py restore <backup_id>
+    python backup.py list
+"""
+
+import argparse
+import fcntl
+import functools
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import storage
+
+
+ROOT_DIR = Path(__file__).parent
+BACKUP_DIR = Path(os.environ.get('BACKUP_DIR', ROOT_DIR / 'backups'))
+
+PAGE_SIZE = 1000       # rows per PostgREST request
+CHUNK_ROWS = 10000     # rows per NDJSON chunk file
+UPSERT_BATCH = 500     # rows per bulk upsert on restore
+RESTORE_WORKERS = 4
+# Object path prefix in the private bucket
+STORAGE_PREFIX = "backups"
+# Incremental runs start this far before the previous high-water mark. A row
+# can commit with a timestamp older than rows already copied (app servers'
+# clocks drift, a transaction stamps updated_at before it commits); re-copying
+# a few minutes is harmless since restore upserts.
+INCREMENTAL_OVERLAP = timedelta(minutes=10)
+# Lowest id, to start a keyset page at a timestamp (the tables' ids are uuids)
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+# Seconds between writes of a running job's progress file
+PROGRESS_INTERVAL = 0.5
+
+# Every table and the column that moves forward when a row changes.
+# Tables without one are small and copied in full on every run.
+BACKUP_TABLES: Dict[str, Optional[str]] = {
+    "admin_users": None,
+    "services": "updated_at",
+    "gallery": "updated_at",
+    "leads": "updated_at",
+    "contact_form_settings": "updated_at",
+    "cta_settings": "updated_at",
+    "general_settings": "updated_at",
+    "login_history": "login_time",
+    "status_checks": "timestamp",
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _backup_path(backup_id: str, backup_dir: Optional[Path] = None) -> Path:
+    return Path(backup_dir or BACKUP_DIR) / backup_id
+
+
+def _manifest_key(backup_id: str) -> str:
+    return f"{STORAGE_PREFIX}/manifests/{backup_id}.json"
+
+
+def _chunk_key(backup_id: str, table: str, chunk: str) -> str:
+    return f"{STORAGE_PREFIX}/{backup_id}/{table}/{chunk}"
+
+
+def _write_local(path: Path, content: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(content)
+    os.replace(tmp, path)
+
+
+def load_manifest(backup_id: str, backup_dir: Optional[Path] = None,
+                  store: Optional[storage.BlockingStorage] = None) -> Optional[Dict[str, Any]]:
+    path = _backup_path(backup_id, backup_dir) / "manifest.json"
+    local = json.loads(path.read_text()) if path.exists() else None
+    # A finished backup never changes, so the local copy is as good as the bucket's
+    if store is None or (local and local["status"] != "running"):
+        return local
+    try:
+        content = store.read(_manifest_key(backup_id))
+    except storage.ObjectNotFound:
+        return local
+    _write_local(path, content.decode())
+    return json.loads(content)
+
+
+def _write_manifest(manifest: Dict[str, Any], backup_dir: Optional[Path] = None,
+                    store: Optional[storage.BlockingStorage] = None):
+    content = json.dumps(manifest, indent=2)
+    _write_local(_backup_path(manifest["backup_id"], backup_dir) / "manifest.json", content)
+    if store is not None:
+        store.put(_manifest_key(manifest["backup_id"]), content.encode())
+
+
+def list_backups(backup_dir: Optional[Path] = None,
+                 store: Optional[storage.BlockingStorage] = None) -> List[Dict[str, Any]]:
+    """Manifests of every backup, oldest first"""
+    root = Path(backup_dir or BACKUP_DIR)
+    if store is not None:
+        backup_ids = [Path(info.path).stem for info in store.list(f"{STORAGE_PREFIX}/manifests")]
+    elif root.exists():
+        backup_ids = [path.name for path in root.iterdir() if path.is_dir() and not path.name.startswith(".")]
+    else:
+        return []
+    manifests = [load_manifest(backup_id, root, store) for backup_id in backup_ids]
+    return sorted((m for m in manifests if m), key=lambda m: m["started_at"])
+
+
+def latest_completed(backup_dir: Optional[Path] = None,
+                     store: Optional[storage.BlockingStorage] = None) -> Optional[Dict[str, Any]]:
+    completed = [m for m in list_backups(backup_dir, store) if m["status"] == "completed"]
+    return completed[-1] if completed else None
+
+
+# ---------------------------------------------------------------- job state
+
+def _jobs_dir(backup_dir: Optional[Path] = None) -> Path:
+    return Path(backup_dir or BACKUP_DIR) / ".jobs"
+
+
+def lock_jobs(backup_dir: Optional[Path] = None) -> Optional[int]:
+    """Take the one-job-at-a-time lock; returns its fd (close it to release), None if a job holds it"""
+    directory = _jobs_dir(backup_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    fd = os.open(directory / "lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def unlock_jobs(fd: int):
+    os.close(fd)
+
+
+class JobStatus(dict):
+    """Progress of a backup or restore job, mirrored to a file any worker can read.
+
+    Status changes are written at once, counters at most every
+    PROGRESS_INTERVAL seconds; save() writes whatever is pending.
+    """
+
+    def __init__(self, job_id: str, backup_dir: Optional[Path] = None, **fields):
+        super().__init__(job_id=job_id, **fields)
+        self.path = _jobs_dir(backup_dir) / f"{job_id}.json"
+        self._saved_at = 0.0
+        self.save()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed(key == "status")
+
+    def update(self, *args, **kwargs):
+        fields = dict(*args, **kwargs)
+        super().update(fields)
+        self._changed("status" in fields)
+
+    def _changed(self, urgent: bool):
+        if urgent or time.monotonic() - self._saved_at >= PROGRESS_INTERVAL:
+            self.save()
+
+    def save(self):
+        self._saved_at = time.monotonic()
+        _write_local(self.path, json.dumps(dict(self), default=str))
+
+
+def load_job(job_id: str, backup_dir: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """A job's last saved progress; a job whose worker died shows as failed"""
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return None
+    path = _jobs_dir(backup_dir) / f"{job_id}.json"
+    if not path.exists():
+        return None
+    job = json.loads(path.read_text())
+    if job["status"] in ("queued", "running"):
+        fd = lock_jobs(backup_dir)
+        if fd is not None:
+            # Nobody holds the lock, so the job can't still be running
+            unlock_jobs(fd)
+            job.update({"status": "failed", "error": "Interrupted: the worker running it exited"})
+    return job
+
+
+def _fetch_page(repository, table: str, cursor_column: Optional[str], after: Optional[Dict[str, str]]):
+    """One keyset page ordered by (cursor_column, id), strictly after ``after``"""
+    order = [(cursor_column, False), ('id', False)] if cursor_column else [('id', False)]
+    position = (after["value"], after["id"]) if after else None
+    return repository.select(table, order=order, limit=PAGE_SIZE, after=position)
+
+
+class _ChunkWriter:
+    """Rolls gzip NDJSON chunk files every CHUNK_ROWS rows"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.chunks: List[str] = []
+        self._handle = None
+        self._rows_in_chunk = 0
+
+    def write(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            if self._handle is None or self._rows_in_chunk >= CHUNK_ROWS:
+                self._roll()
+            self._handle.write(json.dumps(row, default=str).encode() + b"\n")
+            self._rows_in_chunk += 1
+
+    def _roll(self):
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"chunk-{len(self.chunks):05d}.ndjson.gz"
+        self._handle = gzip.open(self.directory / name, "wb", compresslevel=6)
+        self._rows_in_chunk = 0
+        self.chunks.append(name)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def _rewind(mark: Dict[str, str]) -> Dict[str, str]:
+    """Keyset position INCREMENTAL_OVERLAP before a high-water mark"""
+    try:
+        stamp = datetime.fromisoformat(str(mark["value"]).replace("Z", "+00:00"))
+    except ValueError:
+        return mark
+    # Every id sorts after the nil UUID, so rows stamped exactly then are
+    # included; "" would too, but Postgres can't compare it with a uuid column
+    return {"value": (stamp - INCREMENTAL_OVERLAP).isoformat(), "id": NIL_UUID}
+
+
+def run_backup(repository, full: bool = False, backup_id: Optional[str] = None,
+               progress: Optional[Dict[str, Any]] = None, backup_dir: Optional[Path] = None,
+               store: Optional[storage.BlockingStorage] = None) -> Dict[str, Any]:
+    """Back up every table; incremental against the last completed backup unless ``full``"""
+    storage.require_durable(store, "Backups")
+    backup_id = backup_id or str(uuid.uuid4())
+    progress = progress if progress is not None else {}
+    base = None if full else latest_completed(backup_dir, store)
+
+    manifest = {
+        "backup_id": backup_id,
+        "kind": "incremental" if base else "full",
+        "base_backup_id": base["backup_id"] if base else None,
+        "status": "running",
+        "started_at": _now(),
+        "completed_at": None,
+        "tables": {},
+    }
+    _write_manifest(manifest, backup_dir, store)
+    progress.update({"status": "running", "tables_total": len(BACKUP_TABLES), "tables_done": 0, "rows": 0})
+
+    try:
+        for table, cursor_column in BACKUP_TABLES.items():
+            progress["current_table"] = table
+            previous = base["tables"].get(table, {}).get("high_water") if base and cursor_column else None
+            after = _rewind(previous) if previous else None
+            high_water = previous
+            writer = _ChunkWriter(_backup_path(backup_id, backup_dir) / table)
+            rows_copied = 0
+            try:
+                while True:
+                    rows = _fetch_page(repository, table, cursor_column, after)
+                    if not rows:
+                        break
+                    writer.write(rows)
+                    rows_copied += len(rows)
+                    progress["rows"] += len(rows)
+                    last = rows[-1]
+                    after = high_water = {"value": last[cursor_column] if cursor_column else last["id"], "id": last["id"]}
+                    if len(rows) < PAGE_SIZE:
+                        break
+            finally:
+                writer.close()
+            # Uploaded before the manifest that lists them
+            if store is not None:
+                for chunk in writer.chunks:
+                    store.upload(_chunk_key(backup_id, table, chunk), writer.directory / chunk)
+
+            manifest["tables"][table] = {
+                "cursor_column": cursor_column,
+                "rows": rows_copied,
+                "chunks": writer.chunks,
+                # Carry the old mark forward when nothing changed
+                "high_water": high_water if cursor_column else None,
+            }
+            progress["tables_done"] += 1
+            _write_manifest(manifest, backup_dir, store)
+
+        manifest["status"] = "completed"
+    except Exception as e:
+        manifest["status"] = "failed"
+        manifest["error"] = str(e)
+        raise
+    finally:
+        manifest["completed_at"] = _now()
+        _write_manifest(manifest, backup_dir, store)
+        progress.update({"status": manifest["status"], "current_table": None})
+
+    return manifest
+
+
+def backup_chain(backup_id: str, backup_dir: Optional[Path] = None,
+                 store: Optional[storage.BlockingStorage] = None) -> List[Dict[str, Any]]:
+    """The full backup and every incremental up to ``backup_id``, oldest first"""
+    chain = []
+    manifest = load_manifest(backup_id, backup_dir, store)
+    while manifest:
+        if manifest["status"] != "completed":
+            raise ValueError(f"Backup {manifest['backup_id']} is {manifest['status']}")
+        chain.append(manifest)
+        base_id = manifest.get("base_backup_id")
+        manifest = load_manifest(base_id, backup_dir, store) if base_id else None
+    if not chain:
+        raise FileNotFoundError(f"Backup {backup_id} not found")
+    return list(reversed(chain))
+
+
+def _read_chunk(path: Path) -> List[Dict[str, Any]]:
+    with gzip.open(path, "rb") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _restore_chunk(repository, table: str, path: Path) -> int:
+    rows = _read_chunk(path)
+    for start in range(0, len(rows), UPSERT_BATCH):
+        repository.upsert(table, rows[start:start + UPSERT_BATCH])
+    return len(rows)
+
+
+def run_restore(repository, backup_id: str, progress: Optional[Dict[str, Any]] = None,
+                backup_dir: Optional[Path] = None, workers: int = RESTORE_WORKERS,
+                store: Optional[storage.BlockingStorage] = None) -> Dict[str, int]:
+    """Replay a backup chain into the database with parallel bulk upserts.
+
+    Chunks of one backup are restored concurrently; backups in the chain are
+    applied in order so newer row versions overwrite older ones. Rows deleted
+    since the full backup are not removed.
+    """
+    progress = progress if progress is not None else {}
+    chain = backup_chain(backup_id, backup_dir, store)
+    jobs_total = sum(len(t["chunks"]) for m in chain for t in m["tables"].values())
+    progress.update({"status": "running", "chunks_total": jobs_total, "chunks_done": 0, "rows": 0})
+
+    restored: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def restore_one(backup: str, table: str, chunk: str):
+        path = _backup_path(backup, backup_dir) / table / chunk
+        if store is not None and not path.exists():
+            store.download(_chunk_key(backup, table, chunk), path)
+        count = _restore_chunk(repository, table, path)
+        with lock:
+            restored[table] = restored.get(table, 0) + count
+            progress["chunks_done"] += 1
+            progress["rows"] += count
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for manifest in chain:
+                futures = [
+                    pool.submit(restore_one, manifest["backup_id"], table, chunk)
+                    for table, info in manifest["tables"].items()
+                    for chunk in info["chunks"]
+                ]
+                for future in futures:
+                    future.result()
+        progress["status"] = "completed"
+    except Exception as e:
+        progress.update({"status": "failed", "error": str(e)})
+        raise
+    return restored
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    import repository
+
+    load_dotenv(ROOT_DIR / '.env')
+
+    parser = argparse.ArgumentParser(description="Back up or restore the SYNERGY INDIA database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backup_parser = commands.add_parser("backup")
+    backup_parser.add_argument("--full", action="store_true", help="ignore previous backups")
+    restore_parser = commands.add_parser("restore")
+    restore_parser.add_argument("backup_id")
+    commands.add_parser("list")
+    args = parser.parse_args()
+
+    private = storage.private_from_env(functools.cache(repository.supabase_from_env))
+    store = storage.BlockingStorage(private) if private else None
+    if args.command == "list":
+        for manifest in list_backups(store=store):
+            rows = sum(t["rows"] for t in manifest["tables"].values())
+            print(f"{manifest['backup_id']}  {manifest['kind']:<11}  {manifest['status']:<9}  {manifest['started_at']}  {rows} rows")
+    else:
+        database = repository.from_env(repository.supabase_from_env)
+        if args.command == "backup":
+            manifest = run_backup(database, full=args.full, store=store)
+            print(f"✅ {manifest['kind'].capitalize()} backup {manifest['backup_id']} completed")
+        else:
+            restored = run_restore(database, args.backup_id, store=store)
+            print(f"✅ Restored {sum(restored.values())} rows from backup chain ending at {args.backup_id}")
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Query-plan check for the SYNERGY INDIA indexes
+Builds the Supabase schema in a scratch Postgres schema, fills it with
+synthetic data (1M leads and 1M login history rows by default), applies the
+versioned migrations in migrations/ and runs EXPLAIN (ANALYZE, BUFFERS) on
+every hot query the API and the background jobs send. Each query must be
+served by the index it was built for; the run exits non-zero if one isn't.
+
+The SQL is what PostgREST sends for the server's repository calls, with the
+``is_active = true`` that RLS adds to anonymous reads written out (the harness
+connects as the table owner, which RLS doesn't apply to). Needs psycopg and a
+local Postgres; nothing outside the scratch schema is touched.
+
+Usage:
+    python explain_indexes.py --dsn postgresql://localhost/postgres
+    python explain_indexes.py --rows 200000 --json plans.json
+    python explain_indexes.py --skip-load        # re-check the last run's data
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+import schema_migrations
+
+ROOT_DIR = Path(__file__).parent
+SCHEMA = "synergy_explain"
+
+# A year of leads mostly dealt with: the status filter picks out a minority
+STATUS_MIX = {"New": 0.05, "In Progress": 0.1, "Closed": 0.85}
+
+
+class HotQuery(NamedTuple):
+    name: str
+    sql: str
+    index: str
+
+
+# Parameters come from positions()
+HOT_QUERIES = [
+    HotQuery("login: admin by username",
+             "SELECT * FROM admin_users WHERE username = %(username)s LIMIT 1",
+             "admin_users_username_key"),
+    HotQuery("leads list by status",
+             "SELECT * FROM leads WHERE status = 'New' ORDER BY created_at DESC",
+             "idx_leads_status_created_at"),
+    HotQuery("dashboard: recent leads",
+             "SELECT * FROM leads ORDER BY created_at DESC LIMIT 5",
+             "idx_leads_created_at_id"),
+    HotQuery("dashboard: today's enquiries",
+             "SELECT count(*) FROM leads WHERE created_at >= %(today)s",
+             "idx_leads_created_at_id"),
+    HotQuery("analytics: leads changed since refresh",
+             "SELECT id, service_interested, project_type, status, created_at, updated_at FROM leads "
+             "WHERE updated_at >= %(refreshed)s ORDER BY updated_at, id LIMIT 1000 OFFSET 0",
+             "idx_leads_updated_at_id"),
+    HotQuery("backup: leads keyset page",
+             "SELECT * FROM leads WHERE (updated_at > %(lead_after)s "
+             "OR (updated_at = %(lead_after)s AND id > %(lead_after_id)s)) ORDER BY updated_at, id LIMIT 1000",
+             "idx_leads_updated_at_id"),
+    HotQuery("archive: oldest leads",
+             "SELECT * FROM leads WHERE created_at < %(cutoff)s ORDER BY created_at, id LIMIT 1000",
+             "idx_leads_created_at_id"),
+    HotQuery("security: login history",
+             "SELECT * FROM login_history ORDER BY login_time DESC LIMIT 100",
+             "idx_login_history_login_time_id"),
+    HotQuery("archive: oldest login history",
+             "SELECT * FROM login_history WHERE login_time < %(cutoff)s ORDER BY login_time, id LIMIT 1000",
+             "idx_login_history_login_time_id"),
+    HotQuery("public: gallery",
+             'SELECT * FROM gallery WHERE is_active = true ORDER BY "order"',
+             "idx_gallery_active_order"),
+    HotQuery("backup: status checks since last run",
+             'SELECT * FROM status_checks WHERE ("timestamp" > %(check_after)s '
+             'OR ("timestamp" = %(check_after)s AND id > %(check_after_id)s)) ORDER BY "timestamp", id LIMIT 1000',
+             "idx_status_checks_timestamp_brin"),
+]
+
+
+def _connect(dsn: str):
+    return schema_migrations.connect(dsn, options=f"-c search_path={SCHEMA},public")
+
+
+def load(dsn: str, rows: int, seed: int):
+    """Fresh scratch schema with the tables, synthetic rows and migrations"""
+    import psycopg
+    import synthetic_data
+
+    with schema_migrations.connect(dsn) as connection:
+        connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        connection.execute(f"CREATE SCHEMA {SCHEMA}")
+        connection.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp" SCHEMA public')
+
+    with _connect(dsn) as connection:
+        for statement in schema_migrations.statements((ROOT_DIR / "supabase_schema.sql").read_text()):
+            # Supabase-only: the storage bucket and its policies
+            if "storage." in statement or statement.upper().startswith("CREATE EXTENSION"):
+                continue
+            connection.execute(statement)
+
+        # The login lookup only uses the index once there is more than a page of users
+        connection.execute("""
+            INSERT INTO admin_users (username, hashed_password)
+            SELECT 'user' || n, md5(n::text) FROM generate_series(1, %s) AS n
+        """, (max(rows // 100, 1000),))
+        # status_checks is append-only: rows arrive in timestamp order
+        connection.execute("""
+            INSERT INTO status_checks (client_name, "timestamp")
+            SELECT 'probe-' || (n %% 50), NOW() - (%s - n) * INTERVAL '30 seconds'
+            FROM generate_series(1, %s) AS n
+        """, (rows, rows))
+
+    generator = synthetic_data.Generator(synthetic_data.GeneratorConfig(
+        seed=seed, leads=rows, login_history=rows, gallery=max(rows // 50, 1000), status_mix=STATUS_MIX
+    ))
+    synthetic_data.write_postgres(generator, psycopg.conninfo.make_conninfo(dsn, options=f"-c search_path={SCHEMA},public"))
+
+    with _connect(dsn) as connection:
+        schema_migrations.migrate(connection)
+        for table in ("admin_users", "leads", "login_history", "gallery", "status_checks"):
+            # VACUUM sets the visibility map, so index-only scans are possible
+            connection.execute(f"VACUUM ANALYZE {table}")
+
+
+def positions(connection) -> Dict[str, Any]:
+    """Parameters that put each query where the app would: near the newest rows"""
+    newest_lead, = connection.execute("SELECT max(created_at) FROM leads").fetchone()
+    lead_after, lead_after_id = connection.execute(
+        "SELECT updated_at, id FROM leads ORDER BY updated_at DESC, id DESC OFFSET 5000 LIMIT 1").fetchone()
+    check_after, check_after_id = connection.execute(
+        'SELECT "timestamp", id FROM status_checks ORDER BY "timestamp" DESC OFFSET 5000 LIMIT 1').fetchone()
+    return {
+        "username": "admin",
+        "today": newest_lead.replace(hour=0, minute=0, second=0, microsecond=0),
+        "refreshed": newest_lead - timedelta(hours=1),
+        "cutoff": newest_lead - timedelta(days=180),
+        "lead_after": lead_after,
+        "lead_after_id": lead_after_id,
+        "check_after": check_after,
+        "check_after_id": check_after_id,
+    }
+
+
+def _nodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def explain(connection, query: HotQuery, params: Dict[str, Any]) -> Dict[str, Any]:
+    import psycopg
+
+    # Literals inlined client-side, like PostgREST's one-shot statements get planned
+    with psycopg.ClientCursor(connection) as cursor:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query.sql, params)
+        result = cursor.fetchone()[0][0]
+    nodes = list(_nodes(result["Plan"]))
+    indexes = sorted({node["Index Name"] for node in nodes if "Index Name" in node})
+    seq_scans = sorted({node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"})
+    top = result["Plan"]
+    return {
+        "query": query.name,
+        "expected_index": query.index,
+        "indexes": indexes,
+        "seq_scans": seq_scans,
+        "ok": query.index in indexes and not seq_scans,
+        "rows": top.get("Actual Rows"),
+        "execution_ms": round(result["Execution Time"], 3),
+        "planning_ms": round(result["Planning Time"], 3),
+        "shared_hit": top.get("Shared Hit Blocks", 0),
+        "shared_read": top.get("Shared Read Blocks", 0),
+        "plan": result["Plan"],
+    }
+
+
+def run(dsn: str) -> List[Dict[str, Any]]:
+    with _connect(dsn) as connection:
+        params = positions(connection)
+        return [explain(connection, query, params) for query in HOT_QUERIES]
+
+
+def print_report(results: List[Dict[str, Any]]):
+    print(f"\n{'query':<42}{'index':<36}{'rows':>8}{'ms':>10}{'hit':>8}{'read':>8}")
+    for result in results:
+        used = ", ".join(result["indexes"]) or "-"
+        mark = "✅" if result["ok"] else "❌"
+        print(f"{mark} {result['query']:<40}{used:<36}{result['rows']:>8}{result['execution_ms']:>10.2f}"
+              f"{result['shared_hit']:>8}{result['shared_read']:>8}")
+        if not result["ok"]:
+            extra = f" (seq scan on {', '.join(result['seq_scans'])})" if result["seq_scans"] else ""
+            print(f"   expected {result['expected_index']}{extra}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Check that every hot query is served by its index")
+    parser.add_argument("--dsn", default=os.environ.get('DATABASE_URL'), help="local Postgres connection string")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="leads, login history and status checks rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-load", action="store_true", help=f"reuse the data already in schema {SCHEMA}")
+    parser.add_argument("--json", type=Path, help="write the results (with full plans) here")
+    args = parser.parse_args(argv)
+    if not args.dsn:
+        raise SystemExit("❌ --dsn (or DATABASE_URL) is required")
+
+    if not args.skip_load:
+        print(f"🏗️  Loading {args.rows} rows per table into schema {SCHEMA}...")
+        load(args.dsn, args.rows, args.seed)
+    results = run(args.dsn)
+    print_report(results)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, default=str))
+        print(f"\n💾 Plans written to {args.json}")
+    failed = [result["query"] for result in results if not result["ok"]]
+    if failed:
+        print(f"\n❌ {len(failed)} quer{'y' if len(failed) == 1 else 'ies'} not using the expected index")
+        sys.exit(1)
+    print("\n✅ Every hot query uses its index")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv(ROOT_DIR / '.env')
+    main()
@@ -0,0 +1,93 @@
+"""
+Production runner for the SYNERGY INDIA API
+
+    cd backend && gunicorn -c gunicorn.conf.py server:app
+
+Runs one uvicorn worker per CPU this container may use (its CPU affinity and
+cgroup quota, not the host's core count), at most MAX_WORKERS so a small
+plan isn't OOM-killed; WEB_CONCURRENCY overrides both. The app is
+imported once in the master and the static service/gallery catalogs are
+built there, so forked workers share them copy-on-write; the Supabase client
+and background monitors are created per worker in the lifespan hook.
+
+Zero-downtime reloads:
+  kill -HUP <master>     re-read this config and start a full set of new
+                         workers on the same (preloaded) code, then retire
+                         the old ones, each finishing its in-flight requests
+                         within graceful_timeout
+  kill -USR2 <master>    start a new master + workers on new code alongside
+                         the old ones, then kill -QUIT the old master once the
+                         new one is serving (preloaded code is only re-read by
+                         a new master)
+"""
+
+import math
+import os
+import shutil
+
+# Each worker is a full copy of the app (plus pandas/pyarrow once analytics
+# or archives are used), so memory, not CPU, bounds the worker count on the
+# small instances this runs on
+MAX_WORKERS = 4
+
+
+def cpu_limit() -> int:
+    """CPUs available to this container: its affinity mask, capped by a cgroup CPU quota"""
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        quota, period = open("/sys/fs/cgroup/cpu.max").read().split()
+    except (OSError, ValueError):
+        try:
+            # cgroup v1: quota is -1 when unlimited
+            quota = open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read().strip()
+            period = open("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read().strip()
+        except OSError:
+            return cpus
+    if quota in ("max", "-1"):
+        return cpus
+    return max(min(cpus, math.ceil(int(quota) / int(period))), 1)
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', min(cpu_limit(), MAX_WORKERS)))
+worker_class = "uvicorn.workers.UvicornWorker"
+chdir = os.path.dirname(os.path.abspath(__file__))
+
+preload_app = True
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+
+# Recycle workers now and then so slow leaks can't accumulate; the jitter
+# keeps them from all restarting at once
+max_requests = 5000
+max_requests_jitter = 500
+
+accesslog = "-"
+
+# Per-worker Prometheus files (see metrics.py); must be set before the app is
+# imported. This file is re-read on every HUP and by a USR2 master, while the
+# current workers' files are live, so it only creates the directory.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/synergy-prometheus')
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def on_starting(arbiter):
+    # Clear the previous run's files, in the first master only: a USR2 master
+    # (master_pid set) starts next to the old one's still-serving workers
+    if arbiter.master_pid:
+        return
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def when_ready(arbiter):
+    import server
+    server.preload()
+    arbiter.log.info(f"Catalogs preloaded; starting {workers} workers")
+
+
+def child_exit(arbiter, worker):
+    import metrics
+    metrics.mark_process_dead(worker.pid)
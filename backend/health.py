@@ -0,0 +1,102 @@
+"""
+Liveness and readiness for the SYNERGY INDIA API
+
+Dependency probes (database, storage) run in the background on a fixed
+interval and the health endpoints only read the cached result, so however
+often the orchestrator polls, the database sees one probe per interval per
+worker.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+PROBE_INTERVAL = float(os.environ.get('HEALTH_PROBE_INTERVAL', 15))
+PROBE_TIMEOUT = float(os.environ.get('HEALTH_PROBE_TIMEOUT', 5))
+
+Probe = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class HealthMonitor:
+    """Runs ``probes`` every ``interval`` seconds and caches the outcome.
+
+    A probe is a sync callable (run in a worker thread) or a coroutine
+    function; it passes by returning and fails by raising or timing out.
+    Results older than three intervals count as failed, which catches a
+    wedged probe loop.
+    """
+
+    def __init__(self, probes: Dict[str, Probe], interval: float = PROBE_INTERVAL, timeout: float = PROBE_TIMEOUT):
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self.started_at = time.monotonic()
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    async def _probe(self, name: str, probe: Probe) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(probe):
+                await asyncio.wait_for(probe(), self.timeout)
+            else:
+                await asyncio.wait_for(asyncio.to_thread(probe), self.timeout)
+            result = {"ok": True}
+        except asyncio.TimeoutError:
+            result = {"ok": False, "error": f"timed out after {self.timeout:g}s"}
+        except Exception as e:
+            result = {"ok": False, "error": str(e) or type(e).__name__}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["checked_at"] = datetime.now(timezone.utc).isoformat()
+        if not result["ok"] and self._results.get(name, {}).get("ok", True):
+            logger.warning(f"Health probe '{name}' failing: {result['error']}")
+        return result
+
+    async def check(self):
+        """Run every probe once, concurrently, and cache the results"""
+        names = list(self.probes)
+        results = await asyncio.gather(*(self._probe(name, self.probes[name]) for name in names))
+        self._results = dict(zip(names, results))
+        self._checked_at = time.monotonic()
+
+    def liveness(self) -> Dict[str, Any]:
+        return {"status": "alive", "uptime_seconds": round(time.monotonic() - self.started_at, 1)}
+
+    def readiness(self) -> Dict[str, Any]:
+        if self._checked_at is None:
+            return {"status": "starting", "ready": False, "checks": {}}
+
+        age = time.monotonic() - self._checked_at
+        stale = age > self.interval * 3
+        ready = not stale and all(result["ok"] for result in self._results.values())
+        return {
+            "status": "ready" if ready else ("stale" if stale else "degraded"),
+            "ready": ready,
+            "checked_seconds_ago": round(age, 1),
+            "checks": self._results,
+        }
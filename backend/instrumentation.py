@@ -0,0 +1,330 @@
+"""
+Per-request timing for the SYNERGY INDIA API
+
+TimingMiddleware measures each request's wall time, how long the event loop
+was blocked while it was in flight, and every Supabase / storage / MongoDB
+call made on its behalf. The totals go out as a ``Server-Timing`` header
+(visible in the browser devtools) and as one JSON log line per request on
+the ``synergy.timing`` logger. Calls that repeat the same table, operation
+and filter columns within one request are listed under ``repeated`` - that
+is how update-then-reselect and N+1 loops show up. Lookups the request's
+loader (loader.py) answered without a round trip are counted as
+``db_calls_saved``, and time spent waiting for a concurrency slot
+(limits.py) as ``queue``.
+
+Database calls are attributed through a context variable, so work pushed to
+``asyncio.to_thread`` is still counted against the request that started it.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("synergy.timing")
+
+# How often the loop-lag probe wakes up; the probe costs a few microseconds
+# per tick, so 20ms keeps it far below 1% of a core
+LOOP_TICK_SECONDS = float(os.environ.get('TIMING_LOOP_TICK_MS', 20)) / 1000
+# A (table, operation, filter columns) key seen this many times in one
+# request is reported as repeated
+REPEAT_THRESHOLD = int(os.environ.get('TIMING_REPEAT_THRESHOLD', 2))
+
+# Builder methods that choose the PostgREST operation
+_OPERATIONS = {"select", "insert", "upsert", "update", "delete"}
+# Builder methods whose first argument is a filtered column
+_FILTERS = {"eq", "neq", "gt", "gte", "lt", "lte", "in_", "is_", "like", "ilike", "contains", "match"}
+
+
+class RequestTimings:
+    """Calls recorded for one request"""
+
+    __slots__ = ("calls", "loop_thread")
+
+    def __init__(self):
+        # (kind, target, operation, filter columns, seconds, ran on the loop thread)
+        self.calls: List[Tuple[str, str, str, Tuple[str, ...], float, bool]] = []
+        self.loop_thread = threading.get_ident()
+
+    def record(self, kind: str, target: str, operation: str, filters: Tuple[str, ...], seconds: float):
+        self.calls.append((kind, target, operation, filters, seconds, threading.get_ident() == self.loop_thread))
+
+    def totals(self, kind: str) -> Tuple[int, float]:
+        durations = [call[4] for call in self.calls if call[0] == kind]
+        return len(durations), sum(durations)
+
+    def blocking_seconds(self) -> float:
+        """Time spent in calls made directly on the event loop thread"""
+        return sum(call[4] for call in self.calls if call[5] and call[0] in ("db", "storage"))
+
+    def repeated(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for kind, target, operation, filters, _, _ in self.calls:
+            if kind in ("loader", "queue"):
+                continue
+            key = f"{target}.{operation}" + (f"[{','.join(filters)}]" if filters else "")
+            counts[key] = counts.get(key, 0) + 1
+        return {key: count for key, count in counts.items() if count >= REPEAT_THRESHOLD}
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current() -> Optional[RequestTimings]:
+    """Timings of the request being served, if any"""
+    return _current.get()
+
+
+# ============================================================================
+# SUPABASE CLIENT PROXY
+# ============================================================================
+
+class _InstrumentedQuery:
+    """Wraps a PostgREST builder, remembering the operation and filter columns"""
+
+    __slots__ = ("_builder", "_table", "_operation", "_filters")
+
+    def __init__(self, builder, table: str, operation: str = "select", filters: Tuple[str, ...] = ()):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+        self._filters = filters
+
+    def __getattr__(self, name):
+        attribute = getattr(self._builder, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            operation = name if name in _OPERATIONS else self._operation
+            filters = self._filters + (str(args[0]),) if name in _FILTERS and args else self._filters
+            return _InstrumentedQuery(result, self._table, operation, filters)
+        return call
+
+    def execute(self):
+        timings = _current.get()
+        if timings is None:
+            return self._builder.execute()
+        started = time.perf_counter()
+        try:
+            return self._builder.execute()
+        finally:
+            timings.record("db", self._table, self._operation, self._filters, time.perf_counter() - started)
+
+
+class _InstrumentedBucket:
+    __slots__ = ("_bucket", "_name")
+
+    def __init__(self, bucket, name: str):
+        self._bucket = bucket
+        self._name = name
+
+    def __getattr__(self, name):
+        attribute = getattr(self._bucket, name)
+        if not callable(attribute) or name == "get_public_url":
+            return attribute
+
+        def call(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return attribute(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                timings.record("storage", self._name, name, (), time.perf_counter() - started)
+        return call
+
+
+class _InstrumentedStorage:
+    __slots__ = ("_storage",)
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    def from_(self, bucket: str):
+        return _InstrumentedBucket(self._storage.from_(bucket), bucket)
+
+    def __getattr__(self, name):
+        return getattr(self._storage, name)
+
+
+class InstrumentedClient:
+    """Drop-in proxy for ``supabase.Client`` that times every round trip"""
+
+    def __init__(self, client):
+        self._client = client
+        self.storage = _InstrumentedStorage(client.storage)
+
+    def table(self, name: str):
+        return _InstrumentedQuery(self._client.table(name), name)
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None, *args, **kwargs):
+        return _InstrumentedQuery(self._client.rpc(fn, params or {}, *args, **kwargs), fn, "rpc")
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# ============================================================================
+# MONGODB COMMAND LISTENER
+# ============================================================================
+
+try:
+    from pymongo import monitoring
+
+    class MongoCommandListener(monitoring.CommandListener):
+        """Attributes MongoDB commands to the request that issued them.
+
+        Pass an instance to the client (``event_listeners=[...]``). Commands
+        run outside a request context are ignored.
+        """
+
+        def __init__(self):
+            self._pending: Dict[Tuple[Any, int], Tuple[RequestTimings, str, str, Tuple[str, ...]]] = {}
+
+        def started(self, event):
+            timings = _current.get()
+            if timings is None:
+                return
+            collection = event.command.get(event.command_name)
+            filters = tuple(sorted((event.command.get("filter") or {}).keys()))
+            self._pending[(event.connection_id, event.request_id)] = (
+                timings, str(collection), event.command_name, filters
+            )
+
+        def succeeded(self, event):
+            self._finish(event)
+
+        def failed(self, event):
+            self._finish(event)
+
+        def _finish(self, event):
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending is not None:
+                timings, collection, command, filters = pending
+                timings.record("db", collection, command, filters, event.duration_micros / 1_000_000)
+except ImportError:  # pymongo is only installed for the MongoDB server
+    MongoCommandListener = None
+
+
+# ============================================================================
+# EVENT LOOP LAG
+# ============================================================================
+
+class LoopLagMonitor:
+    """Accumulates how late a periodic timer wakes up - i.e. loop blocking.
+
+    A request's blocked time is the growth of the total while it was in
+    flight, so it includes stalls caused by concurrent requests too.
+    """
+
+    def __init__(self, interval: float = LOOP_TICK_SECONDS):
+        self.interval = interval
+        self.blocked_total = 0.0
+        self._expected = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_started(self):
+        if self._task is None or self._task.done():
+            self._expected = time.perf_counter() + self.interval
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self.blocked_total += max(0.0, now - self._expected)
+            self._expected = now + self.interval
+
+    def blocked(self) -> float:
+        """Blocked time so far, including a stall still in progress"""
+        return self.blocked_total + max(0.0, time.perf_counter() - self._expected)
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class TimingMiddleware:
+    """ASGI middleware adding ``Server-Timing`` and a JSON log line per request"""
+
+    def __init__(self, app):
+        self.app = app
+        self.lag = LoopLagMonitor()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.lag.ensure_started()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        blocked_before = self.lag.blocked()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", self._server_timing(timings, started, blocked_before).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._log(scope, status_code, timings, started, blocked_before)
+
+    def _server_timing(self, timings: RequestTimings, started: float, blocked_before: float) -> str:
+        db_calls, db_seconds = timings.totals("db")
+        storage_calls, storage_seconds = timings.totals("storage")
+        parts = [
+            f"app;dur={(time.perf_counter() - started) * 1000:.1f}",
+            f'db;dur={db_seconds * 1000:.1f};desc="{db_calls} calls"',
+        ]
+        queued, queue_seconds = timings.totals("queue")
+        if queued:
+            parts.append(f'queue;dur={queue_seconds * 1000:.1f};desc="waited for {queued} slots"')
+        saved, _ = timings.totals("loader")
+        if saved:
+            parts.append(f'loader;desc="{saved} db calls saved"')
+        if storage_calls:
+            parts.append(f'storage;dur={storage_seconds * 1000:.1f};desc="{storage_calls} calls"')
+        parts.append(f'loop;dur={(self.lag.blocked() - blocked_before) * 1000:.1f};desc="event loop blocked"')
+        return ", ".join(parts)
+
+    def _log(self, scope, status_code: int, timings: RequestTimings, started: float, blocked_before: float):
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        db_calls, db_seconds = timings.totals("db")
+        storage_calls, storage_seconds = timings.totals("storage")
+        route = scope.get("route")
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(route, "path", None),
+            "status": status_code,
+            "wall_ms": round((time.perf_counter() - started) * 1000, 2),
+            "loop_blocked_ms": round((self.lag.blocked() - blocked_before) * 1000, 2),
+            "db_calls": db_calls,
+            "db_ms": round(db_seconds * 1000, 2),
+            "db_calls_saved": timings.totals("loader")[0],
+            "queue_ms": round(timings.totals("queue")[1] * 1000, 2),
+            "calls_on_loop_ms": round(timings.blocking_seconds() * 1000, 2),
+            "storage_calls": storage_calls,
+            "storage_ms": round(storage_seconds * 1000, 2),
+        }
+        repeated = timings.repeated()
+        if repeated:
+            record["repeated"] = repeated
+        logger.info(json.dumps(record))
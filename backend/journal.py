@@ -0,0 +1,354 @@
+"""
+Durable write-ahead queue for the SYNERGY INDIA API
+
+Some writes matter more than the database being up: a contact-form
+submission that fails is a customer lost. Journal.append() writes the record
+to an append-only log on local disk and returns once it is fsynced, so the
+request only waits for a disk append. A background drainer then hands the
+records to the database in batches, retrying with backoff until it
+succeeds. Records carry their own idempotency key (for leads, the row id), so
+replaying a batch that was half done before a crash does not create
+duplicates - the ``apply`` callback must skip keys the database already has.
+
+On disk: one ``<worker>-<n>.log`` segment of JSON lines at a time per worker,
+plus ``.offset`` files recording how far each segment has been drained.
+Records arriving while an fsync is in progress share the next one (group
+commit), so under load there is one fsync per batch, not per submission.
+
+Each worker holds an flock on the segments it owns. A segment nobody has
+locked belongs to a worker that exited or crashed, or to a previous run; the
+next worker to notice takes it over and drains it. A torn last line (a write
+that was never fsynced, so never acknowledged) is dropped.
+
+A batch the database rejects MAX_ATTEMPTS times in a row for a reason other
+than an outage (resilience.is_outage, an open breaker, a full limiter) is
+applied one record at a time; the records that still fail are appended to
+``dead-letter.jsonl`` with their error, for someone to look at, and the
+drain moves past them instead of retrying one bad record forever.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import limits
+import metrics
+import resilience
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+
+SEGMENT_BYTES = 1024 * 1024
+BATCH_SIZE = 100
+# How often idle drainers look for segments left by other workers
+ORPHAN_SCAN_SECONDS = 30.0
+MAX_BACKOFF_SECONDS = 60.0
+# Rejections of the same batch before its bad records are set aside
+MAX_ATTEMPTS = 5
+# Not *.log, so it is never mistaken for an orphaned segment
+DEAD_LETTER_FILE = "dead-letter.jsonl"
+
+
+def _transient(error: Exception) -> bool:
+    """Whether ``error`` is the database being unavailable rather than rejecting the records"""
+    return isinstance(error, (resilience.CircuitOpen, limits.Overloaded)) or resilience.is_outage(error)
+
+
+class Segment:
+    """One locked log file and how much of it is written and drained"""
+
+    def __init__(self, path: Path, fd: int, drained: int):
+        self.path = path
+        self.fd = fd
+        self.drained = drained
+        self.written = os.fstat(fd).st_size
+        self.sealed = False
+
+    @property
+    def offset_path(self) -> Path:
+        return self.path.with_suffix(".offset")
+
+    def read(self, limit: int) -> Tuple[List[Record], int]:
+        """Up to ``limit`` whole records after the drained offset, and the offset after them"""
+        data = os.pread(self.fd, self.written - self.drained, self.drained)
+        records, offset = [], self.drained
+        for line in data.splitlines(keepends=True):
+            if len(records) >= limit or not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.error(f"Skipping unreadable record in {self.path.name} at byte {offset - len(line)}")
+        return records, offset
+
+    def save_offset(self, offset: int):
+        self.drained = offset
+        temp = self.offset_path.with_suffix(".offset.tmp")
+        temp.write_text(str(offset))
+        os.replace(temp, self.offset_path)
+
+    def remove(self):
+        self.offset_path.unlink(missing_ok=True)
+        self.path.unlink(missing_ok=True)
+        os.close(self.fd)
+
+
+class Journal:
+    """Append-only queue in ``directory`` drained into ``apply(records)``"""
+
+    def __init__(self, directory: Path, apply: Callable[[List[Record]], Awaitable[None]],
+                 segment_bytes: int = SEGMENT_BYTES, batch_size: int = BATCH_SIZE):
+        self.directory = directory
+        self.apply = apply
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        self.running = False
+        self._name = ""
+        self._sequence = 0
+        self._segments: List[Segment] = []
+        self._active: Optional[Segment] = None
+        self._buffer: List[Tuple[bytes, asyncio.Future]] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._drainer: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._pending = 0
+        # (segment path, offset) of the batch being rejected -> rejections so far
+        self._rejections: Dict[Tuple[Path, int], int] = {}
+
+    # ------------------------------------------------------------------ files
+
+    def _open(self, path: Path) -> Optional[Segment]:
+        """Lock and open ``path``; None if another worker holds it or it is gone"""
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        # Removed by the worker that drained it between our listing and our lock
+        if os.fstat(fd).st_nlink == 0:
+            os.close(fd)
+            return None
+        drained = 0
+        offset_path = path.with_suffix(".offset")
+        if offset_path.exists():
+            drained = int(offset_path.read_text() or 0)
+        return Segment(path, fd, drained)
+
+    def _new_segment(self):
+        if self._active is not None:
+            self._active.sealed = True
+        self._sequence += 1
+        segment = self._open(self.directory / f"{self._name}-{self._sequence:06d}.log")
+        self._segments.append(segment)
+        self._active = segment
+
+    def _find_orphans(self, known: List[Path]) -> List[Segment]:
+        """Lock the segments no live worker holds (runs in a worker thread)"""
+        orphans = []
+        for path in sorted(self.directory.glob("*.log")):
+            if path in known:
+                continue
+            segment = self._open(path)
+            if segment is not None:
+                segment.sealed = True
+                orphans.append(segment)
+        return orphans
+
+    async def _claim_orphans(self):
+        orphans = await asyncio.to_thread(self._find_orphans, [segment.path for segment in self._segments])
+        for segment in orphans:
+            pending = (await asyncio.to_thread(segment.read, 2 ** 31))[0]
+            # Drained before this worker's own segments, which are newer
+            self._segments.insert(0, segment)
+            self._add_pending(len(pending))
+            logger.info(f"Took over {segment.path.name} ({len(pending)} records to drain)")
+
+    def _write(self, segment: Segment, data: bytes):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(segment.fd, view):]
+        os.fsync(segment.fd)
+
+    # -------------------------------------------------------------- lifecycle
+
+    async def start(self):
+        """Open this worker's segment and start draining (call once per worker, after fork)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._segments, self._active, self._sequence = [], None, 0
+        self._new_segment()
+        self._wake = asyncio.Event()
+        await self._claim_orphans()
+        # Anything taken over is drained straight away
+        self._wake.set()
+        self.running = True
+        self._drainer = asyncio.get_running_loop().create_task(self._drain_forever())
+
+    async def stop(self, timeout: float = 5.0):
+        """Flush, try to drain what's left for up to ``timeout`` seconds, release the segments"""
+        if not self.running:
+            return
+        self.running = False
+        if self._flusher is not None:
+            await asyncio.shield(self._flusher)
+        if self._drainer is not None:
+            self._drainer.cancel()
+            try:
+                await self._drainer
+            except asyncio.CancelledError:
+                pass
+        try:
+            await asyncio.wait_for(self._drain_all(), timeout)
+        except Exception as e:
+            logger.warning(f"{self._pending} journaled records left for the next start: {e}")
+        for segment in self._segments:
+            if segment.drained >= segment.written:
+                segment.remove()
+            else:
+                # Unlocked: the next worker to start (or scan) drains it
+                os.close(segment.fd)
+        self._segments, self._active = [], None
+
+    def _add_pending(self, count: int):
+        self._pending += count
+        metrics.JOURNAL_PENDING.inc(count)
+
+    # ----------------------------------------------------------------- append
+
+    async def append(self, record: Record):
+        """Return once ``record`` is durably on disk; raises OSError if it can't be"""
+        line = (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode()
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((line, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush())
+        # Shielded: once queued the record is written whether or not the caller waits
+        await asyncio.shield(future)
+
+    async def _flush(self):
+        while self._buffer:
+            batch, self._buffer = self._buffer, []
+            segment = self._active
+            data = b"".join(line for line, _ in batch)
+            try:
+                await asyncio.to_thread(self._write, segment, data)
+            except OSError as e:
+                # Cut off whatever part of the batch did reach the file
+                try:
+                    os.ftruncate(segment.fd, segment.written)
+                except OSError:
+                    pass
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            segment.written += len(data)
+            metrics.JOURNAL_FSYNC_BATCH.observe(len(batch))
+            self._add_pending(len(batch))
+            for _, future in batch:
+                future.set_result(None)
+            if segment.written >= self.segment_bytes:
+                self._new_segment()
+            self._wake.set()
+
+    # ------------------------------------------------------------------ drain
+
+    async def _drain_all(self):
+        """Apply every written record; raises (leaving the rest) if apply() fails"""
+        for segment in list(self._segments):
+            while segment.drained < segment.written:
+                records, offset = await asyncio.to_thread(segment.read, self.batch_size)
+                if offset == segment.drained:
+                    # Only a torn line left: it was never acknowledged
+                    logger.warning(f"Dropping {segment.written - offset} unsynced bytes at the end of {segment.path.name}")
+                    segment.written = offset
+                    break
+                if records:
+                    await self._apply(segment, records)
+                await asyncio.to_thread(segment.save_offset, offset)
+                self._add_pending(-len(records))
+            if segment.sealed and segment.drained >= segment.written:
+                await asyncio.to_thread(segment.remove)
+                self._segments.remove(segment)
+
+    async def _apply(self, segment: Segment, records: List[Record]):
+        """apply(records), setting aside the records it keeps rejecting"""
+        head = (segment.path, segment.drained)
+        try:
+            await self.apply(records)
+        except Exception as e:
+            if _transient(e):
+                raise
+            self._rejections[head] = self._rejections.get(head, 0) + 1
+            if self._rejections[head] < MAX_ATTEMPTS:
+                raise
+            logger.error(f"Batch at byte {segment.drained} of {segment.path.name} rejected "
+                         f"{MAX_ATTEMPTS} times, applying it record by record: {e}")
+            await self._apply_each(segment, records)
+        self._rejections.pop(head, None)
+
+    async def _apply_each(self, segment: Segment, records: List[Record]):
+        # Replaying the ones that got through before an outage is safe: apply is idempotent
+        for record in records:
+            try:
+                await self.apply([record])
+            except Exception as e:
+                if _transient(e):
+                    raise
+                await asyncio.to_thread(self._dead_letter, segment, record, e)
+
+    def _dead_letter(self, segment: Segment, record: Record, error: Exception):
+        entry = {
+            "record": record,
+            "error": repr(error),
+            "segment": segment.path.name,
+            "offset": segment.drained,
+            "failed_at": time.time(),
+        }
+        with open(self.directory / DEAD_LETTER_FILE, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        metrics.JOURNAL_DEAD_LETTERS.inc()
+        logger.error(f"Moved a journaled record to {DEAD_LETTER_FILE}: {error!r}")
+
+    async def _drain_forever(self):
+        failures = 0
+        last_scan = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), ORPHAN_SCAN_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            # wait_for can swallow stop()'s cancel when the wake-up lands at the same moment
+            if not self.running:
+                return
+            self._wake.clear()
+            try:
+                if time.monotonic() - last_scan >= ORPHAN_SCAN_SECONDS:
+                    last_scan = time.monotonic()
+                    await self._claim_orphans()
+                await self._drain_all()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                delay = min(2 ** failures, MAX_BACKOFF_SECONDS) * random.uniform(0.5, 1.0)
+                logger.warning(f"Journal drain failed ({self._pending} pending), retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                self._wake.set()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
@@ -0,0 +1,175 @@
+"""
+Adaptive concurrency limits for the SYNERGY INDIA API's outbound calls
+
+Each dependency (the database, upload storage) gets an AdaptiveLimiter that
+caps how many of its calls are in flight at once. Calls over the limit wait
+in a FIFO queue for at most ``queue_timeout`` seconds. A call that finds the
+queue full, or would clearly wait longer than that, fails straight away with
+Overloaded, which the API answers with ``503`` and a ``Retry-After``. A burst
+(say a campaign driving contact-form submits) then queues briefly and sheds
+the excess, instead of piling every request onto Supabase until its rate
+limits fail them all together.
+
+The limit follows observed latency, after the gradient algorithm of Netflix's
+concurrency-limits library: a long-term average round trip is compared with
+the recent one. While they agree, the limit creeps up by about sqrt(limit)
+per adjustment. When recent calls slow down (the dependency is queueing),
+the limit shrinks in proportion, down to half per step. Failed calls back
+the limit off by 10%. Limits are per worker process.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Optional
+
+import instrumentation
+import metrics
+
+QUEUE_TIMEOUT = float(os.environ.get('CONCURRENCY_QUEUE_TIMEOUT_MS', 1000)) / 1000
+
+# Recent latency this many times the long-term average still counts as healthy
+TOLERANCE = 1.5
+# Weight of a new adjustment, and of a new sample in the two latency averages
+SMOOTHING = 0.2
+SHORT_ALPHA = 0.3
+LONG_ALPHA = 1 / 500
+BACKOFF = 0.9
+
+
+class Overloaded(Exception):
+    """A dependency is at its concurrency limit and the queue can't take the call"""
+
+    def __init__(self, dependency: str, retry_after: int):
+        super().__init__(f"{dependency} is overloaded")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """Latency-driven concurrency limit with a bounded, timed wait queue.
+
+    Use ``async with limiter.slot():`` around each outbound call. Only touched
+    from the event loop thread; the calls themselves may run in threads.
+    """
+
+    def __init__(self, name: str, initial: int = 10, min_limit: int = 1, max_limit: int = 64,
+                 queue_timeout: float = QUEUE_TIMEOUT, max_queue: int = 100):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max_limit
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._short: Optional[float] = None
+        self._long: Optional[float] = None
+        metrics.CONCURRENCY_LIMIT.labels(name).set(int(self.limit))
+
+    def expected_wait(self) -> float:
+        """Seconds until a call joining the queue now would likely start"""
+        return (len(self._waiters) + 1) * (self._short or 0.0) / max(int(self.limit), 1)
+
+    def retry_after(self) -> int:
+        return min(max(math.ceil(self.expected_wait()), 1), 30)
+
+    def _reject(self):
+        metrics.CONCURRENCY_REJECTED.labels(self.name).inc()
+        raise Overloaded(self.name, self.retry_after())
+
+    async def _acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue or self.expected_wait() > self.queue_timeout:
+            self._reject()
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait((future,), timeout=self.queue_timeout)
+        except BaseException:
+            # Cancelled while queued: give back a slot that was already handed over
+            if future.done():
+                self._hand_off()
+            else:
+                self._waiters.remove(future)
+                future.cancel()
+            raise
+        timings = instrumentation.current()
+        if timings is not None:
+            timings.record("queue", self.name, "wait", (), time.perf_counter() - started)
+        # Checked on the future, not wait()'s result: a slot may be handed over in between
+        if not future.done():
+            self._waiters.remove(future)
+            future.cancel()
+            self._reject()
+
+    def _hand_off(self):
+        """Free one slot and pass whatever the limit allows on to the queue"""
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _adjust(self, seconds: float, failed: bool):
+        if failed:
+            self.limit = max(self.limit * BACKOFF, self.min_limit)
+        else:
+            self._short = seconds if self._short is None else self._short + SHORT_ALPHA * (seconds - self._short)
+            self._long = seconds if self._long is None else self._long + LONG_ALPHA * (seconds - self._long)
+            # A long-term average far above the recent one is from an old slow spell
+            if self._long > 2 * self._short:
+                self._long *= 0.95
+            gradient = max(0.5, min(1.0, TOLERANCE * self._long / max(self._short, 1e-6)))
+            target = self.limit * gradient + math.sqrt(self.limit)
+            # Only grow while the limit is actually what's holding calls back
+            if target > self.limit and self.in_flight < self.limit / 2:
+                target = self.limit
+            self.limit = min(max(self.limit + SMOOTHING * (target - self.limit), self.min_limit), self.max_limit)
+        metrics.CONCURRENCY_LIMIT.labels(self.name).set(int(self.limit))
+
+    async def acquire(self) -> Callable[[bool], None]:
+        """Take a slot; returns ``release(failed)``, to be called once when the call is over.
+
+        For calls that can outlive their caller (a worker thread keeps running
+        after a timeout): the slot stays taken until the work really stops.
+        """
+        await self._acquire()
+        metrics.CONCURRENCY_IN_FLIGHT.labels(self.name).inc()
+        started = time.perf_counter()
+
+        def release(failed: bool = False):
+            metrics.CONCURRENCY_IN_FLIGHT.labels(self.name).dec()
+            self._adjust(time.perf_counter() - started, failed)
+            self._hand_off()
+
+        return release
+
+    @asynccontextmanager
+    async def slot(self):
+        release = await self.acquire()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            release(failed)
+
+    def snapshot(self):
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "recent_ms": round((self._short or 0.0) * 1000, 2),
+            "baseline_ms": round((self._long or 0.0) * 1000, 2),
+        }
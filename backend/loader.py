@@ -0,0 +1,181 @@
+"""
+Request-scoped row loader for the SYNERGY INDIA API
+
+Within one request, the same row is often wanted by more than one piece of
+code: the auth dependency and the handler, a settings read and the write
+that follows it. RequestLoader remembers every row it has loaded for the
+request and:
+
+- coalesces identical lookups: a second load of the same key (even one made
+  while the first is still in flight) shares the first one's result
+- batches lookups by key: every load of a table/column issued in the same
+  event-loop tick goes out as one ``column in (...)`` query
+
+LoaderMiddleware gives each HTTP request its own loader. The module-level
+helpers fall back to a direct query outside a request (background jobs,
+CLIs), so call sites don't have to care. Lookups saved show up per request in
+the instrumentation (``db_calls_saved`` in the timing log and a ``loader``
+entry in Server-Timing).
+
+Keys must be unique columns (``id``, ``admin_users.username``). Rows are
+cached for the rest of the request, so code that writes a row should prime()
+the loader with the result or forget() the table.
+"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import instrumentation
+
+Row = Dict[str, Any]
+
+
+class RequestLoader:
+    """Per-request cache and batcher in front of an AsyncRepository"""
+
+    def __init__(self, db):
+        self.db = db
+        # (table, column, str(value)) -> row or None
+        self._rows: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self._firsts: Dict[str, asyncio.Future] = {}
+        # (table, column) -> {str(value): (value, future)} waiting for the next dispatch
+        self._pending: Dict[Tuple[str, str], Dict[str, Tuple[Any, asyncio.Future]]] = {}
+
+    @staticmethod
+    def _saved(table: str, operation: str, column: str, count: int = 1):
+        timings = instrumentation.current()
+        if timings is not None:
+            for _ in range(count):
+                timings.record("loader", table, operation, (column,), 0.0)
+
+    async def load(self, table: str, value: Any, column: str = "id") -> Optional[Row]:
+        key = (table, column, str(value))
+        future = self._rows.get(key)
+        if future is not None:
+            self._saved(table, "coalesced", column)
+        else:
+            loop = asyncio.get_running_loop()
+            future = self._rows[key] = loop.create_future()
+            batch = self._pending.setdefault((table, column), {})
+            if not batch:
+                # Everything asked for before the loop comes round again joins this batch
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch(table, column)))
+            batch[str(value)] = (value, future)
+        # Shielded: one caller being cancelled mustn't cancel the shared lookup
+        return await asyncio.shield(future)
+
+    async def load_many(self, table: str, values: List[Any], column: str = "id") -> List[Optional[Row]]:
+        return list(await asyncio.gather(*(self.load(table, value, column) for value in values)))
+
+    async def _dispatch(self, table: str, column: str):
+        batch = self._pending.pop((table, column), {})
+        if not batch:
+            return
+        values = [value for value, _ in batch.values()]
+        try:
+            if len(values) == 1:
+                rows = await self.db.select(table, [(column, 'eq', values[0])], limit=1)
+            else:
+                rows = await self.db.select(table, [(column, 'in', values)])
+                self._saved(table, "batched", column, len(values) - 1)
+        except Exception as error:
+            for key, (_, future) in batch.items():
+                # Not cached: a later load in the same request retries
+                self._rows.pop((table, column, key), None)
+                future.set_exception(error)
+                # Retrieved here so an unawaited failure doesn't log a warning
+                future.exception()
+            return
+        found = {str(row.get(column)): row for row in rows}
+        for key, (_, future) in batch.items():
+            future.set_result(found.get(key))
+
+    async def first(self, table: str) -> Optional[Row]:
+        """The single row of a settings table"""
+        future = self._firsts.get(table)
+        if future is not None:
+            self._saved(table, "coalesced", "*")
+            return await asyncio.shield(future)
+        future = self._firsts[table] = asyncio.get_running_loop().create_future()
+        try:
+            row = await self.db.first(table)
+        except Exception as error:
+            del self._firsts[table]
+            future.set_exception(error)
+            future.exception()
+            raise
+        future.set_result(row)
+        if row is not None:
+            self._remember(table, "id", row)
+        return row
+
+    def _remember(self, table: str, column: str, row: Row):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(row)
+        self._rows[(table, column, str(row.get(column)))] = future
+
+    def prime(self, table: str, row: Row, single: bool = False):
+        """Cache ``row`` as just written (``single``: it is the table's only row)"""
+        self._remember(table, "id", row)
+        if single:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(row)
+            self._firsts[table] = future
+
+    def forget(self, table: str):
+        """Drop everything cached for ``table``"""
+        self._firsts.pop(table, None)
+        for key in [key for key in self._rows if key[0] == table]:
+            del self._rows[key]
+
+
+_current: ContextVar[Optional[RequestLoader]] = ContextVar("request_loader", default=None)
+
+
+def current() -> Optional[RequestLoader]:
+    return _current.get()
+
+
+async def load(db, table: str, value: Any, column: str = "id") -> Optional[Row]:
+    """Row of ``table`` whose ``column`` is ``value``, through the request's loader if any"""
+    loader = _current.get()
+    if loader is None:
+        rows = await db.select(table, [(column, 'eq', value)], limit=1)
+        return rows[0] if rows else None
+    return await loader.load(table, value, column)
+
+
+async def first(db, table: str) -> Optional[Row]:
+    loader = _current.get()
+    return await (db.first(table) if loader is None else loader.first(table))
+
+
+def prime(table: str, row: Row, single: bool = False):
+    loader = _current.get()
+    if loader is not None:
+        loader.prime(table, row, single)
+
+
+def forget(table: str):
+    loader = _current.get()
+    if loader is not None:
+        loader.forget(table)
+
+
+class LoaderMiddleware:
+    """ASGI middleware giving every HTTP request a fresh RequestLoader"""
+
+    def __init__(self, app, db_getter: Callable):
+        self.app = app
+        self.db_getter = db_getter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current.set(RequestLoader(self.db_getter()))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
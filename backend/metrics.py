@@ -0,0 +1,164 @@
+"""
+Prometheus metrics for the SYNERGY INDIA API
+
+Each worker updates its own counters without coordinating with the others.
+When ``PROMETHEUS_MULTIPROC_DIR`` is set (required for more than one uvicorn
+or gunicorn worker), prometheus_client keeps every worker's values in
+mmap-backed files in that directory and ``/metrics`` sums them, so a scrape
+sees the whole process group whichever worker answers it. Clear the
+directory before the server starts.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+import instrumentation
+
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Buckets sized for an API whose calls mostly go to a hosted database
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_DURATION = Histogram(
+    "synergy_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "synergy_http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+DB_CALLS = Counter(
+    "synergy_db_calls_total",
+    "Database and storage round trips made while serving requests",
+    ["kind", "target", "operation"],
+)
+DB_CALL_DURATION = Histogram(
+    "synergy_db_call_duration_seconds",
+    "Database and storage round-trip latency",
+    ["kind"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "synergy_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss, or stale when a last-known-good value was served); "
+    "hit ratio = hit / (hit + miss)",
+    ["cache", "result"],
+)
+UPLOAD_BYTES = Counter(
+    "synergy_upload_bytes_total",
+    "Bytes accepted by the upload endpoints",
+    ["directory"],
+)
+CONCURRENCY_LIMIT = Gauge(
+    "synergy_concurrency_limit",
+    "Current adaptive concurrency limit per outbound dependency (summed over workers)",
+    ["dependency"],
+    multiprocess_mode="livesum",
+)
+CONCURRENCY_IN_FLIGHT = Gauge(
+    "synergy_concurrency_in_flight",
+    "Outbound calls in flight per dependency",
+    ["dependency"],
+    multiprocess_mode="livesum",
+)
+CONCURRENCY_REJECTED = Counter(
+    "synergy_concurrency_rejected_total",
+    "Calls shed with a 503 because a dependency's limit and queue were full",
+    ["dependency"],
+)
+CIRCUIT_STATE = Gauge(
+    "synergy_circuit_state",
+    "Circuit breaker state per dependency: 0 closed, 1 half-open, 2 open (worst worker)",
+    ["dependency"],
+    multiprocess_mode="max",
+)
+JOURNAL_PENDING = Gauge(
+    "synergy_journal_pending",
+    "Records acknowledged from the write-ahead journal but not yet in the database",
+    multiprocess_mode="livesum",
+)
+JOURNAL_DEAD_LETTERS = Counter(
+    "synergy_journal_dead_letters_total",
+    "Journaled records the database kept rejecting, set aside in the dead-letter file",
+)
+JOURNAL_FSYNC_BATCH = Histogram(
+    "synergy_journal_fsync_batch_records",
+    "Records made durable by each journal fsync (group commit size)",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+LOOP_STALLS = Counter(
+    "synergy_event_loop_stalls_total",
+    "Event-loop stalls longer than LOOP_STALL_THRESHOLD_MS",
+)
+
+
+def cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def render():
+    """Exposition-format body and content type for ``/metrics``"""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Drop a dead worker's live gauges (call from the process manager)"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding the request and DB call metrics.
+
+    Add it before ``instrumentation.TimingMiddleware`` so it runs inside the
+    timing context and can read the request's recorded calls.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # Unmatched paths share one label so scanners can't blow up cardinality
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(time.perf_counter() - started)
+
+            timings = instrumentation.current()
+            if timings is not None:
+                for kind, target, operation, _, seconds, _ in timings.calls:
+                    DB_CALLS.labels(kind, target, operation).inc()
+                    DB_CALL_DURATION.labels(kind).observe(seconds)
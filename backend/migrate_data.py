@@ -1,29 +1,51 @@
 #!/usr/bin/env python3
 """
 Data Migration Script for SYNERGY INDIA
-Migrates mock data to MongoDB and creates initial admin user
+Seeds the DATA_BACKEND database (Supabase, MongoDB or SQLite, through the
+app's repository) with the default services, gallery, settings and admin
+user, and loads data.json-style snapshots.
+
+Every row is upserted on its natural key (username, service title, gallery
+URL, singleton settings row, or id), so running the script twice changes
+nothing. Batches are written concurrently and checkpointed, so an interrupted
+run resumes where it stopped.
+
+Usage:
+    python migrate_data.py
+    python migrate_data.py --target mongo --snapshot data.json --dry-run
+    python migrate_data.py --target supabase --snapshot synthetic/ --blind --concurrency 16
 """
 
+import argparse
 import asyncio
+import gzip
+import hashlib
+import json
 import os
 import sys
-from pathlib import Path
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime, timezone
-import hashlib
 import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 # Add the backend directory to the path
 sys.path.append(str(Path(__file__).parent))
 
 from dotenv import load_dotenv
 
+import repository
+
 # Load environment variables
-load_dotenv()
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+CHECKPOINT_FILE = ROOT_DIR / '.migrate_checkpoint.json'
 
-# MongoDB connection
-MONGO_URL = os.environ['MONGO_URL']
-DB_NAME = os.environ['DB_NAME']
+# Keys per "in" lookup, keeps the PostgREST URL short (as archive.DELETE_CHUNK)
+FETCH_CHUNK = 200
+
+# Namespace for ids derived from natural keys, stable across runs and machines
+SEED_NAMESPACE = uuid.UUID("5b0f7c1e-3f7a-4d5e-9a57-6e0f1b2c3d4e")
 
 # Mock data (from frontend/src/mock.js)
 COMPANY_INFO = {
@@ -40,7 +62,6 @@ COMPANY_INFO = {
 
 SERVICES_DATA = [
     {
-        "id": str(uuid.uuid4()),
         "title": "Civil & Interior Work",
         "overview": "Modern design and quality construction work from homes to commercial spaces. We provide comprehensive civil and interior solutions with professional execution.",
         "sub_services": [
@@ -63,12 +84,9 @@ SERVICES_DATA = [
         "images": [
             "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/nm66vehg_WhatsApp%20Image%202025-09-16%20at%2018.23.04_1a8773c7.jpg"
         ],
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "title": "Agriculture Solutions",
         "overview": "Modern agricultural technology and equipment for comprehensive farming solutions. Smart farming solutions to increase crop yield and reduce costs.",
         "sub_services": [
@@ -89,12 +107,9 @@ SERVICES_DATA = [
         ],
         "cta_text": "Transform Your Farming Today",
         "images": [],
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "title": "Solar Equipment Suppliers",
         "overview": "Complete range of solar energy systems with government subsidies and support. Reduce your electricity bills by up to 90% with our solar solutions.",
         "sub_services": [
@@ -115,186 +130,150 @@ SERVICES_DATA = [
         ],
         "cta_text": "Go Solar, Save Money Today",
         "images": [],
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     }
 ]
 
 GALLERY_DATA = [
     {
-        "id": str(uuid.uuid4()),
         "url": "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/9r5c5vze_a-photograph-showcases-a-modern-open-pla_nmrPVymmRZq8Gnj29-BzOg_ZK6VdzIJSHqcq6MFddDA-Q.jpeg",
         "alt_text": "Modern open plan construction project by Synergy India",
         "caption": "Civil Construction",
         "category": "Construction",
         "order": 1,
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "url": "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/h2d56y30_a-series-of-four-ultra-realistic-product_VenNUFdxTMKGUTBQM8x23g_Aagye9OzTG-seyfaCuWKVA.jpeg",
         "alt_text": "Professional renovation and remodeling work by Synergy India",
         "caption": "Renovation & Remodeling",
         "category": "Renovation",
         "order": 2,
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "url": "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/rfvylfiq_a-photograph-showcasing-a-modern-living-_JIP0DqwNQ0aOyaqU6-F9Dg_SuIh-SoCT6qXhm8tamBcbg.jpeg",
         "alt_text": "Modern living room interior design by Synergy India",
         "caption": "Interior Design & Execution",
         "category": "Interior Design",
         "order": 3,
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "url": "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/ilvh42m8_generate-4-ultra-realistic-high-resoluti_DirmgR7QSAW6aJqcasQFow_5akk_WKjReKBMRzB56ALJw.jpeg",
         "alt_text": "Premium finishing and aesthetic works by Synergy India",
         "caption": "Finishing & Aesthetic Works",
         "category": "Finishing",
         "order": 4,
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "url": "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/7hk7urn9_generate-4-ultra-realistic-high-resoluti_2QRz-CaUSNuEtwKQR4ZrNg_RHaL1QIQR3eLnA8ydeLs2g.jpeg",
         "alt_text": "Professional commercial interior design by Synergy India",
         "caption": "Commercial Interiors",
         "category": "Commercial",
         "order": 5,
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "url": "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/nm66vehg_WhatsApp%20Image%202025-09-16%20at%2018.23.04_1a8773c7.jpg",
         "alt_text": "Luxury bedroom interior with modern wardrobe design",
         "caption": "Luxury Bedroom Interior",
         "category": "Interior Design",
         "order": 6,
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "url": "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/kgo2rj5q_WhatsApp%20Image%202025-09-16%20at%2018.23.05_e8b9171d.jpg",
         "alt_text": "Contemporary TV unit with marble backdrop",
         "caption": "Entertainment Unit Design",
         "category": "Interior Design",
         "order": 7,
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "url": "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/onzft4wm_WhatsApp%20Image%202025-09-16%20at%2018.23.03_25a92dab.jpg",
         "alt_text": "Space-optimized corner wardrobe solution",
         "caption": "Corner Wardrobe Solution",
         "category": "Interior Design",
         "order": 8,
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
     },
     {
-        "id": str(uuid.uuid4()),
         "url": "https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/6cr1plkw_WhatsApp%20Image%202025-09-16%20at%2018.23.03_d720cf08.jpg",
         "alt_text": "Modern living room with marble feature wall",
         "caption": "Living Room Interior",
         "category": "Interior Design",
         "order": 9,
-        "is_active": True,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc)
+        "is_active": True
+    }
+]
+
+
+SAMPLE_LEADS = [
+    {
+        "id": "8a3c5b8e-6c8e-4c59-9f55-0d0c2d1f6a01",
+        "name": "Raj Kumar Singh",
+        "phone": "+91-9876543210",
+        "email": "raj.singh@example.com",
+        "service_interested": "Civil & Interior Work",
+        "project_type": "Residential",
+        "message": "I need interior design for my 3BHK apartment in Patna.",
+        "status": "New"
+    },
+    {
+        "id": "8a3c5b8e-6c8e-4c59-9f55-0d0c2d1f6a02",
+        "name": "Sunita Devi",
+        "phone": "+91-9876543211",
+        "email": "sunita.devi@example.com",
+        "service_interested": "Solar Equipment",
+        "project_type": "Residential",
+        "message": "Want to install solar panels with government subsidy.",
+        "status": "In Progress"
     }
 ]
 
+# How each table is matched against existing rows.
+#   key:         natural key column; existing rows keep their id
+#   singleton:   the table holds one row, whatever its id
+#   insert_only: never overwrite an existing row (e.g. a changed admin password)
+#   timestamps:  audit columns stamped at run time when the source omits them
+TABLE_SPECS: Dict[str, Dict[str, Any]] = {
+    "admin_users": {"key": "username", "insert_only": True, "timestamps": ("created_at",)},
+    "services": {"key": "title", "timestamps": ("created_at", "updated_at")},
+    "gallery": {"key": "url", "timestamps": ("created_at", "updated_at")},
+    "contact_form_settings": {"singleton": True, "timestamps": ("updated_at",)},
+    "cta_settings": {"singleton": True, "timestamps": ("updated_at",)},
+    "general_settings": {"singleton": True, "timestamps": ("updated_at",)},
+    "leads": {"key": "id", "timestamps": ("created_at", "updated_at")},
+    "login_history": {"key": "id", "timestamps": ()},
+    "status_checks": {"key": "id", "timestamps": ()},
+}
+
+
 def hash_password(password: str) -> str:
     """Hash a password using SHA-256"""
     return hashlib.sha256(password.encode()).hexdigest()
 
-async def migrate_data():
-    """Migrate all data to MongoDB"""
-    print("🚀 Starting data migration...")
-    
-    # Connect to MongoDB
-    client = AsyncIOMotorClient(MONGO_URL)
-    db = client[DB_NAME]
-    
-    try:
-        # 1. Create admin user
-        print("👤 Creating admin user...")
-        admin_user = {
-            "id": str(uuid.uuid4()),
-            "username": "admin",
-            "hashed_password": hash_password("admin123"),
-            "created_at": datetime.now(timezone.utc),
-            "last_login": None
-        }
-        
-        # Check if admin already exists
-        existing_admin = await db.admin_users.find_one({"username": "admin"})
-        if not existing_admin:
-            await db.admin_users.insert_one(admin_user)
-            print("✅ Admin user created (username: admin, password: admin123)")
-        else:
-            print("ℹ️ Admin user already exists")
-        
-        # 2. Migrate services
-        print("🏗️ Migrating services...")
-        await db.services.delete_many({})  # Clear existing
-        await db.services.insert_many(SERVICES_DATA)
-        print(f"✅ Migrated {len(SERVICES_DATA)} services")
-        
-        # 3. Migrate gallery images
-        print("🖼️ Migrating gallery images...")
-        await db.gallery.delete_many({})  # Clear existing
-        await db.gallery.insert_many(GALLERY_DATA)
-        print(f"✅ Migrated {len(GALLERY_DATA)} gallery images")
-        
-        # 4. Create default settings
-        print("⚙️ Creating default settings...")
-        
-        # Contact form settings
-        contact_form_settings = {
-            "id": str(uuid.uuid4()),
+
+def seed_tables() -> Dict[str, List[Dict[str, Any]]]:
+    """Default rows for a fresh install"""
+    return {
+        "admin_users": [{"username": "admin", "hashed_password": hash_password("admin123"), "last_login": None}],
+        "services": SERVICES_DATA,
+        "gallery": GALLERY_DATA,
+        "contact_form_settings": [{
             "service_options": ["Civil & Interior Work", "Agriculture Solutions", "Solar Equipment"],
             "project_type_options": ["Residential", "Commercial", "Agricultural", "Industrial"],
             "admin_email": COMPANY_INFO["email"],
-            "whatsapp_number": COMPANY_INFO["whatsapp"],
-            "updated_at": datetime.now(timezone.utc)
-        }
-        await db.contact_form_settings.delete_many({})
-        await db.contact_form_settings.insert_one(contact_form_settings)
-        
-        # CTA settings
-        cta_settings = {
-            "id": str(uuid.uuid4()),
+            "whatsapp_number": COMPANY_INFO["whatsapp"]
+        }],
+        "cta_settings": [{
             "whatsapp_template": "Hello! I would like to know about {service_name} services.",
             "call_number": COMPANY_INFO["phone"],
-            "contact_page_link": "/contact",
-            "updated_at": datetime.now(timezone.utc)
-        }
-        await db.cta_settings.delete_many({})
-        await db.cta_settings.insert_one(cta_settings)
-        
-        # General settings
-        general_settings = {
-            "id": str(uuid.uuid4()),
+            "contact_page_link": "/contact"
+        }],
+        "general_settings": [{
             "site_name": COMPANY_INFO["name"],
             "logo_url": COMPANY_INFO["logo"],
             "office_address": COMPANY_INFO["address"],
@@ -306,61 +285,314 @@ async def migrate_data():
                 "instagram": "",
                 "twitter": "",
                 "linkedin": ""
-            },
-            "updated_at": datetime.now(timezone.utc)
-        }
-        await db.general_settings.delete_many({})
-        await db.general_settings.insert_one(general_settings)
-        
-        print("✅ Default settings created")
-        
-        # 5. Create sample leads (optional)
-        print("📝 Creating sample leads...")
-        sample_leads = [
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Raj Kumar Singh",
-                "phone": "+91-9876543210",
-                "email": "raj.singh@example.com",
-                "service_interested": "Civil & Interior Work",
-                "project_type": "Residential",
-                "message": "I need interior design for my 3BHK apartment in Patna.",
-                "status": "New",
-                "created_at": datetime.now(timezone.utc),
-                "updated_at": datetime.now(timezone.utc)
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "name": "Sunita Devi",
-                "phone": "+91-9876543211",
-                "email": "sunita.devi@example.com",
-                "service_interested": "Solar Equipment",
-                "project_type": "Residential",
-                "message": "Want to install solar panels with government subsidy.",
-                "status": "In Progress",
-                "created_at": datetime.now(timezone.utc),
-                "updated_at": datetime.now(timezone.utc)
             }
-        ]
-        
-        await db.leads.delete_many({})
-        await db.leads.insert_many(sample_leads)
-        print(f"✅ Created {len(sample_leads)} sample leads")
-        
-        print("\n🎉 Data migration completed successfully!")
-        print("\n📋 Summary:")
-        print(f"   • Admin user: username='admin', password='admin123'")
-        print(f"   • Services: {len(SERVICES_DATA)} migrated")
-        print(f"   • Gallery images: {len(GALLERY_DATA)} migrated")
-        print(f"   • Sample leads: {len(sample_leads)} created")
-        print(f"   • Default settings created")
-        
+        }],
+        "leads": SAMPLE_LEADS,
+    }
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+def _open_ndjson(path: Path) -> Iterator[Dict[str, Any]]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def snapshot_tables(path: Path) -> Dict[str, Iterable[Dict[str, Any]]]:
+    """Rows of a snapshot: a data.json-style file or a directory of <table>.ndjson[.gz]"""
+    if path.is_dir():
+        tables = {}
+        for file in sorted(path.iterdir()):
+            table = file.name.split(".")[0]
+            if table in TABLE_SPECS and file.name.endswith((".ndjson", ".ndjson.gz")):
+                tables[table] = _open_ndjson(file)
+        return tables
+
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return {table: rows for table, rows in data.items() if table in TABLE_SPECS}
+
+
+def source_fingerprint(path: Optional[Path]) -> str:
+    """Identifies the input so a checkpoint is only resumed against the same data"""
+    if path is None:
+        return hashlib.sha256(json.dumps(seed_tables(), sort_keys=True).encode()).hexdigest()
+    files = sorted(path.iterdir()) if path.is_dir() else [path]
+    stats = [(f.name, f.stat().st_size, f.stat().st_mtime_ns) for f in files]
+    return hashlib.sha256(json.dumps(stats).encode()).hexdigest()
+
+
+def batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ============================================================================
+# TARGET
+# ============================================================================
+
+BACKENDS = ("supabase", "mongo", "sqlite")
+
+
+def _supabase_client():
+    from supabase import create_client
+
+    # The service role key bypasses RLS, which blocks anonymous writes to most tables
+    key = os.environ.get('SUPABASE_SERVICE_ROLE_KEY') or os.environ['SUPABASE_ANON_KEY']
+    return create_client(os.environ['SUPABASE_URL'], key)
+
+
+def open_target(backend: Optional[str] = None) -> repository.AsyncRepository:
+    """The app's repository for ``backend`` (default: DATA_BACKEND), awaitable so batches overlap"""
+    if backend:
+        os.environ['DATA_BACKEND'] = backend
+    return repository.AsyncRepository(repository.from_env(_supabase_client))
+
+
+def close_target(target: repository.AsyncRepository):
+    # Only SQLite holds connections of its own
+    if hasattr(target.sync, "close"):
+        target.sync.close()
+
+
+# ============================================================================
+# MIGRATION
+# ============================================================================
+
+def _comparable(value):
+    # Normalize datetimes/arrays the same way every backend hands them back
+    return json.loads(json.dumps(value, default=str))
+
+
+def _natural_id(table: str, key_value: Any) -> str:
+    return str(uuid.uuid5(SEED_NAMESPACE, f"{table}:{key_value}"))
+
+
+class Checkpoint:
+    """Completed batch numbers per table, persisted after every batch"""
+
+    def __init__(self, path: Path, run_key: str, resume: bool):
+        self.path = path
+        self.run_key = run_key
+        self.done: Dict[str, set] = {}
+        if resume and path.exists():
+            saved = json.loads(path.read_text())
+            if saved.get("run_key") == run_key:
+                self.done = {table: set(batch_numbers) for table, batch_numbers in saved["done"].items()}
+
+    def is_done(self, table: str, batch_number: int) -> bool:
+        return batch_number in self.done.get(table, ())
+
+    def mark(self, table: str, batch_number: int):
+        self.done.setdefault(table, set()).add(batch_number)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({
+            "run_key": self.run_key,
+            "done": {table: sorted(numbers) for table, numbers in self.done.items()}
+        }))
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+class Migrator:
+    def __init__(self, target: repository.AsyncRepository, dry_run: bool = False, blind: bool = False,
+                 batch_size: int = 1000, concurrency: int = 8, checkpoint: Optional[Checkpoint] = None):
+        self.target = target
+        self.dry_run = dry_run
+        self.blind = blind
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.checkpoint = checkpoint
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.diffs: Dict[str, List[str]] = {}
+
+    def _record(self, table: str, outcome: str, count: int = 1):
+        counts = self.stats.setdefault(table, {"insert": 0, "update": 0, "unchanged": 0, "skipped": 0})
+        counts[outcome] += count
+
+    def _note_diff(self, table: str, key_value, existing: Dict[str, Any], row: Dict[str, Any]):
+        notes = self.diffs.setdefault(table, [])
+        if len(notes) >= 5:
+            return
+        changed = [k for k, v in row.items() if _comparable(v) != _comparable(existing.get(k))]
+        notes.append(f"{key_value}: {', '.join(changed)}")
+
+    async def _existing(self, table: str, spec: Dict[str, Any], rows: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        # Blind mode only makes sense where the id is the key; other tables stay small
+        if self.blind and spec.get("key") == "id":
+            return {}
+        if spec.get("singleton"):
+            row = await self.target.first(table)
+            return {None: row} if row else {}
+        key = spec["key"]
+        values = [row[key] for row in rows if row.get(key) is not None]
+        found = []
+        for start in range(0, len(values), FETCH_CHUNK):
+            found.extend(await self.target.select(table, [(key, "in", values[start:start + FETCH_CHUNK])]))
+        return {row[key]: row for row in found}
+
+    def _dedupe(self, table: str, spec: Dict[str, Any], rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Postgres rejects an upsert that touches one row twice; the last copy wins
+        unique = {}
+        for row in rows:
+            unique[None if spec.get("singleton") else row.get(spec["key"])] = row
+        self._record(table, "skipped", len(rows) - len(unique))
+        return list(unique.values())
+
+    async def _migrate_batch(self, table: str, rows: List[Dict[str, Any]]):
+        spec = TABLE_SPECS[table]
+        rows = self._dedupe(table, spec, rows)
+        existing = await self._existing(table, spec, rows)
+        timestamps = spec["timestamps"]
+        now = datetime.now(timezone.utc).isoformat()
+        inserts, updates = [], []
+
+        for source in rows:
+            row = dict(source)
+            key_value = None if spec.get("singleton") else row.get(spec["key"])
+            current = existing.get(key_value)
+
+            if current is None:
+                if "id" not in row:
+                    row["id"] = _natural_id(table, key_value if key_value is not None else table)
+                for field in timestamps:
+                    row.setdefault(field, now)
+                inserts.append(row)
+                continue
+
+            row["id"] = current["id"]
+            compared = {k: v for k, v in row.items() if k not in timestamps}
+            if all(_comparable(v) == _comparable(current.get(k)) for k, v in compared.items()):
+                self._record(table, "unchanged")
+            elif spec.get("insert_only"):
+                self._record(table, "skipped")
+            else:
+                self._note_diff(table, key_value or row["id"], current, compared)
+                if "updated_at" in timestamps:
+                    compared["updated_at"] = row.get("updated_at", now)
+                # Whole rows: MongoDB's upsert replaces the document
+                updates.append({**current, **compared})
+
+        self._record(table, "insert", len(inserts))
+        self._record(table, "update", len(updates))
+        if self.dry_run:
+            return
+        # Inserts and updates carry different column sets, so they go in separate upserts
+        for group in (inserts, updates):
+            if group:
+                await self.target.upsert(table, group)
+
+    async def migrate_table(self, table: str, rows: Iterable[Dict[str, Any]]):
+        """Migrate ``rows`` in concurrent batches; the first failure stops the table.
+
+        No batch is started after one fails, and the batches still in flight
+        are cancelled and awaited before the error propagates, so the caller
+        can close the target safely (see close_target).
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        failed = False
+
+        async def run(batch_number: int, batch: List[Dict[str, Any]]):
+            nonlocal failed
+            try:
+                await self._migrate_batch(table, batch)
+                if self.checkpoint and not self.dry_run:
+                    self.checkpoint.mark(table, batch_number)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                semaphore.release()
+
+        try:
+            for batch_number, batch in enumerate(batches(rows, self.batch_size)):
+                if self.checkpoint and self.checkpoint.is_done(table, batch_number):
+                    self._record(table, "skipped", len(batch))
+                    continue
+                # Bounded in-flight batches keep memory flat while streaming large snapshots
+                await semaphore.acquire()
+                if failed:
+                    break
+                tasks.append(asyncio.create_task(run(batch_number, batch)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def migrate(self, tables: Dict[str, Iterable[Dict[str, Any]]]):
+        for table in TABLE_SPECS:
+            if table in tables:
+                await self.migrate_table(table, tables[table])
+
+
+async def migrate_data(target_name: Optional[str] = None, snapshot: Optional[Path] = None, dry_run: bool = False,
+                       blind: bool = False, batch_size: int = 1000, concurrency: int = 8, resume: bool = True):
+    """Seed (or load a snapshot into) ``target_name``, by default the DATA_BACKEND database"""
+    target = open_target(target_name)
+    print(f"🚀 Starting data migration into {target.name}{' (dry run)' if dry_run else ''}...")
+    started = datetime.now(timezone.utc)
+
+    checkpoint = Checkpoint(CHECKPOINT_FILE, f"{target.name}:{source_fingerprint(snapshot)}", resume)
+    migrator = Migrator(target, dry_run=dry_run, blind=blind, batch_size=batch_size,
+                        concurrency=concurrency, checkpoint=checkpoint)
+    tables = snapshot_tables(snapshot) if snapshot else seed_tables()
+
+    try:
+        await migrator.migrate(tables)
     except Exception as e:
         print(f"❌ Migration failed: {e}")
+        print("ℹ️ Re-run the same command to resume from the last completed batch")
         raise
-    
     finally:
-        client.close()
+        close_target(target)
+
+    if not dry_run:
+        checkpoint.clear()
+
+    elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    print(f"\n{'📋 Dry run - no changes written' if dry_run else '🎉 Data migration completed successfully!'}")
+    for table, counts in migrator.stats.items():
+        print(f"   • {table}: {counts['insert']} insert, {counts['update']} update, "
+              f"{counts['unchanged']} unchanged, {counts['skipped']} skipped")
+        for note in migrator.diffs.get(table, []):
+            print(f"       ~ {note}")
+    print(f"   • Finished in {elapsed:.2f}s")
+    return migrator.stats
+
 
 if __name__ == "__main__":
-    asyncio.run(migrate_data())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed or migrate SYNERGY INDIA data")
+    parser.add_argument("--target", choices=BACKENDS, help="backend to write to (default: DATA_BACKEND, else supabase)")
+    parser.add_argument("--snapshot", type=Path, help="data.json-style file or directory of <table>.ndjson files")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--blind", action="store_true",
+                        help="skip reading existing rows and upsert everything (fastest for bulk loads)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--restart", action="store_true", help="ignore any saved checkpoint")
+    args = parser.parse_args()
+
+    asyncio.run(migrate_data(
+        target_name=args.target,
+        snapshot=args.snapshot,
+        dry_run=args.dry_run,
+        blind=args.blind,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        resume=not args.restart,
+    ))
@@ -0,0 +1,12 @@
+-- migrate:no-transaction
+-- Partial indexes for the public reads. The API uses the anon key, so RLS
+-- adds "is_active = true" to every select on gallery and services; an index
+-- whose predicate matches that covers only the rows anyone can see and comes
+-- back already in display order.
+--
+-- The plain indexes (idx_gallery_order, idx_gallery_is_active,
+-- idx_services_is_active) are left in place until explain_indexes.py has
+-- confirmed the plans; the is_active ones can go then, as a boolean that is
+-- true for nearly every row is never selective enough for the planner.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_gallery_active_order ON gallery ("order") WHERE is_active;
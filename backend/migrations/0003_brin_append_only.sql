@@ -0,0 +1,9 @@
+-- migrate:no-transaction
+-- BRIN index for status_checks, which anyone can insert into and nothing
+-- ever updates: rows land in timestamp order, so one summary per 32 heap
+-- pages lets the incremental backup skip straight to the rows past its high
+-- water mark. The index stays a few pages in size at millions of rows and
+-- costs next to nothing on insert, where a B-tree would grow with the table.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_status_checks_timestamp_brin
+    ON status_checks USING brin ("timestamp") WITH (pages_per_range = 32);
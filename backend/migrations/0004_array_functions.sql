@@ -0,0 +1,24 @@
+-- Atomic array edits for repository.array_append/array_remove: PostgREST
+-- can't express "images = array_append(images, ...)", and reading the array,
+-- changing it in Python and writing it back loses one of two concurrent
+-- uploads. Each function is one UPDATE ... RETURNING, called through RPC as
+-- <table>_<column>_append / _remove. SECURITY INVOKER (the default), so the
+-- caller's RLS policies still apply.
+
+CREATE OR REPLACE FUNCTION services_images_append(row_id UUID, value TEXT, max_length INTEGER DEFAULT NULL)
+RETURNS SETOF services
+LANGUAGE sql AS $$
+    UPDATE services
+    SET images = array_append(images, value), updated_at = NOW()
+    WHERE id = row_id AND (max_length IS NULL OR cardinality(images) < max_length)
+    RETURNING *;
+$$;
+
+CREATE OR REPLACE FUNCTION services_images_remove(row_id UUID, value TEXT)
+RETURNS SETOF services
+LANGUAGE sql AS $$
+    UPDATE services
+    SET images = array_remove(images, value), updated_at = NOW()
+    WHERE id = row_id AND value = ANY(images)
+    RETURNING *;
+$$;
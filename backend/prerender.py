@@ -0,0 +1,330 @@
+"""
+Prerendered HTML snapshots of the public pages
+
+The React build ships an empty ``<div id="root">``, so nothing paints until
+the bundle has loaded and run. For the public routes (home, services, each
+service and the gallery) this module renders the page content from the
+catalog and settings data into the build's index.html: title and meta
+description, and markup inside #root that React replaces when it mounts. The
+app renders from its own bundled content (frontend/src/mock.js), so no data
+is handed over; the snapshot only has to paint something close to it.
+
+Routes are the app's: a service page is ``/services/<n>``, n being the
+mock.js id, which the catalog ids end in (``civil-construction-001`` -> 1).
+Services without one (added through the admin API) have no page in the app,
+so none is prerendered.
+
+Snapshots are written to PRERENDER_DIR and shared by every worker. Writes to
+services, gallery or settings call invalidate(), which bumps a generation in
+shared memory; the next request for a page gets the plain index.html and
+kicks off a background re-render, so a request never waits on one.
+
+The same writes fire DeployHook when VERCEL_DEPLOY_HOOK_URL is set, so the
+static export Vercel serves (static_export.py) is rebuilt too. It is
+debounced: a burst of admin edits costs one deploy.
+"""
+
+import asyncio
+import html
+import logging
+import os
+import re
+import shutil
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import shared_cache
+
+logger = logging.getLogger(__name__)
+
+MARKER = ".generation"
+# Quiet period after the last write before the deploy hook fires
+DEPLOY_DELAY = float(os.environ.get('VERCEL_DEPLOY_DELAY_SECONDS', 60))
+# After a failed render (e.g. the database is down) wait this long before retrying
+RETRY_AFTER = 30.0
+DESCRIPTION_META = re.compile(r'<meta\s+name="description"[^>]*>')
+TITLE = re.compile(r"<title>.*?</title>", re.S)
+SERVICE_NUMBER = re.compile(r"-(\d{1,3})$")
+
+# Imported before gunicorn forks, so every worker (and every replacement
+# worker) shares it, while snapshots left by a previous deploy never match
+BOOT_ID = uuid.uuid4().hex
+
+PageData = Dict[str, Any]
+
+STYLE = """<style>
+.prerender{font-family:system-ui,sans-serif;color:#111827;max-width:80rem;margin:0 auto;padding:0 1rem}
+.prerender header,.prerender footer{display:flex;flex-wrap:wrap;gap:1rem;align-items:center;padding:1rem 0}
+.prerender nav a{margin-right:1rem;color:inherit}
+.prerender .grid{display:grid;gap:1.5rem;grid-template-columns:repeat(auto-fill,minmax(16rem,1fr));padding:0;list-style:none}
+.prerender img{max-width:100%;height:auto;border-radius:.5rem}
+</style>"""
+
+
+def _e(value: Any) -> str:
+    return html.escape("" if value is None else str(value), quote=True)
+
+
+def _list(items) -> str:
+    return "<ul>" + "".join(f"<li>{_e(item)}</li>" for item in items) + "</ul>"
+
+
+def _layout(data: PageData, main: str) -> str:
+    general = data["settings"]["general"]
+    cta = data["settings"]["cta"]
+    return f"""<div class="prerender">
+<header>
+<a href="/"><img src="{_e(general.get('logo_url'))}" alt="{_e(general.get('site_name'))} Logo" width="48" height="48"></a>
+<strong>{_e(general.get('site_name'))}</strong>
+<nav><a href="/">Home</a><a href="/about">About</a><a href="/services">Services</a><a href="/portfolio">Portfolio</a><a href="/gallery">Gallery</a><a href="/contact">Contact</a></nav>
+<a href="tel:{_e(cta.get('call_number'))}">{_e(cta.get('call_number'))}</a>
+</header>
+<main>{main}</main>
+<footer>
+<address>{_e(general.get('office_address'))}</address>
+<a href="tel:{_e(general.get('phone'))}">{_e(general.get('phone'))}</a>
+<a href="mailto:{_e(general.get('email'))}">{_e(general.get('email'))}</a>
+<span>{_e(general.get('office_hours'))}</span>
+</footer>
+</div>"""
+
+
+def service_route(service: Dict[str, Any]) -> Optional[str]:
+    """The app's URL for ``service``, if it has one"""
+    number = SERVICE_NUMBER.search(str(service["id"]))
+    return f"/services/{int(number.group(1))}" if number else None
+
+
+def _service_card(service: Dict[str, Any], eager: bool) -> str:
+    image = ""
+    if service.get("images"):
+        loading = "eager" if eager else "lazy"
+        image = f'<img src="{_e(service["images"][0])}" alt="{_e(service["title"])}" loading="{loading}">'
+    title = f'{image}<h3>{_e(service["title"])}</h3>'
+    route = service_route(service)
+    link = f'<a href="{_e(route)}">{title}</a>' if route else title
+    return f'<li>{link}<p>{_e(service.get("short_intro") or "")}</p></li>'
+
+
+
+def _services(data: PageData):
+    return [service for service in data["services"] if service.get("is_active", True)]
+
+
+def render_home(data: PageData):
+    site = data["settings"]["general"].get("site_name")
+    cards = "".join(_service_card(service, i < 3) for i, service in enumerate(_services(data)))
+    main = (f"<section><h1>{_e(site)}</h1><p>Construction, Agriculture &amp; Solar Solutions</p>"
+            f'<a href="{_e(data["settings"]["cta"].get("contact_page_link"))}">Get a free quote</a></section>'
+            f'<section><h2>Our Services</h2><ul class="grid">{cards}</ul></section>')
+    return f"{site} - Construction, Agriculture & Solar Solutions", "Civil construction, interiors, irrigation and solar plant installation.", main
+
+
+def render_services(data: PageData):
+    site = data["settings"]["general"].get("site_name")
+    cards = "".join(_service_card(service, i < 3) for i, service in enumerate(_services(data)))
+    main = f'<h1>Our Services</h1><ul class="grid">{cards}</ul>'
+    return f"Services - {site}", "Construction, interior, agriculture and solar services by " + str(site), main
+
+
+def render_service(data: PageData, service: Dict[str, Any]):
+    site = data["settings"]["general"].get("site_name")
+    images = "".join(
+        f'<img src="{_e(url)}" alt="{_e(service["title"])}" loading="{"eager" if i == 0 else "lazy"}">'
+        for i, url in enumerate(service.get("images", []))
+    )
+    main = (f'<a href="/services">Back to services</a><h1>{_e(service["title"])}</h1>{images}'
+            f'<p>{_e(service["overview"])}</p>'
+            f'<h2>What we offer</h2>{_list(service["sub_services"])}'
+            f'<h2>Benefits</h2>{_list(service["benefits"])}'
+            f'<a href="{_e(data["settings"]["cta"].get("contact_page_link"))}">{_e(service["cta_text"])}</a>')
+    return f'{service["title"]} - {site}', service.get("short_intro") or service["overview"][:160], main
+
+
+def render_gallery(data: PageData):
+    site = data["settings"]["general"].get("site_name")
+    items = "".join(
+        f'<li><figure><img src="{_e(image["url"])}" alt="{_e(image["alt_text"])}" loading="{"eager" if i < 3 else "lazy"}">'
+        f'<figcaption>{_e(image["caption"])}</figcaption></figure></li>'
+        for i, image in enumerate(sorted(data["gallery"], key=lambda image: image.get("order", 0)))
+        if image.get("is_active", True)
+    )
+    main = f'<h1>Gallery</h1><ul class="grid">{items}</ul>'
+    return f"Gallery - {site}", f"Photos of projects completed by {site}", main
+
+
+def render_pages(data: PageData) -> Dict[str, tuple]:
+    """(title, description, #root markup) for every prerendered route"""
+    pages = {
+        "/": render_home(data),
+        "/services": render_services(data),
+        "/gallery": render_gallery(data),
+    }
+    for service in _services(data):
+        route = service_route(service)
+        if route is not None:
+            pages[route] = render_service(data, service)
+    return {route: (title, description, _layout(data, main)) for route, (title, description, main) in pages.items()}
+
+
+def inject(template: str, title: str, description: str, content: str) -> str:
+    """Put a page into the build's index.html"""
+    head = STYLE
+    meta = f'<meta name="description" content="{_e(description)}" />'
+    document, replaced = DESCRIPTION_META.subn(lambda _: meta, template, count=1)
+    if not replaced:
+        head = meta + head
+    document = TITLE.sub(lambda _: f"<title>{_e(title)}</title>", document, count=1)
+    document = document.replace("</head>", head + "</head>", 1)
+    return document.replace('<div id="root"></div>', f'<div id="root">{content}</div>', 1)
+
+
+def _write_atomic(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    temp.write_text(text, encoding="utf-8")
+    os.replace(temp, path)
+
+
+class DeployHook:
+    """POSTs to a deploy hook ``delay`` seconds after the last trigger()"""
+
+    def __init__(self, url: str, delay: float = DEPLOY_DELAY):
+        self.url = url
+        self.delay = delay
+        self._task: Optional[asyncio.Task] = None
+
+    def trigger(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = asyncio.get_running_loop().create_task(self._fire(self.delay))
+
+    async def _fire(self, delay: float):
+        await asyncio.sleep(delay)
+        try:
+            await asyncio.to_thread(self._post)
+            logger.info("Triggered a static site rebuild")
+        except OSError as e:
+            logger.warning(f"Deploy hook failed, the static site is stale until the next deploy: {e}")
+
+    def _post(self):
+        with urllib.request.urlopen(urllib.request.Request(self.url, method="POST"), timeout=10):
+            pass
+
+    async def stop(self):
+        """Fire a pending rebuild now rather than lose it"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self._task = None
+            await self._fire(0)
+
+
+class Prerenderer:
+    """Disk cache of prerendered pages, regenerated in the background"""
+
+    def __init__(self, template: Path, output_dir: Path, load_data: Callable[[], Awaitable[PageData]],
+                 deploy_hook: Optional[DeployHook] = None):
+        self.template = Path(template)
+        self.output_dir = Path(output_dir)
+        self.load_data = load_data
+        self.deploy_hook = deploy_hook
+        self.generation = shared_cache.Generation()
+        self._fresh_token: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._failed_at = float("-inf")
+
+    @property
+    def token(self) -> str:
+        return f"{BOOT_ID}:{self.generation.current}"
+
+    def invalidate(self):
+        """Mark every snapshot stale (in all workers) and schedule a static rebuild"""
+        self.generation.bump()
+        if self.deploy_hook is not None:
+            self.deploy_hook.trigger()
+
+    def is_fresh(self) -> bool:
+        token = self.token
+        if self._fresh_token == token:
+            return True
+        # Another worker may have rendered this generation already
+        try:
+            on_disk = (self.output_dir / MARKER).read_text()
+        except OSError:
+            return False
+        if on_disk == token:
+            self._fresh_token = token
+            return True
+        return False
+
+    def page_path(self, route: str) -> Path:
+        route = route.strip("/")
+        return self.output_dir / route / "index.html" if route else self.output_dir / "index.html"
+
+    def lookup(self, route: str) -> Optional[Path]:
+        """Snapshot for ``route`` if it's current, else None (and start a re-render)"""
+        if not self.template.exists():
+            return None
+        if not self.is_fresh():
+            self.refresh()
+            return None
+        path = self.page_path(route).resolve()
+        if not path.is_relative_to(self.output_dir.resolve()):
+            return None
+        return path if path.is_file() else None
+
+    def refresh(self):
+        """Re-render in the background if stale, unless a render is already running"""
+        if self.is_fresh() or not self.template.exists():
+            return
+        if time.monotonic() - self._failed_at < RETRY_AFTER:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._regenerate_logged())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.deploy_hook is not None:
+            await self.deploy_hook.stop()
+
+    async def _regenerate_logged(self):
+        try:
+            await self.regenerate()
+        except Exception:
+            self._failed_at = time.monotonic()
+            logger.exception("Prerendering public pages failed")
+
+    async def regenerate(self) -> int:
+        """Render every page now; returns the number written"""
+        if not self.template.exists():
+            return 0
+        # Taken before loading, so an invalidation during the render leaves it stale
+        token = self.token
+        data = await self.load_data()
+        count = await asyncio.to_thread(self._write, data, token)
+        self._fresh_token = token
+        logger.info(f"Prerendered {count} public pages")
+        return count
+
+    def _write(self, data: PageData, token: str) -> int:
+        template = self.template.read_text(encoding="utf-8")
+        pages = render_pages(data)
+        for route, (title, description, content) in pages.items():
+            _write_atomic(self.page_path(route), inject(template, title, description, content))
+
+        # Drop pages of services that no longer exist
+        services_dir = self.output_dir / "services"
+        for child in services_dir.iterdir() if services_dir.is_dir() else ():
+            if child.is_dir() and f"/services/{child.name}" not in pages:
+                shutil.rmtree(child, ignore_errors=True)
+
+        _write_atomic(self.output_dir / MARKER, token)
+        return len(pages)
@@ -0,0 +1,144 @@
+"""
+Event-loop stall detection and on-demand stack sampling
+
+StallWatchdog keeps a heartbeat task on the event loop and a plain thread
+watching it. When the heartbeat is late by more than the threshold, the
+thread grabs the loop thread's current stack (``sys._current_frames``) -
+i.e. whatever synchronous code is hogging the loop - and logs it along with
+the task that was running.
+
+sample_stacks() polls a thread's stack at a fixed interval and aggregates
+the samples in the folded format read by flamegraph.pl, speedscope and
+inferno (``frame;frame;frame count`` per line).
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STALL_THRESHOLD = float(os.environ.get('LOOP_STALL_THRESHOLD_MS', 250)) / 1000
+HEARTBEAT_INTERVAL = 0.05
+MAX_PROFILE_SECONDS = 60.0
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _folded(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StallWatchdog:
+    """Reports event-loop stalls longer than ``threshold`` seconds"""
+
+    def __init__(self, threshold: float = STALL_THRESHOLD, history: int = 50,
+                 on_stall: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.threshold = threshold
+        self.on_stall = on_stall
+        self.stalls = deque(maxlen=history)
+        self._beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._heartbeat = self._loop.create_task(self._beat_forever())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-stall-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+
+    @property
+    def loop_thread(self) -> Optional[int]:
+        return self._loop_thread
+
+    async def _beat_forever(self):
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def _watch(self):
+        stall = None
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            late = time.monotonic() - self._beat - HEARTBEAT_INTERVAL
+            if late > self.threshold and stall is None:
+                stall = self._capture(late)
+            elif late <= self.threshold and stall is not None:
+                # The heartbeat ran again: the stall is over, record its length
+                stall["duration_ms"] = round((time.monotonic() - stall.pop("_started")) * 1000, 1)
+                self.stalls.append(stall)
+                logger.warning(
+                    f"Event loop blocked for {stall['duration_ms']:.0f}ms in task {stall['task']}\n"
+                    + "".join(stall["stack"])
+                )
+                if self.on_stall is not None:
+                    self.on_stall(stall)
+                stall = None
+
+    def _capture(self, late: float) -> Dict[str, Any]:
+        frame = sys._current_frames().get(self._loop_thread)
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        return {
+            "_started": time.monotonic() - late,
+            "detected_at": datetime.now(timezone.utc).isoformat(),
+            "task": task.get_name() if task else None,
+            "coroutine": getattr(task.get_coro(), "__qualname__", None) if task else None,
+            "stack": traceback.format_stack(frame) if frame is not None else [],
+        }
+
+    def recent(self) -> List[Dict[str, Any]]:
+        return list(reversed(self.stalls))
+
+
+def sample_stacks(seconds: float, interval: float = 0.005, thread_ids: Optional[List[int]] = None) -> str:
+    """Sample stacks for ``seconds`` and return them in folded format.
+
+    Blocks the calling thread; run it with ``asyncio.to_thread`` so the
+    loop being profiled keeps running. ``thread_ids=None`` samples every
+    thread except the sampler.
+    """
+    seconds = min(seconds, MAX_PROFILE_SECONDS)
+    own = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    counts: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own or (thread_ids is not None and thread_id not in thread_ids):
+                continue
+            counts[f"{names.get(thread_id, thread_id)};{_folded(frame)}"] += 1
+        time.sleep(interval)
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
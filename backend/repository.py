@@ -0,0 +1,754 @@
+"""
+Backend-agnostic data access for the SYNERGY INDIA API
+
+The app talks to its tables through one small interface - select with
+filters, ordering and keyset/offset pagination, count, insert, upsert,
+update, delete - with an adapter per database:
+
+- SupabaseRepository: PostgREST through the supabase-py client
+- MongoRepository: a MongoDB database through pymongo (one collection per
+  table, rows keyed by their ``id`` field like the Supabase tables)
+- SqliteRepository: a local SQLite file in WAL mode with the same tables
+  (sqlite_schema.sql), for single-node installs and offline load tests
+
+Adapters are synchronous, because the Supabase SDK is, and because the
+backup, archive and analytics jobs already run in worker threads and use
+them directly. Request handlers use AsyncRepository, which runs each call in a
+worker thread so a slow round trip never blocks the event loop.
+
+DATA_BACKEND (supabase | mongo | sqlite) picks the adapter; see from_env().
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import AsyncExitStack, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import instrumentation
+import limits
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+# (column, op, value) with op one of eq, neq, gt, gte, lt, lte, in
+Filter = Tuple[str, str, Any]
+# (column, descending)
+Order = Tuple[str, bool]
+
+OPS = ("eq", "neq", "gt", "gte", "lt", "lte", "in")
+# PostgREST's "function not in the schema cache", and Postgres' undefined_function
+MISSING_FUNCTION = ("PGRST202", "42883")
+# Tries of the read-modify-write array edit before giving up on a busy row
+ARRAY_EDIT_ATTEMPTS = 5
+
+
+def _check(where: Sequence[Filter]):
+    for column, op, _ in where:
+        if op not in OPS:
+            raise ValueError(f"Unsupported filter '{op}' on {column}")
+
+
+class Repository(ABC):
+    """Synchronous table access; every row is a plain dict with an ``id``"""
+
+    name = ""
+
+    @abstractmethod
+    def select(self, table: str, where: Sequence[Filter] = (), order: Sequence[Order] = (),
+               limit: Optional[int] = None, offset: int = 0, columns: Optional[Sequence[str]] = None,
+               after: Optional[Tuple[Any, Any]] = None) -> List[Row]:
+        """Matching rows.
+
+        ``after=(value, id)`` continues a keyset scan: only rows strictly
+        after that position in ``order`` (its first column, then ``id``).
+        """
+
+    @abstractmethod
+    def count(self, table: str, where: Sequence[Filter] = ()) -> int:
+        pass
+
+    @abstractmethod
+    def insert(self, table: str, row: Row) -> Row:
+        """Insert one row and return it as stored"""
+
+    @abstractmethod
+    def upsert(self, table: str, rows: List[Row]):
+        """Insert or replace rows by ``id``"""
+
+    @abstractmethod
+    def update(self, table: str, where: Sequence[Filter], changes: Row) -> List[Row]:
+        """Apply ``changes`` to the matching rows; returns them as updated"""
+
+    @abstractmethod
+    def delete(self, table: str, where: Sequence[Filter]) -> int:
+        """Delete the matching rows; returns how many there were"""
+
+    @abstractmethod
+    def array_append(self, table: str, row_id: Any, column: str, value: Any,
+                     max_length: Optional[int] = None) -> Optional[Row]:
+        """Append ``value`` to the array ``column`` of one row and stamp its
+        ``updated_at``, in a single atomic write.
+
+        Returns the updated row, or None when there is no such row or its
+        array already holds ``max_length`` items.
+        """
+
+    @abstractmethod
+    def array_remove(self, table: str, row_id: Any, column: str, value: Any) -> Optional[Row]:
+        """Remove ``value`` from the array ``column`` of one row (atomically,
+        like array_append); None when there is no such row or no such value.
+        """
+
+    @abstractmethod
+    def ping(self):
+        """Raise if the database is unreachable (used by the readiness probe)"""
+
+    def get(self, table: str, row_id: Any) -> Optional[Row]:
+        rows = self.select(table, [("id", "eq", row_id)], limit=1)
+        return rows[0] if rows else None
+
+    def first(self, table: str) -> Optional[Row]:
+        """Any one row: the settings tables hold a single row each"""
+        rows = self.select(table, limit=1)
+        return rows[0] if rows else None
+
+
+class SupabaseRepository(Repository):
+    name = "supabase"
+
+    def __init__(self, client):
+        self.client = client
+        # Functions the database turned out not to have (migrations/0004 not run)
+        self._missing_functions = set()
+
+    @staticmethod
+    def _quote(value: Any) -> str:
+        # PostgREST needs values with reserved characters (. : ,) double-quoted
+        return '"' + str(value).replace('"', '\\"') + '"'
+
+    def _filter(self, query, where: Sequence[Filter]):
+        _check(where)
+        for column, op, value in where:
+            query = query.in_(column, list(value)) if op == "in" else getattr(query, op)(column, value)
+        return query
+
+    def select(self, table, where=(), order=(), limit=None, offset=0, columns=None, after=None):
+        query = self._filter(self.client.table(table).select(",".join(columns) if columns else "*"), where)
+        if after is not None:
+            column, descending = order[0] if order else ("id", False)
+            direction = "lt" if descending else "gt"
+            value, row_id = after
+            if column == "id":
+                query = getattr(query, direction)("id", row_id)
+            else:
+                value = self._quote(value)
+                query = query.or_(f"{column}.{direction}.{value},and({column}.eq.{value},id.{direction}.{row_id})")
+        for column, descending in order:
+            query = query.order(column, desc=descending)
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        elif offset:
+            raise ValueError("offset needs a limit")
+        return query.execute().data
+
+    def count(self, table, where=()):
+        return self._filter(self.client.table(table).select("id", count="exact", head=True), where).execute().count
+
+    def insert(self, table, row):
+        return self.client.table(table).insert(row).execute().data[0]
+
+    def upsert(self, table, rows):
+        if rows:
+            self.client.table(table).upsert(rows).execute()
+
+    def update(self, table, where, changes):
+        return self._filter(self.client.table(table).update(changes), where).execute().data
+
+    def delete(self, table, where):
+        return len(self._filter(self.client.table(table).delete(), where).execute().data)
+
+    # PostgREST can't express "column = array_append(column, ...)", so these
+    # call the <table>_<column>_append/_remove functions from migrations/,
+    # and read, change and write back the array on databases without them
+    def array_append(self, table, row_id, column, value, max_length=None):
+        params = {"row_id": row_id, "value": value, "max_length": max_length}
+        rows = self._rpc(f"{table}_{column}_append", params)
+        if rows is None:
+            def append(values):
+                return None if max_length is not None and len(values) >= max_length else values + [value]
+            return self._edit_array(table, row_id, column, append)
+        return rows[0] if rows else None
+
+    def array_remove(self, table, row_id, column, value):
+        rows = self._rpc(f"{table}_{column}_remove", {"row_id": row_id, "value": value})
+        if rows is None:
+            return self._edit_array(table, row_id, column,
+                                    lambda values: [item for item in values if item != value] if value in values else None)
+        return rows[0] if rows else None
+
+    def _rpc(self, function: str, params: Dict[str, Any]) -> Optional[List[Row]]:
+        """Rows returned by ``function``; None if the database doesn't have it"""
+        if function in self._missing_functions:
+            return None
+        try:
+            return self.client.rpc(function, params).execute().data
+        except Exception as e:
+            if getattr(e, "code", None) not in MISSING_FUNCTION:
+                raise
+            self._missing_functions.add(function)
+            logger.warning(f"{function}() is missing (run migrations/0004_array_functions.sql); "
+                           f"falling back to read-modify-write")
+            return None
+
+    def _edit_array(self, table, row_id, column, edit: Callable[[List[Any]], Optional[List[Any]]]) -> Optional[Row]:
+        """Write back ``edit(array)`` (None: leave the row alone) unless the row changed since it was read"""
+        for _ in range(ARRAY_EDIT_ATTEMPTS):
+            row = self.get(table, row_id)
+            if row is None:
+                return None
+            values = edit(list(row.get(column) or []))
+            if values is None:
+                return None
+            changes = {column: values, "updated_at": datetime.now(timezone.utc).isoformat()}
+            query = self.client.table(table).update(changes).eq("id", row_id)
+            # Compare-and-set on updated_at: a concurrent edit makes this match nothing
+            if row.get("updated_at") is None:
+                query = query.is_("updated_at", "null")
+            else:
+                query = query.eq("updated_at", row["updated_at"])
+            rows = query.execute().data
+            if rows:
+                return rows[0]
+        raise RuntimeError(f"{table} {row_id} kept changing while editing its {column}")
+
+    def ping(self):
+        self.client.table('admin_users').select('id').limit(1).execute()
+
+
+class MongoRepository(Repository):
+    name = "mongo"
+
+    MONGO_OPS = {"eq": "$eq", "neq": "$ne", "gt": "$gt", "gte": "$gte", "lt": "$lt", "lte": "$lte", "in": "$in"}
+
+    def __init__(self, database):
+        self.db = database
+
+    def _match(self, where: Sequence[Filter]) -> Dict[str, Any]:
+        _check(where)
+        match: Dict[str, Dict[str, Any]] = {}
+        for column, op, value in where:
+            match.setdefault(column, {})[self.MONGO_OPS[op]] = list(value) if op == "in" else value
+        return match
+
+    @staticmethod
+    def _projection(columns: Optional[Sequence[str]]) -> Dict[str, int]:
+        projection = {"_id": 0}
+        if columns:
+            projection.update({column: 1 for column in columns})
+        return projection
+
+    def select(self, table, where=(), order=(), limit=None, offset=0, columns=None, after=None):
+        match = self._match(where)
+        if after is not None:
+            column, descending = order[0] if order else ("id", False)
+            direction = "$lt" if descending else "$gt"
+            value, row_id = after
+            if column == "id":
+                match = {"$and": [match, {"id": {direction: row_id}}]}
+            else:
+                match = {"$and": [match, {"$or": [
+                    {column: {direction: value}},
+                    {column: value, "id": {direction: row_id}},
+                ]}]}
+        cursor = self.db[table].find(match, self._projection(columns))
+        if order:
+            cursor = cursor.sort([(column, -1 if descending else 1) for column, descending in order])
+        if offset:
+            cursor = cursor.skip(offset)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    def count(self, table, where=()):
+        return self.db[table].count_documents(self._match(where))
+
+    def insert(self, table, row):
+        # insert_one adds _id to the document it's given
+        self.db[table].insert_one(dict(row))
+        return dict(row)
+
+    def upsert(self, table, rows):
+        from pymongo import ReplaceOne
+
+        if rows:
+            self.db[table].bulk_write([ReplaceOne({"id": row["id"]}, row, upsert=True) for row in rows], ordered=False)
+
+    def update(self, table, where, changes):
+        from pymongo import ReturnDocument
+
+        collection = self.db[table]
+        if len(where) == 1 and tuple(where[0][:2]) == ("id", "eq"):
+            # ids are unique: update and read back in one round trip
+            row = collection.find_one_and_update(self._match(where), {"$set": changes},
+                                                 projection={"_id": 0}, return_document=ReturnDocument.AFTER)
+            return [row] if row is not None else []
+        ids = [row["id"] for row in collection.find(self._match(where), {"_id": 0, "id": 1})]
+        if not ids:
+            return []
+        collection.update_many({"id": {"$in": ids}}, {"$set": changes})
+        return list(collection.find({"id": {"$in": ids}}, {"_id": 0}))
+
+    def delete(self, table, where):
+        return self.db[table].delete_many(self._match(where)).deleted_count
+
+    def array_append(self, table, row_id, column, value, max_length=None):
+        from pymongo import ReturnDocument
+
+        match = {"id": row_id}
+        if max_length is not None:
+            # No element at index max_length - 1: fewer than max_length items
+            match[f"{column}.{max_length - 1}"] = {"$exists": False}
+        return self.db[table].find_one_and_update(
+            match, {"$push": {column: value}, "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}},
+            projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+        )
+
+    def array_remove(self, table, row_id, column, value):
+        from pymongo import ReturnDocument
+
+        return self.db[table].find_one_and_update(
+            {"id": row_id, column: value},
+            {"$pull": {column: value}, "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}},
+            projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+        )
+
+    def ping(self):
+        self.db.command("ping")
+
+
+SQLITE_SCHEMA = Path(__file__).parent / "sqlite_schema.sql"
+SQL_OPS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _ident(name: str) -> str:
+    return '"' + name + '"'
+
+
+def _where_sql(where: Tuple[Tuple[str, str], ...]) -> List[str]:
+    # "in" binds its values as one JSON array, so the statement text (and the
+    # compiled statement) is the same whatever the number of values
+    return [
+        f"{_ident(column)} IN (SELECT value FROM json_each(?))" if op == "in" else f"{_ident(column)} {SQL_OPS[op]} ?"
+        for column, op in where
+    ]
+
+
+@functools.lru_cache(maxsize=512)
+def _select_sql(table: str, where: Tuple[Tuple[str, str], ...], order: Tuple[Order, ...], columns: Optional[Tuple[str, ...]],
+                after: bool, limit: bool, offset: bool, count: bool = False) -> str:
+    """Statement text for one query shape (values are always bound)"""
+    conditions = _where_sql(where)
+    if after:
+        column, descending = order[0] if order else ("id", False)
+        direction = "<" if descending else ">"
+        conditions.append(f"id {direction} ?" if column == "id" else f"({_ident(column)}, id) {direction} (?, ?)")
+    if count:
+        selected = "count(*)"
+    else:
+        selected = ", ".join(_ident(column) for column in columns) if columns else "*"
+    sql = f"SELECT {selected} FROM {_ident(table)}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if order:
+        sql += " ORDER BY " + ", ".join(f"{_ident(column)} {'DESC' if descending else 'ASC'}" for column, descending in order)
+    if limit or offset:
+        sql += " LIMIT ?" + (" OFFSET ?" if offset else "")
+    return sql
+
+
+@functools.lru_cache(maxsize=512)
+def _write_sql(kind: str, table: str, columns: Tuple[str, ...], where: Tuple[Tuple[str, str], ...] = ()) -> str:
+    names = ", ".join(_ident(column) for column in columns)
+    if kind == "insert":
+        return f"INSERT INTO {_ident(table)} ({names}) VALUES ({', '.join('?' * len(columns))}) RETURNING *"
+    if kind == "upsert":
+        changes = ", ".join(f"{_ident(column)} = excluded.{_ident(column)}" for column in columns if column != "id")
+        action = f"DO UPDATE SET {changes}" if changes else "DO NOTHING"
+        return f"INSERT INTO {_ident(table)} ({names}) VALUES ({', '.join('?' * len(columns))}) ON CONFLICT (id) {action}"
+    if kind == "array_append":
+        column, = columns
+        return (f"UPDATE {_ident(table)} SET {_ident(column)} = json_insert({_ident(column)}, '$[#]', ?), updated_at = ? "
+                f"WHERE id = ? AND (? IS NULL OR json_array_length({_ident(column)}) < ?) RETURNING *")
+    if kind == "array_remove":
+        column, = columns
+        return (f"UPDATE {_ident(table)} SET {_ident(column)} = "
+                f"(SELECT json_group_array(value) FROM json_each({_ident(column)}) WHERE value IS NOT ?), updated_at = ? "
+                f"WHERE id = ? AND EXISTS (SELECT 1 FROM json_each({_ident(column)}) WHERE value IS ?) RETURNING *")
+    conditions = " WHERE " + " AND ".join(_where_sql(where)) if where else ""
+    if kind == "update":
+        changes = ", ".join(f"{_ident(column)} = ?" for column in columns)
+        return f"UPDATE {_ident(table)} SET {changes}{conditions} RETURNING *"
+    return f"DELETE FROM {_ident(table)}{conditions} RETURNING id"
+
+
+class SqliteRepository(Repository):
+    """Tables in a local SQLite database (see sqlite_schema.sql).
+
+    The database runs in WAL mode, so readers never wait for the writer.
+    Connections come from a pool of ``pool_size``, one per concurrent caller,
+    and each keeps its compiled statements (sqlite3's statement cache): the
+    statement text depends only on the query shape, so a repeated query just
+    binds new values. Writes in this process are serialized and take the
+    write lock up front (BEGIN IMMEDIATE); other processes on the same file
+    (gunicorn workers) wait up to ``busy_timeout`` seconds for it.
+
+    Columns declared JSON (the Postgres TEXT[] and JSONB ones) are stored as
+    JSON text and BOOLEAN ones as 0/1; both come back as Python values.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, pool_size: int = 8, busy_timeout: float = 5.0,
+                 statement_cache: int = 256, schema: Path = SQLITE_SCHEMA):
+        self.path = str(path)
+        self.pool_size = pool_size
+        self.busy_timeout = busy_timeout
+        self.statement_cache = statement_cache
+        self._pool_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._reset_pool()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            # In one write transaction, so workers starting together seed the defaults once
+            connection.executescript(f"BEGIN IMMEDIATE;\n{Path(schema).read_text()}\nCOMMIT;")
+            tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            # table -> column -> declared type
+            self.columns: Dict[str, Dict[str, str]] = {
+                table: {column: kind.upper() for _, column, kind, *_ in connection.execute(f"PRAGMA table_info({_ident(table)})")}
+                for table in tables
+            }
+
+    def _reset_pool(self):
+        self._pid = os.getpid()
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, isolation_level=None,
+            check_same_thread=False, cached_statements=self.statement_cache,
+        )
+        connection.create_function("gen_random_uuid", 0, lambda: str(uuid.uuid4()))
+        # NORMAL is durable across process crashes in WAL mode; a power cut
+        # can only lose the last few commits, never corrupt the file
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        connection.execute("PRAGMA cache_size=-16000")
+        connection.execute("PRAGMA mmap_size=268435456")
+        return connection
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        if self._pid != os.getpid():
+            # Connections must not cross a fork; the child opens its own
+            with self._pool_lock:
+                if self._pid != os.getpid():
+                    self._reset_pool()
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                opened = self._opened < self.pool_size
+                if opened:
+                    self._opened += 1
+            try:
+                connection = self._connect() if opened else self._idle.get(timeout=self.busy_timeout)
+            except queue.Empty:
+                # Every connection stayed busy: shed the call (503) like a full limiter queue
+                raise limits.Overloaded("database", max(int(self.busy_timeout), 1)) from None
+        try:
+            yield connection
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle.put(connection)
+
+    def _table(self, table: str, *columns: str) -> Dict[str, str]:
+        known = self.columns.get(table)
+        if known is None:
+            raise ValueError(f"Unknown table '{table}'")
+        for column in columns:
+            if column not in known:
+                raise ValueError(f"Unknown column '{column}' in {table}")
+        return known
+
+    @staticmethod
+    def _param(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (list, dict)):
+            return json.dumps(value)
+        return value
+
+    def _encode(self, table: str, row: Row, columns: Sequence[str]) -> Tuple[Any, ...]:
+        kinds = self.columns[table]
+        return tuple(
+            json.dumps(row[column]) if kinds[column] == "JSON" and row[column] is not None else self._param(row[column])
+            for column in columns
+        )
+
+    def _decode(self, table: str, cursor: sqlite3.Cursor) -> List[Row]:
+        kinds = self.columns[table]
+        names = [description[0] for description in cursor.description]
+        rows = []
+        for values in cursor.fetchall():
+            row = dict(zip(names, values))
+            for column in names:
+                value = row[column]
+                if value is None:
+                    continue
+                if kinds.get(column) == "JSON":
+                    row[column] = json.loads(value)
+                elif kinds.get(column) == "BOOLEAN":
+                    row[column] = bool(value)
+            rows.append(row)
+        return rows
+
+    def _where(self, table: str, where: Sequence[Filter]) -> Tuple[Tuple[Tuple[str, str], ...], List[Any]]:
+        _check(where)
+        self._table(table, *(column for column, _, _ in where))
+        shape = tuple((column, op) for column, op, _ in where)
+        params = [json.dumps([self._param(item) for item in value]) if op == "in" else self._param(value)
+                  for _, op, value in where]
+        return shape, params
+
+    @contextmanager
+    def _timed(self, table: str, operation: str, where: Sequence[Filter]):
+        # Same per-request accounting as the Supabase and MongoDB clients
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = instrumentation.current()
+            if timings is not None:
+                filters = tuple(column for column, _, _ in where)
+                timings.record("db", table, operation, filters, time.perf_counter() - started)
+
+    def _write(self, table: str, operation: str, where: Sequence[Filter], sql: str,
+               params: Sequence[Any] = (), many: bool = False) -> List[Row]:
+        with self._timed(table, operation, where), self._write_lock, self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            if many:
+                connection.executemany(sql, params)
+                rows = []
+            else:
+                rows = self._decode(table, connection.execute(sql, params))
+            connection.execute("COMMIT")
+            return rows
+
+    def select(self, table, where=(), order=(), limit=None, offset=0, columns=None, after=None):
+        shape, params = self._where(table, where)
+        order = tuple(order)
+        self._table(table, *(column for column, _ in order), *(columns or ()))
+        if after is not None:
+            value, row_id = after
+            first = order[0][0] if order else "id"
+            params += [row_id] if first == "id" else [self._param(value), row_id]
+        if limit is not None or offset:
+            params.append(-1 if limit is None else limit)
+        if offset:
+            params.append(offset)
+        sql = _select_sql(table, shape, order, tuple(columns) if columns else None,
+                          after is not None, limit is not None or bool(offset), bool(offset))
+        with self._timed(table, "select", where), self._connection() as connection:
+            return self._decode(table, connection.execute(sql, params))
+
+    def count(self, table, where=()):
+        shape, params = self._where(table, where)
+        sql = _select_sql(table, shape, (), None, False, False, False, count=True)
+        with self._timed(table, "count", where), self._connection() as connection:
+            return connection.execute(sql, params).fetchone()[0]
+
+    def insert(self, table, row):
+        if row.get("id") is None:
+            row = {**row, "id": str(uuid.uuid4())}
+        columns = tuple(row)
+        self._table(table, *columns)
+        return self._write(table, "insert", (), _write_sql("insert", table, columns), self._encode(table, row, columns))[0]
+
+    def upsert(self, table, rows):
+        # One statement per set of columns, each run for all of its rows
+        groups: Dict[Tuple[str, ...], List[Row]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+        for columns, group in groups.items():
+            self._table(table, "id", *columns)
+            params = [self._encode(table, row, columns) for row in group]
+            self._write(table, "upsert", (), _write_sql("upsert", table, columns), params, many=True)
+
+    def update(self, table, where, changes):
+        shape, params = self._where(table, where)
+        columns = tuple(changes)
+        self._table(table, *columns)
+        if not columns:
+            return self.select(table, where)
+        sql = _write_sql("update", table, columns, shape)
+        return self._write(table, "update", where, sql, [*self._encode(table, changes, columns), *params])
+
+    def delete(self, table, where):
+        shape, params = self._where(table, where)
+        return len(self._write(table, "delete", where, _write_sql("delete", table, (), shape), params))
+
+    def array_append(self, table, row_id, column, value, max_length=None):
+        self._table(table, column, "updated_at")
+        sql = _write_sql("array_append", table, (column,))
+        params = (self._param(value), datetime.now(timezone.utc).isoformat(), row_id, max_length, max_length)
+        rows = self._write(table, "update", [("id", "eq", row_id)], sql, params)
+        return rows[0] if rows else None
+
+    def array_remove(self, table, row_id, column, value):
+        self._table(table, column, "updated_at")
+        sql = _write_sql("array_remove", table, (column,))
+        params = (self._param(value), datetime.now(timezone.utc).isoformat(), row_id, self._param(value))
+        rows = self._write(table, "update", [("id", "eq", row_id)], sql, params)
+        return rows[0] if rows else None
+
+    def ping(self):
+        with self._connection() as connection:
+            connection.execute("SELECT 1").fetchone()
+
+    def close(self):
+        """Close the idle connections (the pool reopens them on demand)"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
+            with self._pool_lock:
+                self._opened -= 1
+
+
+def _finished(release: Optional[Callable[[bool], None]], call: asyncio.Future):
+    # Also retrieves the exception of a call nobody is waiting for any more
+    failed = call.cancelled() or call.exception() is not None
+    if release is not None:
+        release(failed)
+
+
+class AsyncRepository:
+    """Awaitable view of a Repository for request handlers.
+
+    Every call runs in a worker thread (copying the request's context, so
+    instrumentation still attributes the round trip to the request). Each
+    call optionally passes a ``breaker`` (resilience.CircuitBreaker, may raise
+    resilience.CircuitOpen) and then takes a slot of a ``limiter``
+    (limits.AdaptiveLimiter, may raise limits.Overloaded). A call still
+    running after ``timeout`` seconds raises TimeoutError; the worker thread
+    finishes it in the background and keeps its limiter slot until it does,
+    so timed-out calls can't pile up past the limit. Nothing is rolled back:
+    a write that timed out may still be applied.
+    """
+
+    def __init__(self, repository: Repository, limiter=None, breaker=None, timeout: Optional[float] = None):
+        self.sync = repository
+        self.limiter = limiter
+        self.breaker = breaker
+        self.timeout = timeout
+
+    async def _run(self, fn: Callable, *args):
+        async with AsyncExitStack() as stack:
+            if self.breaker is not None:
+                await stack.enter_async_context(self.breaker.guard())
+            release = await self.limiter.acquire() if self.limiter is not None else None
+            call = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+            # The slot is given back when the thread is done, not when the caller stops waiting
+            call.add_done_callback(functools.partial(_finished, release))
+            # Shielded: a timeout or cancellation ends the wait, not the call
+            return await asyncio.wait_for(asyncio.shield(call), self.timeout)
+
+    @property
+    def name(self) -> str:
+        return self.sync.name
+
+    async def select(self, table: str, where: Sequence[Filter] = (), order: Sequence[Order] = (),
+                     limit: Optional[int] = None, offset: int = 0, columns: Optional[Sequence[str]] = None,
+                     after: Optional[Tuple[Any, Any]] = None) -> List[Row]:
+        return await self._run(self.sync.select, table, where, order, limit, offset, columns, after)
+
+    async def count(self, table: str, where: Sequence[Filter] = ()) -> int:
+        return await self._run(self.sync.count, table, where)
+
+    async def insert(self, table: str, row: Row) -> Row:
+        return await self._run(self.sync.insert, table, row)
+
+    async def upsert(self, table: str, rows: List[Row]):
+        await self._run(self.sync.upsert, table, rows)
+
+    async def update(self, table: str, where: Sequence[Filter], changes: Row) -> List[Row]:
+        return await self._run(self.sync.update, table, where, changes)
+
+    async def delete(self, table: str, where: Sequence[Filter]) -> int:
+        return await self._run(self.sync.delete, table, where)
+
+    async def array_append(self, table: str, row_id: Any, column: str, value: Any,
+                           max_length: Optional[int] = None) -> Optional[Row]:
+        return await self._run(self.sync.array_append, table, row_id, column, value, max_length)
+
+    async def array_remove(self, table: str, row_id: Any, column: str, value: Any) -> Optional[Row]:
+        return await self._run(self.sync.array_remove, table, row_id, column, value)
+
+    async def ping(self):
+        await self._run(self.sync.ping)
+
+    async def get(self, table: str, row_id: Any) -> Optional[Row]:
+        return await self._run(self.sync.get, table, row_id)
+
+    async def first(self, table: str) -> Optional[Row]:
+        return await self._run(self.sync.first, table)
+
+
+def from_env(client_getter: Optional[Callable] = None, default: str = "supabase") -> Repository:
+    """Adapter chosen by DATA_BACKEND.
+
+    supabase: the client from ``client_getter``
+    mongo:    MONGO_URL and DB_NAME (needs pymongo)
+    sqlite:   SQLITE_PATH (default synergy.db), SQLITE_POOL_SIZE connections
+    """
+    backend = os.environ.get('DATA_BACKEND', default).lower()
+    if backend == "supabase":
+        return SupabaseRepository(client_getter())
+    if backend == "mongo":
+        try:
+            from pymongo import MongoClient
+        except ImportError:
+            raise RuntimeError("DATA_BACKEND=mongo needs pymongo: pip install pymongo")
+        import instrumentation
+
+        client = MongoClient(os.environ['MONGO_URL'], event_listeners=[instrumentation.MongoCommandListener()])
+        return MongoRepository(client[os.environ['DB_NAME']])
+    if backend == "sqlite":
+        return SqliteRepository(os.environ.get('SQLITE_PATH', 'synergy.db'),
+                                pool_size=int(os.environ.get('SQLITE_POOL_SIZE', 8)))
+    raise ValueError(f"Unknown DATA_BACKEND '{backend}' (use supabase, mongo or sqlite)")
+
+
+def supabase_from_env():
+    """Supabase client from SUPABASE_URL and SUPABASE_ANON_KEY (for the CLI tools)"""
+    from supabase import create_client
+
+    return create_client(os.environ['SUPABASE_URL'], os.environ['SUPABASE_ANON_KEY'])
@@ -0,0 +1,286 @@
+"""
+Failure isolation for the SYNERGY INDIA API's data layer
+
+CircuitBreaker wraps every database call (repository.AsyncRepository). After
+FAILURE_THRESHOLD consecutive failures (errors, or calls that outlived the
+call timeout) it opens, and calls fail at once with CircuitOpen (503 +
+Retry-After) instead of every request waiting out a dead Supabase. Once
+RESET_TIMEOUT has passed, one trial call is let through (half-open): its
+success closes the breaker, its failure opens it again.
+
+Only errors that say the dependency is unwell count as failures (see
+is_outage): timeouts, connection errors and server-side (5xx-class) errors.
+A request the database rejected - a malformed UUID, a constraint violation -
+is the caller's problem, not an outage, and passes through uncounted.
+
+StaleWhileRevalidate keeps the last-known-good result of a read (the public
+settings) in each worker, plus a copy on disk for workers started during an
+incident:
+
+- fresh: served from memory
+- expired: served at once, marked stale, and reloaded in the background
+- changed by a write (its shared_cache.Generation moved): reloaded before
+  answering
+- reload failed: the last good value is served, marked stale, until the data
+  layer recovers; with nothing to fall back on the error propagates
+
+Responses say which in an RFC 9211 ``Cache-Status`` header
+(``synergy-api; hit; ttl=-42; detail=stale``).
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, NamedTuple, Optional, Tuple, Type
+
+import metrics
+import shared_cache
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+RESET_TIMEOUT = float(os.environ.get('CIRCUIT_RESET_SECONDS', 30))
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CACHE_NAME = "synergy-api"
+
+# Postgres SQLSTATE classes that mean the server, not the query, is at fault:
+# connection exception, insufficient resources, operator intervention (incl.
+# statement timeout), system error, internal error
+OUTAGE_SQLSTATE_CLASSES = ("08", "53", "57", "58", "XX")
+# PostgREST's own: can't connect, or lost its schema cache
+OUTAGE_POSTGREST_CODES = ("PGRST000", "PGRST001", "PGRST002", "PGRST003")
+# Transport errors of SDKs that don't derive from OSError (httpx, pymongo)
+OUTAGE_ERROR_TYPES = ("TransportError", "TimeoutException", "ConnectionFailure", "ExecutionTimeout")
+
+
+class CircuitOpen(Exception):
+    """A dependency's breaker is open; the call was not attempted"""
+
+    def __init__(self, dependency: str, retry_after: int):
+        super().__init__(f"{dependency} is unavailable")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+def is_outage(error: BaseException) -> bool:
+    """Whether ``error`` says the dependency is down or struggling (rather than the call being rejected)"""
+    if isinstance(error, (TimeoutError, OSError, sqlite3.OperationalError)):
+        return True
+    if any(cls.__name__ in OUTAGE_ERROR_TYPES for cls in type(error).__mro__):
+        return True
+    # postgrest's APIError carries the SQLSTATE or PGRST code, or the HTTP
+    # status when the response wasn't JSON (a gateway error page)
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code >= 500
+    if isinstance(code, str) and code:
+        return code in OUTAGE_POSTGREST_CODES or code[:2] in OUTAGE_SQLSTATE_CLASSES
+    # httpx's HTTPStatusError and the like
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker; only touched from the event loop thread.
+
+    Exceptions ``is_failure`` rejects (by default anything but an outage,
+    see is_outage) and those of the ``ignore`` types (e.g. limits.Overloaded,
+    raised before the dependency was called) count neither way.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT, ignore: Tuple[Type[BaseException], ...] = (),
+                 is_failure: Callable[[BaseException], bool] = is_outage):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.ignore = ignore
+        self.is_failure = is_failure
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+        metrics.CIRCUIT_STATE.labels(name).set(_STATE_VALUES[CLOSED])
+
+    def _set(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit {self.name}: {self.state} -> {state}")
+            self.state = state
+            metrics.CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+    def retry_after(self) -> int:
+        return max(math.ceil(self.opened_at + self.reset_timeout - time.monotonic()), 1)
+
+    def _allow(self) -> bool:
+        """Raise CircuitOpen unless a call may go ahead; True for the half-open trial"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpen(self.name, self.retry_after())
+            self._set(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._trial:
+                raise CircuitOpen(self.name, 1)
+            self._trial = True
+            return True
+        return False
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self._set(OPEN)
+
+    @asynccontextmanager
+    async def guard(self):
+        trial = self._allow()
+        try:
+            yield
+        except self.ignore:
+            raise
+        except Exception as e:
+            if not self.is_failure(e):
+                raise
+            self.failures += 1
+            if trial or self.failures >= self.failure_threshold:
+                self._open()
+            raise
+        else:
+            self.failures = 0
+            self._set(CLOSED)
+        finally:
+            # Cancelled calls and client errors end up here only: no verdict on the dependency
+            if trial:
+                self._trial = False
+
+    def snapshot(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after": self.retry_after() if self.state == OPEN else None,
+        }
+
+
+class Cached(NamedTuple):
+    value: Any
+    stale: bool
+    # RFC 9211 Cache-Status header value
+    cache_status: str
+
+
+_MISSING = object()
+
+
+class StaleWhileRevalidate:
+    """Last-known-good value of ``load()``, kept per worker and in ``directory``"""
+
+    def __init__(self, name: str, load: Callable[[], Awaitable[Any]], generation: shared_cache.Generation,
+                 fresh_for: float = 60.0, directory: Optional[Path] = None):
+        self.name = name
+        self.load = load
+        self.generation = generation
+        self.fresh_for = fresh_for
+        self.path = directory / f"{name}.json" if directory else None
+        self._value: Any = _MISSING
+        self._loaded_at = 0.0
+        self._generation = -1
+        self._failed = False
+        self._task: Optional[asyncio.Task] = None
+
+    def _status(self, stale: bool, hit: bool = True) -> Cached:
+        ttl = int(self.fresh_for - (time.monotonic() - self._loaded_at))
+        if not hit:
+            return Cached(self._value, False, f"{CACHE_NAME}; fwd=miss; stored")
+        if stale:
+            metrics.CACHE_REQUESTS.labels(self.name, "stale").inc()
+            return Cached(self._value, True, f"{CACHE_NAME}; hit; ttl={min(ttl, -1)}; detail=stale")
+        metrics.cache_lookup(self.name, True)
+        return Cached(self._value, False, f"{CACHE_NAME}; hit; ttl={ttl}")
+
+    async def get(self) -> Cached:
+        generation = self.generation.current
+        if self._value is not _MISSING and self._generation == generation:
+            if time.monotonic() - self._loaded_at < self.fresh_for and not self._failed:
+                return self._status(stale=False)
+            # Expired (or the last reload failed): answer now, reload off the request
+            self._reload(background=True)
+            return self._status(stale=True)
+
+        # Nothing cached, or written since: reload before answering
+        try:
+            await asyncio.shield(self._reload())
+        except Exception as e:
+            if self._value is _MISSING:
+                value, age = await asyncio.to_thread(self._read_disk)
+                if value is _MISSING:
+                    raise
+                self._value, self._loaded_at, self._generation = value, time.monotonic() - age, generation
+            logger.warning(f"Serving stale {self.name}: {e}")
+            return self._status(stale=True)
+        metrics.cache_lookup(self.name, False)
+        return self._status(stale=False, hit=False)
+
+    def _reload(self, background: bool = False) -> asyncio.Task:
+        """The reload in flight, starting one if there is none (single flight)"""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            # A background reload belongs to no request: its calls aren't
+            # timed against, or cached in the loader of, whichever one started it
+            context = contextvars.Context() if background else None
+            self._task = loop.create_task(self._refresh(), context=context)
+            if background:
+                # Failures are already logged by get() callers or kept in _failed
+                self._task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._task
+
+    async def _refresh(self):
+        generation = self.generation.current
+        try:
+            value = await self.load()
+        except Exception:
+            self._failed = True
+            raise
+        changed = value != self._value
+        self._store(value, generation)
+        if changed and self.path is not None:
+            await asyncio.to_thread(self._write_disk, value)
+
+    def _store(self, value: Any, generation: int):
+        self._value = value
+        self._loaded_at = time.monotonic()
+        self._generation = generation
+        self._failed = False
+
+    def replace(self, value: Any):
+        """Record a value this worker just wrote, and make every other worker reload"""
+        self._store(value, self.generation.bump())
+        if self.path is not None:
+            asyncio.get_running_loop().create_task(asyncio.to_thread(self._write_disk, value))
+
+    def _read_disk(self) -> Tuple[Any, float]:
+        """The saved value and its age in seconds"""
+        if self.path is None:
+            return _MISSING, 0.0
+        try:
+            return json.loads(self.path.read_text()), time.time() - self.path.stat().st_mtime
+        except (OSError, ValueError):
+            return _MISSING, 0.0
+
+    def _write_disk(self, value: Any):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.name}.")
+        try:
+            with os.fdopen(fd, "w") as handle:
+                json.dump(value, handle, default=str)
+            os.replace(temp, self.path)
+        except OSError:
+            logger.warning(f"Could not save last-known-good {self.name}", exc_info=True)
+            Path(temp).unlink(missing_ok=True)
@@ -1,47 +1,116 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, status
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Header, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from supabase import create_client, Client
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
 import uuid
 from datetime import datetime, timezone
 import hashlib
 import jwt
-import aiofiles
-import shutil
-from PIL import Image
-import io
-import base64
+
+import health
+import backup
+import instrumentation
+import journal
+import limits
+import loader
+import metrics
+import prerender
+import profiling
+import repository
+import resilience
+import shared_cache
+import static_files
+import storage
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # Supabase connection
-SUPABASE_URL = os.environ['SUPABASE_URL']
-SUPABASE_ANON_KEY = os.environ['SUPABASE_ANON_KEY']
-SUPABASE_STORAGE_BUCKET = os.environ['SUPABASE_STORAGE_BUCKET']
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+SUPABASE_URL = os.environ.get('SUPABASE_URL')
+SUPABASE_ANON_KEY = os.environ.get('SUPABASE_ANON_KEY')
+SUPABASE_STORAGE_BUCKET = os.environ.get('SUPABASE_STORAGE_BUCKET')
+
+# Tables live in DATA_BACKEND: supabase (default), mongo or sqlite - see repository.from_env()
+DATA_BACKEND = os.environ.get('DATA_BACKEND', 'supabase').lower()
+
+# Created by init_clients() in the lifespan hook, so importing this module
+# doesn't pay for the supabase/httpx import or the client setup
+supabase = None
+db: Optional[repository.AsyncRepository] = None
+
+# Outbound concurrency per dependency (see limits.py): calls over the adaptive
+# limit queue briefly, then fail fast with 503 + Retry-After
+db_limiter = limits.AdaptiveLimiter(
+    "database",
+    initial=int(os.environ.get('DB_CONCURRENCY', 16)),
+    max_limit=int(os.environ.get('DB_MAX_CONCURRENCY', 32)),
+    max_queue=int(os.environ.get('DB_MAX_QUEUE', 200)),
+)
+storage_limiter = limits.AdaptiveLimiter(
+    "storage",
+    initial=int(os.environ.get('STORAGE_CONCURRENCY', 4)),
+    max_limit=int(os.environ.get('STORAGE_MAX_CONCURRENCY', 16)),
+    max_queue=int(os.environ.get('STORAGE_MAX_QUEUE', 50)),
+)
+# Fails database calls fast while the database is down (see resilience.py);
+# calls still running after DB_CALL_TIMEOUT seconds count as failures
+db_breaker = resilience.CircuitBreaker("database", ignore=(limits.Overloaded,))
+DB_CALL_TIMEOUT = float(os.environ.get('DB_CALL_TIMEOUT', 10))
+
+def init_clients():
+    """Create the database (and Supabase) clients unless already installed (tests)"""
+    global supabase, db
+    needs_supabase = DATA_BACKEND == "supabase" or isinstance(upload_storage, storage.SupabaseStorage)
+    if supabase is None and needs_supabase:
+        if not (SUPABASE_URL and SUPABASE_ANON_KEY and SUPABASE_STORAGE_BUCKET):
+            raise RuntimeError("SUPABASE_URL, SUPABASE_ANON_KEY and SUPABASE_STORAGE_BUCKET must be set")
+        
+        from supabase import create_client
+        # Every round trip is timed per request (see instrumentation.TimingMiddleware)
+        supabase = instrumentation.InstrumentedClient(create_client(SUPABASE_URL, SUPABASE_ANON_KEY))
+    if db is None:
+        db = repository.AsyncRepository(repository.from_env(lambda: supabase), limiter=db_limiter,
+                                      breaker=db_breaker, timeout=DB_CALL_TIMEOUT)
 
 # JWT Configuration
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'synergy-india-secret-key')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Uploads (service images, logos) go to STORAGE_BACKEND: supabase (default),
+# local or s3 - see storage.from_env()
+upload_storage = storage.from_env(lambda: supabase)
+upload_storage.limiter = storage_limiter
+# Backups and archived leads: a private bucket, since the instance's own disk
+# doesn't survive a deploy - see storage.private_from_env()
+private_storage = storage.private_from_env(lambda: supabase)
+if private_storage is not None:
+    private_storage.limiter = storage_limiter
+MAX_UPLOAD_BYTES = 1024 * 1024
+MAX_SERVICE_IMAGES = 4
+
+# Rows older than this are moved from the hot tables to Parquet by the archive job
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 180))
+
+def private_store() -> Optional[storage.BlockingStorage]:
+    """The private bucket for jobs running in worker threads (call from the event loop)"""
+    if private_storage is None:
+        return None
+    return storage.BlockingStorage(private_storage, asyncio.get_running_loop())
+
 # Security
 security = HTTPBearer()
 
-# Create the main app without a prefix
-app = FastAPI(title="SYNERGY INDIA Admin API")
-
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
@@ -125,6 +194,10 @@ class GalleryImageUpdate(BaseModel):
     order: Optional[int] = None
     is_active: Optional[bool] = None
 
+class GalleryImageOrder(BaseModel):
+    id: str
+    order: int
+
 # Lead Models
 class Lead(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -206,6 +279,31 @@ class DashboardStats(BaseModel):
     total_gallery_images: int
     recent_leads: List[Lead]
 
+# Analytics Models
+class LeadTimeBucket(BaseModel):
+    period: datetime
+    count: int
+
+class LeadStatusStage(BaseModel):
+    status: str
+    count: int
+    share: float
+    reached: int
+    conversion: Optional[float] = None
+
+class LeadBreakdown(BaseModel):
+    service_interested: str
+    project_type: str
+    count: int
+
+class LeadAnalytics(BaseModel):
+    total_leads: int
+    bucket: str
+    time_series: List[LeadTimeBucket]
+    status_funnel: List[LeadStatusStage]
+    service_project_breakdown: List[LeadBreakdown]
+    snapshot_refreshed_at: Optional[datetime] = None
+
 # Login History Model  
 class LoginHistory(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -252,42 +350,40 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if username is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
         
-        # Check if user exists in Supabase
-        response = supabase.table('admin_users').select('*').eq('username', username).execute()
-        if not response.data:
+        # Check if user exists (shared with anything else that needs the user this request)
+        user = await loader.load(db, 'admin_users', username, 'username')
+        if user is None:
             raise HTTPException(status_code=401, detail="User not found")
         
-        user_data = response.data[0]
-        return AdminUser(**user_data)
+        return AdminUser(**user)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
 
-async def upload_to_supabase_storage(file: UploadFile, directory: str = "general") -> str:
-    """Upload file to Supabase storage and return URL"""
-    if file.size > 1024 * 1024:  # 1MB limit
+async def store_upload(file: UploadFile, directory: str = "general") -> str:
+    """Stream an upload into the configured storage backend and return its public URL"""
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
         raise HTTPException(status_code=413, detail="File too large. Maximum size is 1MB")
     
-    # Generate unique filename
-    file_extension = Path(file.filename).suffix
-    filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = f"{directory}/{filename}"
+    async def chunks():
+        received = 0
+        while chunk := await file.read(storage.CHUNK_SIZE):
+            received += len(chunk)
+            if received > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="File too large. Maximum size is 1MB")
+            yield chunk
     
-    # Read file content
-    content = await file.read()
-    
-    # Upload to Supabase storage
+    path = upload_storage.new_path(directory, file.filename)
     try:
-        response = supabase.storage.from_(SUPABASE_STORAGE_BUCKET).upload(file_path, content)
-        if response.get('error'):
-            raise HTTPException(status_code=500, detail=f"Upload failed: {response['error']}")
-        
-        # Get public URL
-        public_url = supabase.storage.from_(SUPABASE_STORAGE_BUCKET).get_public_url(file_path)
-        return public_url
+        size = await upload_storage.put(path, chunks(), file.content_type)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    metrics.UPLOAD_BYTES.labels(directory).inc(size)
+    return upload_storage.public_url(path)
 
 
 # ============================================================================
@@ -297,40 +393,33 @@ async def upload_to_supabase_storage(file: UploadFile, directory: str = "general
 @api_router.post("/auth/login", response_model=LoginResponse)
 async def login(admin_login: AdminLogin):
     """Admin login endpoint"""
-    # Check if user exists in Supabase
-    response = supabase.table('admin_users').select('*').eq('username', admin_login.username).execute()
+    # Check if user exists
+    users = await db.select('admin_users', [('username', 'eq', admin_login.username)], limit=1)
     
-    if not response.data:
+    if not users or not verify_password(admin_login.password, users[0]["hashed_password"]):
         # Log failed login attempt
-        supabase.table('login_history').insert({
+        await db.insert('login_history', {
+            "id": str(uuid.uuid4()),
             "username": admin_login.username,
             "login_time": datetime.now(timezone.utc).isoformat(),
             "success": False
-        }).execute()
+        })
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
-    user = response.data[0]
-    
-    if not verify_password(admin_login.password, user["hashed_password"]):
-        # Log failed login attempt
-        supabase.table('login_history').insert({
-            "username": admin_login.username,
-            "login_time": datetime.now(timezone.utc).isoformat(),
-            "success": False
-        }).execute()
-        raise HTTPException(status_code=401, detail="Invalid username or password")
+    user = users[0]
     
     # Update last login
-    supabase.table('admin_users').update({
+    await db.update('admin_users', [('username', 'eq', admin_login.username)], {
         "last_login": datetime.now(timezone.utc).isoformat()
-    }).eq('username', admin_login.username).execute()
+    })
     
     # Log successful login
-    supabase.table('login_history').insert({
+    await db.insert('login_history', {
+        "id": str(uuid.uuid4()),
         "username": admin_login.username,
         "login_time": datetime.now(timezone.utc).isoformat(),
         "success": True
-    }).execute()
+    })
     
     # Create access token
     access_token = create_access_token(data={"sub": user["username"]})
@@ -351,245 +440,129 @@ async def get_current_user_info(current_user: AdminUser = Depends(get_current_us
 # SERVICES MANAGEMENT ENDPOINTS
 # ============================================================================
 
+# The 8 services shown on the site, with their photos (using consistent IDs)
+SERVICE_CATALOG = [
+    {
+        "id": "civil-construction-001",
+        "title": "Civil Construction",
+        "short_intro": "Reliable and high-quality civil construction services for residential and commercial projects with focus on durability, safety, and on-time delivery.",
+        "overview": "At Synergy India, we specialize in delivering reliable and high-quality civil construction services for both residential and commercial projects. From laying strong foundations to completing full-scale structures, our focus is on durability, safety, and on-time delivery. Whether it's building a new home, a commercial complex, or boundary works, our team ensures that every project meets professional standards.",
+        "sub_services": ["Foundation Work", "Structural Construction", "Boundary Works", "Commercial Buildings", "Residential Projects"],
+        "benefits": ["Durable Construction", "Safety First", "On-time Delivery", "Professional Standards", "Quality Materials"],
+        "cta_text": "Get Quote for Civil Construction",
+        "images": ["/photos/civil construction.jpg"],
+        "is_active": True
+    },
+    {
+        "id": "renovation-remodeling-002",
+        "title": "Renovation & Remodeling",
+        "short_intro": "Transform old spaces into modern, functional environments with enhanced aesthetics and improved functionality.",
+        "overview": "At Synergy India, we transform old and outdated spaces into modern, functional, and stylish environments. Our renovation and remodeling services cover both residential and commercial properties, ensuring enhanced aesthetics, improved functionality, and long-lasting results. From simple upgrades to complete overhauls, we deliver designs that match your lifestyle and business needs.",
+        "sub_services": ["Space Transformation", "Modern Design", "Functional Layouts", "Aesthetic Enhancement", "Complete Overhauls"],
+        "benefits": ["Modern Design", "Enhanced Aesthetics", "Improved Functionality", "Long-lasting Results", "Lifestyle Matching"],
+        "cta_text": "Transform Your Space Today",
+        "images": ["/photos/remodeling.jpg"],
+        "is_active": True
+    },
+    {
+        "id": "interior-design-003",
+        "title": "Interior Design & Execution",
+        "short_intro": "Creative interior design and execution services for modern homes, offices, and showrooms with visual appeal and space efficiency.",
+        "overview": "At Synergy India, we bring creativity and functionality together through our interior design and execution services. Whether it's a modern home, a stylish office, or a premium showroom, our team delivers interiors that are visually appealing, space-efficient, and aligned with your personality or brand identity. We handle everything from design planning to complete execution.",
+        "sub_services": ["Design Planning", "Space Efficiency", "Visual Appeal", "Brand Identity", "Complete Execution"],
+        "benefits": ["Visual Appeal", "Space Efficiency", "Brand Alignment", "Complete Service", "Professional Design"],
+        "cta_text": "Design Your Perfect Interior",
+        "images": ["/photos/interior design.jpg"],
+        "is_active": True
+    },
+    {
+        "id": "finishing-aesthetic-004",
+        "title": "Finishing & Aesthetic Works",
+        "short_intro": "Professional finishing and aesthetic services including painting, polishing, lighting, and wall treatments for polished results.",
+        "overview": "The final touch is what makes every project stand out. At Synergy India, our finishing and aesthetic services ensure your space looks polished, elegant, and complete. From painting and polishing to decorative lighting and wall treatments, we focus on details that enhance the beauty and value of your property.",
+        "sub_services": ["Painting & Polishing", "Decorative Lighting", "Wall Treatments", "Aesthetic Enhancement", "Property Value"],
+        "benefits": ["Polished Finish", "Elegant Design", "Property Value", "Attention to Detail", "Complete Look"],
+        "cta_text": "Perfect Your Space Finish",
+        "images": ["/photos/finishing and astehic work.jpg"],
+        "is_active": True
+    },
+    {
+        "id": "commercial-interiors-005",
+        "title": "Commercial Interiors",
+        "short_intro": "Commercial interior design and execution for offices, showrooms, and restaurants with smart space utilization and professional aesthetics.",
+        "overview": "At Synergy India, we design and execute commercial interiors that combine functionality, aesthetics, and brand identity. From modern offices to stylish showrooms and cozy restaurants, our interiors are crafted to create the right impression and enhance productivity. We ensure smart space utilization, durable finishes, and a professional look tailored to your business.",
+        "sub_services": ["Modern Offices", "Stylish Showrooms", "Restaurant Design", "Space Utilization", "Professional Look"],
+        "benefits": ["Professional Impression", "Enhanced Productivity", "Smart Space Use", "Durable Finishes", "Business Tailored"],
+        "cta_text": "Design Your Commercial Space",
+        "images": ["/photos/commercial intereios.jpg"],
+        "is_active": True
+    },
+    {
+        "id": "drip-irrigation-006",
+        "title": "💧 Drip Irrigation System",
+        "short_intro": "Modern water-efficient solution that supplies water directly to plant roots through controlled drop-by-drop method, saving 40-60% water.",
+        "overview": "A modern water-efficient solution that supplies water directly to the root zone of each plant through a controlled drop-by-drop method. This system not only saves 40–60% of water but also allows uniform fertilizer distribution, reduces weed growth, and ensures healthier crops with higher productivity. Ideal for fruits, vegetables, and orchard farming.",
+        "sub_services": ["Water Conservation", "Fertilizer Distribution", "Weed Control", "Crop Health", "Productivity Boost"],
+        "benefits": ["40-60% Water Savings", "Uniform Water Distribution", "Reduced Weed Growth", "Healthier Crops", "Higher Productivity"],
+        "cta_text": "Install Drip Irrigation System",
+        "images": ["/photos/drip irrigation system .jpg"],
+        "is_active": True
+    },
+    {
+        "id": "sprinkler-irrigation-007",
+        "title": "🌧 Sprinkler Irrigation System",
+        "short_intro": "Advanced irrigation technique that sprays water under pressure to simulate natural rainfall with uniform coverage across the field.",
+        "overview": "An advanced irrigation technique that sprays water under pressure to simulate natural rainfall. It provides uniform water coverage across the field, prevents soil erosion, and is suitable for almost all types of crops including cereals, pulses, and vegetables. This system helps reduce labor costs, saves time, and increases efficiency in both small and large-scale farms.",
+        "sub_services": ["Rainfall Simulation", "Uniform Coverage", "Soil Erosion Prevention", "Multi-Crop Support", "Labor Cost Reduction"],
+        "benefits": ["Natural Rainfall Simulation", "Uniform Water Coverage", "Soil Erosion Prevention", "Reduced Labor Costs", "Increased Efficiency"],
+        "cta_text": "Setup Sprinkler System",
+        "images": ["/photos/srinkler irrigation system.jpg"],
+        "is_active": True
+    },
+    {
+        "id": "solar-plant-installation-008",
+        "title": "☀ Solar Plant Installation with Government Support",
+        "short_intro": "Complete solar power plant solutions with government subsidies and financial benefits for homes, businesses, and farmers.",
+        "overview": "We provide complete solutions for setting up solar power plants under government-supported schemes. Our team handles everything from site survey, system design, and installation to documentation and approvals. With full guidance for availing subsidies and financial benefits, we make solar energy affordable and hassle-free for homes, businesses, and farmers. By choosing our service, you not only save on electricity bills but also contribute to a sustainable future.",
+        "sub_services": ["Site Survey", "System Design", "Installation", "Documentation", "Subsidy Support"],
+        "benefits": ["Government Subsidies", "Complete Solution", "Electricity Bill Savings", "Sustainable Future", "Hassle-Free Process"],
+        "cta_text": "Get Solar Plant Quote",
+        "images": ["/photos/solar plant installation.jpg"],
+        "is_active": True
+    }
+]
+
+# Service/gallery models built once per process. Under gunicorn's
+# preload_app this happens in the master before forking (see preload()), so
+# workers share the objects copy-on-write instead of rebuilding them.
+_service_catalog: Optional[List[Service]] = None
+_service_index: Dict[str, Service] = {}
+_gallery_catalog: Optional[List[GalleryImage]] = None
+
+def build_service_catalog() -> List[Service]:
+    now = datetime.now(timezone.utc).isoformat()
+    return [Service(**service_data, created_at=now, updated_at=now) for service_data in SERVICE_CATALOG]
+
+def load_service_catalog() -> List[Service]:
+    global _service_catalog, _service_index
+    if _service_catalog is None:
+        _service_catalog = build_service_catalog()
+        _service_index = {service.id: service for service in _service_catalog}
+    return _service_catalog
+
 @api_router.get("/services", response_model=List[Service])
 async def get_services():
     """Get all services with static data and gallery images"""
-    import os
-    import random
-    
-    # Define the 5 services with their corresponding photos (using consistent IDs)
-    services_data = [
-        {
-            "id": "civil-construction-001",
-            "title": "Civil Construction",
-            "short_intro": "Reliable and high-quality civil construction services for residential and commercial projects with focus on durability, safety, and on-time delivery.",
-            "overview": "At Synergy India, we specialize in delivering reliable and high-quality civil construction services for both residential and commercial projects. From laying strong foundations to completing full-scale structures, our focus is on durability, safety, and on-time delivery. Whether it's building a new home, a commercial complex, or boundary works, our team ensures that every project meets professional standards.",
-            "sub_services": ["Foundation Work", "Structural Construction", "Boundary Works", "Commercial Buildings", "Residential Projects"],
-            "benefits": ["Durable Construction", "Safety First", "On-time Delivery", "Professional Standards", "Quality Materials"],
-            "cta_text": "Get Quote for Civil Construction",
-            "images": ["/photos/civil construction.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "renovation-remodeling-002",
-            "title": "Renovation & Remodeling",
-            "short_intro": "Transform old spaces into modern, functional environments with enhanced aesthetics and improved functionality.",
-            "overview": "At Synergy India, we transform old and outdated spaces into modern, functional, and stylish environments. Our renovation and remodeling services cover both residential and commercial properties, ensuring enhanced aesthetics, improved functionality, and long-lasting results. From simple upgrades to complete overhauls, we deliver designs that match your lifestyle and business needs.",
-            "sub_services": ["Space Transformation", "Modern Design", "Functional Layouts", "Aesthetic Enhancement", "Complete Overhauls"],
-            "benefits": ["Modern Design", "Enhanced Aesthetics", "Improved Functionality", "Long-lasting Results", "Lifestyle Matching"],
-            "cta_text": "Transform Your Space Today",
-            "images": ["/photos/remodeling.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "interior-design-003",
-            "title": "Interior Design & Execution",
-            "short_intro": "Creative interior design and execution services for modern homes, offices, and showrooms with visual appeal and space efficiency.",
-            "overview": "At Synergy India, we bring creativity and functionality together through our interior design and execution services. Whether it's a modern home, a stylish office, or a premium showroom, our team delivers interiors that are visually appealing, space-efficient, and aligned with your personality or brand identity. We handle everything from design planning to complete execution.",
-            "sub_services": ["Design Planning", "Space Efficiency", "Visual Appeal", "Brand Identity", "Complete Execution"],
-            "benefits": ["Visual Appeal", "Space Efficiency", "Brand Alignment", "Complete Service", "Professional Design"],
-            "cta_text": "Design Your Perfect Interior",
-            "images": ["/photos/interior design.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "finishing-aesthetic-004",
-            "title": "Finishing & Aesthetic Works",
-            "short_intro": "Professional finishing and aesthetic services including painting, polishing, lighting, and wall treatments for polished results.",
-            "overview": "The final touch is what makes every project stand out. At Synergy India, our finishing and aesthetic services ensure your space looks polished, elegant, and complete. From painting and polishing to decorative lighting and wall treatments, we focus on details that enhance the beauty and value of your property.",
-            "sub_services": ["Painting & Polishing", "Decorative Lighting", "Wall Treatments", "Aesthetic Enhancement", "Property Value"],
-            "benefits": ["Polished Finish", "Elegant Design", "Property Value", "Attention to Detail", "Complete Look"],
-            "cta_text": "Perfect Your Space Finish",
-            "images": ["/photos/finishing and astehic work.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "commercial-interiors-005",
-            "title": "Commercial Interiors",
-            "short_intro": "Commercial interior design and execution for offices, showrooms, and restaurants with smart space utilization and professional aesthetics.",
-            "overview": "At Synergy India, we design and execute commercial interiors that combine functionality, aesthetics, and brand identity. From modern offices to stylish showrooms and cozy restaurants, our interiors are crafted to create the right impression and enhance productivity. We ensure smart space utilization, durable finishes, and a professional look tailored to your business.",
-            "sub_services": ["Modern Offices", "Stylish Showrooms", "Restaurant Design", "Space Utilization", "Professional Look"],
-            "benefits": ["Professional Impression", "Enhanced Productivity", "Smart Space Use", "Durable Finishes", "Business Tailored"],
-            "cta_text": "Design Your Commercial Space",
-            "images": ["/photos/commercial intereios.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "drip-irrigation-006",
-            "title": "💧 Drip Irrigation System",
-            "short_intro": "Modern water-efficient solution that supplies water directly to plant roots through controlled drop-by-drop method, saving 40-60% water.",
-            "overview": "A modern water-efficient solution that supplies water directly to the root zone of each plant through a controlled drop-by-drop method. This system not only saves 40–60% of water but also allows uniform fertilizer distribution, reduces weed growth, and ensures healthier crops with higher productivity. Ideal for fruits, vegetables, and orchard farming.",
-            "sub_services": ["Water Conservation", "Fertilizer Distribution", "Weed Control", "Crop Health", "Productivity Boost"],
-            "benefits": ["40-60% Water Savings", "Uniform Water Distribution", "Reduced Weed Growth", "Healthier Crops", "Higher Productivity"],
-            "cta_text": "Install Drip Irrigation System",
-            "images": ["/photos/drip irrigation system .jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "sprinkler-irrigation-007",
-            "title": "🌧 Sprinkler Irrigation System",
-            "short_intro": "Advanced irrigation technique that sprays water under pressure to simulate natural rainfall with uniform coverage across the field.",
-            "overview": "An advanced irrigation technique that sprays water under pressure to simulate natural rainfall. It provides uniform water coverage across the field, prevents soil erosion, and is suitable for almost all types of crops including cereals, pulses, and vegetables. This system helps reduce labor costs, saves time, and increases efficiency in both small and large-scale farms.",
-            "sub_services": ["Rainfall Simulation", "Uniform Coverage", "Soil Erosion Prevention", "Multi-Crop Support", "Labor Cost Reduction"],
-            "benefits": ["Natural Rainfall Simulation", "Uniform Water Coverage", "Soil Erosion Prevention", "Reduced Labor Costs", "Increased Efficiency"],
-            "cta_text": "Setup Sprinkler System",
-            "images": ["/photos/srinkler irrigation system.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "solar-plant-installation-008",
-            "title": "☀ Solar Plant Installation with Government Support",
-            "short_intro": "Complete solar power plant solutions with government subsidies and financial benefits for homes, businesses, and farmers.",
-            "overview": "We provide complete solutions for setting up solar power plants under government-supported schemes. Our team handles everything from site survey, system design, and installation to documentation and approvals. With full guidance for availing subsidies and financial benefits, we make solar energy affordable and hassle-free for homes, businesses, and farmers. By choosing our service, you not only save on electricity bills but also contribute to a sustainable future.",
-            "sub_services": ["Site Survey", "System Design", "Installation", "Documentation", "Subsidy Support"],
-            "benefits": ["Government Subsidies", "Complete Solution", "Electricity Bill Savings", "Sustainable Future", "Hassle-Free Process"],
-            "cta_text": "Get Solar Plant Quote",
-            "images": ["/photos/solar plant installation.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }
-    ]
-    
-    # Convert to Service objects
-    services = []
-    for service_data in services_data:
-        services.append(Service(**service_data))
-
-    return services
+    return load_service_catalog()
 
 @api_router.get("/services/{service_id}", response_model=Service)
 async def get_service_by_id(service_id: str):
     """Get a specific service by ID"""
-    # Define the 5 services with their corresponding photos (using consistent IDs)
-    services_data = [
-        {
-            "id": "civil-construction-001",
-            "title": "Civil Construction",
-            "short_intro": "Reliable and high-quality civil construction services for residential and commercial projects with focus on durability, safety, and on-time delivery.",
-            "overview": "At Synergy India, we specialize in delivering reliable and high-quality civil construction services for both residential and commercial projects. From laying strong foundations to completing full-scale structures, our focus is on durability, safety, and on-time delivery. Whether it's building a new home, a commercial complex, or boundary works, our team ensures that every project meets professional standards.",
-            "sub_services": ["Foundation Work", "Structural Construction", "Boundary Works", "Commercial Buildings", "Residential Projects"],
-            "benefits": ["Durable Construction", "Safety First", "On-time Delivery", "Professional Standards", "Quality Materials"],
-            "cta_text": "Get Quote for Civil Construction",
-            "images": ["/photos/civil construction.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "renovation-remodeling-002",
-            "title": "Renovation & Remodeling",
-            "short_intro": "Transform old spaces into modern, functional environments with enhanced aesthetics and improved functionality.",
-            "overview": "At Synergy India, we transform old and outdated spaces into modern, functional, and stylish environments. Our renovation and remodeling services cover both residential and commercial properties, ensuring enhanced aesthetics, improved functionality, and long-lasting results. From simple upgrades to complete overhauls, we deliver designs that match your lifestyle and business needs.",
-            "sub_services": ["Space Transformation", "Modern Design", "Functional Layouts", "Aesthetic Enhancement", "Complete Overhauls"],
-            "benefits": ["Modern Design", "Enhanced Aesthetics", "Improved Functionality", "Long-lasting Results", "Lifestyle Matching"],
-            "cta_text": "Transform Your Space Today",
-            "images": ["/photos/remodeling.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "interior-design-003",
-            "title": "Interior Design & Execution",
-            "short_intro": "Creative interior design and execution services for modern homes, offices, and showrooms with visual appeal and space efficiency.",
-            "overview": "At Synergy India, we bring creativity and functionality together through our interior design and execution services. Whether it's a modern home, a stylish office, or a premium showroom, our team delivers interiors that are visually appealing, space-efficient, and aligned with your personality or brand identity. We handle everything from design planning to complete execution.",
-            "sub_services": ["Design Planning", "Space Efficiency", "Visual Appeal", "Brand Identity", "Complete Execution"],
-            "benefits": ["Visual Appeal", "Space Efficiency", "Brand Alignment", "Complete Service", "Professional Design"],
-            "cta_text": "Design Your Perfect Interior",
-            "images": ["/photos/interior design.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "finishing-aesthetic-004",
-            "title": "Finishing & Aesthetic Works",
-            "short_intro": "Professional finishing and aesthetic services including painting, polishing, lighting, and wall treatments for polished results.",
-            "overview": "The final touch is what makes every project stand out. At Synergy India, our finishing and aesthetic services ensure your space looks polished, elegant, and complete. From painting and polishing to decorative lighting and wall treatments, we focus on details that enhance the beauty and value of your property.",
-            "sub_services": ["Painting & Polishing", "Decorative Lighting", "Wall Treatments", "Aesthetic Enhancement", "Property Value"],
-            "benefits": ["Polished Finish", "Elegant Design", "Property Value", "Attention to Detail", "Complete Look"],
-            "cta_text": "Perfect Your Space Finish",
-            "images": ["/photos/finishing and astehic work.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "commercial-interiors-005",
-            "title": "Commercial Interiors",
-            "short_intro": "Commercial interior design and execution for offices, showrooms, and restaurants with smart space utilization and professional aesthetics.",
-            "overview": "At Synergy India, we design and execute commercial interiors that combine functionality, aesthetics, and brand identity. From modern offices to stylish showrooms and cozy restaurants, our interiors are crafted to create the right impression and enhance productivity. We ensure smart space utilization, durable finishes, and a professional look tailored to your business.",
-            "sub_services": ["Modern Offices", "Stylish Showrooms", "Restaurant Design", "Space Utilization", "Professional Look"],
-            "benefits": ["Professional Impression", "Enhanced Productivity", "Smart Space Use", "Durable Finishes", "Business Tailored"],
-            "cta_text": "Design Your Commercial Space",
-            "images": ["/photos/commercial intereios.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "drip-irrigation-006",
-            "title": "💧 Drip Irrigation System",
-            "short_intro": "Modern water-efficient solution that supplies water directly to plant roots through controlled drop-by-drop method, saving 40-60% water.",
-            "overview": "A modern water-efficient solution that supplies water directly to the root zone of each plant through a controlled drop-by-drop method. This system not only saves 40–60% of water but also allows uniform fertilizer distribution, reduces weed growth, and ensures healthier crops with higher productivity. Ideal for fruits, vegetables, and orchard farming.",
-            "sub_services": ["Water Conservation", "Fertilizer Distribution", "Weed Control", "Crop Health", "Productivity Boost"],
-            "benefits": ["40-60% Water Savings", "Uniform Water Distribution", "Reduced Weed Growth", "Healthier Crops", "Higher Productivity"],
-            "cta_text": "Install Drip Irrigation System",
-            "images": ["/photos/drip irrigation system .jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "sprinkler-irrigation-007",
-            "title": "🌧 Sprinkler Irrigation System",
-            "short_intro": "Advanced irrigation technique that sprays water under pressure to simulate natural rainfall with uniform coverage across the field.",
-            "overview": "An advanced irrigation technique that sprays water under pressure to simulate natural rainfall. It provides uniform water coverage across the field, prevents soil erosion, and is suitable for almost all types of crops including cereals, pulses, and vegetables. This system helps reduce labor costs, saves time, and increases efficiency in both small and large-scale farms.",
-            "sub_services": ["Rainfall Simulation", "Uniform Coverage", "Soil Erosion Prevention", "Multi-Crop Support", "Labor Cost Reduction"],
-            "benefits": ["Natural Rainfall Simulation", "Uniform Water Coverage", "Soil Erosion Prevention", "Reduced Labor Costs", "Increased Efficiency"],
-            "cta_text": "Setup Sprinkler System",
-            "images": ["/photos/srinkler irrigation system.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        },
-        {
-            "id": "solar-plant-installation-008",
-            "title": "☀ Solar Plant Installation with Government Support",
-            "short_intro": "Complete solar power plant solutions with government subsidies and financial benefits for homes, businesses, and farmers.",
-            "overview": "We provide complete solutions for setting up solar power plants under government-supported schemes. Our team handles everything from site survey, system design, and installation to documentation and approvals. With full guidance for availing subsidies and financial benefits, we make solar energy affordable and hassle-free for homes, businesses, and farmers. By choosing our service, you not only save on electricity bills but also contribute to a sustainable future.",
-            "sub_services": ["Site Survey", "System Design", "Installation", "Documentation", "Subsidy Support"],
-            "benefits": ["Government Subsidies", "Complete Solution", "Electricity Bill Savings", "Sustainable Future", "Hassle-Free Process"],
-            "cta_text": "Get Solar Plant Quote",
-            "images": ["/photos/solar plant installation.jpg"],
-            "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }
-    ]
-    
-    # Find the service by ID
-    for service_data in services_data:
-        if service_data["id"] == service_id:
-            return Service(**service_data)
-    
-    # If service not found, raise 404 - IMPORTANT: Keep this at function level, not inside the loop!
-    raise HTTPException(status_code=404, detail="Service not found")
+    load_service_catalog()
+    service = _service_index.get(service_id)
+    if service is None:
+        raise HTTPException(status_code=404, detail="Service not found")
+    return service
 
 
 @api_router.post("/services", response_model=Service)
@@ -603,8 +576,9 @@ async def create_service(
     service_dict['created_at'] = datetime.now(timezone.utc).isoformat()
     service_dict['updated_at'] = datetime.now(timezone.utc).isoformat()
     
-    response = supabase.table('services').insert(service_dict).execute()
-    return Service(**response.data[0])
+    row = await db.insert('services', service_dict)
+    public_pages.invalidate()
+    return Service(**row)
 
 @api_router.put("/services/{service_id}", response_model=Service)
 async def update_service(
@@ -613,17 +587,15 @@ async def update_service(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Update service"""
-    response = supabase.table('services').select('*').eq('id', service_id).execute()
-    if not response.data:
-        raise HTTPException(status_code=404, detail="Service not found")
-    
     update_data = {k: v for k, v in service_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    supabase.table('services').update(update_data).eq('id', service_id).execute()
+    rows = await db.update('services', [('id', 'eq', service_id)], update_data)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Service not found")
+    public_pages.invalidate()
     
-    updated_response = supabase.table('services').select('*').eq('id', service_id).execute()
-    return Service(**updated_response.data[0])
+    return Service(**rows[0])
 
 @api_router.delete("/services/{service_id}")
 async def delete_service(
@@ -631,9 +603,9 @@ async def delete_service(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Delete service"""
-    response = supabase.table('services').delete().eq('id', service_id).execute()
-    if not response.data:
+    if not await db.delete('services', [('id', 'eq', service_id)]):
         raise HTTPException(status_code=404, detail="Service not found")
+    public_pages.invalidate()
     return {"message": "Service deleted successfully"}
 
 @api_router.post("/services/{service_id}/images")
@@ -643,27 +615,23 @@ async def upload_service_image(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Upload image for service"""
-    response = supabase.table('services').select('*').eq('id', service_id).execute()
-    if not response.data:
+    service = await loader.load(db, 'services', service_id)
+    if service is None:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    service = response.data[0]
-    
-    # Check if service already has 4 images
-    if len(service.get("images", [])) >= 4:
+    # Check if service already has 4 images (saves the upload when it's full;
+    # the append below enforces the limit atomically)
+    if len(service.get("images", [])) >= MAX_SERVICE_IMAGES:
         raise HTTPException(status_code=400, detail="Service can have maximum 4 images")
     
-    # Upload to Supabase storage
-    image_url = await upload_to_supabase_storage(file, "services")
+    image_url = await store_upload(file, "services")
     
-    # Add image URL to service
-    current_images = service.get("images", [])
-    current_images.append(image_url)
-    
-    supabase.table('services').update({
-        "images": current_images,
-        "updated_at": datetime.now(timezone.utc).isoformat()
-    }).eq('id', service_id).execute()
+    # Appended in the database, so concurrent uploads can't overwrite each other
+    if await db.array_append('services', service_id, 'images', image_url, MAX_SERVICE_IMAGES) is None:
+        if await db.get('services', service_id) is None:
+            raise HTTPException(status_code=404, detail="Service not found")
+        raise HTTPException(status_code=400, detail="Service can have maximum 4 images")
+    public_pages.invalidate()
     
     return {"message": "Image uploaded successfully", "image_url": image_url}
 
@@ -674,21 +642,11 @@ async def remove_service_image(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Remove image from service"""
-    response = supabase.table('services').select('*').eq('id', service_id).execute()
-    if not response.data:
+    if await db.array_remove('services', service_id, 'images', image_url) is not None:
+        public_pages.invalidate()
+    elif await loader.load(db, 'services', service_id) is None:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    service = response.data[0]
-    current_images = service.get("images", [])
-    
-    if image_url in current_images:
-        current_images.remove(image_url)
-        
-        supabase.table('services').update({
-            "images": current_images,
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }).eq('id', service_id).execute()
-    
     return {"message": "Image removed successfully"}
 
 
@@ -696,14 +654,8 @@ async def remove_service_image(
 # GALLERY MANAGEMENT ENDPOINTS (Static Images)
 # ============================================================================
 
-@api_router.get("/gallery", response_model=List[GalleryImage])
-async def get_gallery_images():
-    """Get all gallery images from photos directory"""
-    import os
-    import random
-    
-    # Use the same photos directory as services
-    photos_dir = Path("../photos")
+def build_gallery_images(photos_dir: Path = Path("../photos")) -> List[GalleryImage]:
+    """Gallery entries for the images in the photos directory"""
     if not photos_dir.exists():
         return []
     
@@ -769,7 +721,7 @@ async def get_gallery_images():
         })
         
         gallery_image = GalleryImage(
-            id=str(uuid.uuid4()),
+            id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"/photos/{filename}")),
             url=f"/photos/{filename}",
             alt_text=photo_info["title"],
             caption=photo_info["caption"],
@@ -783,6 +735,122 @@ async def get_gallery_images():
     
     return gallery_images
 
+def load_gallery_catalog() -> List[GalleryImage]:
+    global _gallery_catalog
+    if _gallery_catalog is None:
+        _gallery_catalog = build_gallery_images()
+    return _gallery_catalog
+
+# The photos/ catalog plus the images uploaded through the admin panel (the
+# gallery table). Cached per worker; any worker changing the table bumps the
+# generation, and every worker reloads on its next read.
+gallery_generation = shared_cache.Generation()
+_gallery: Optional[List[GalleryImage]] = None
+_gallery_generation = -1
+
+async def load_gallery() -> List[GalleryImage]:
+    global _gallery, _gallery_generation
+    generation = gallery_generation.current
+    hit = _gallery is not None and _gallery_generation == generation
+    metrics.cache_lookup("gallery", hit)
+    if not hit:
+        uploaded = [GalleryImage(**image) for image in await db.select('gallery', order=[('order', False)])]
+        _gallery = sorted(load_gallery_catalog() + uploaded, key=lambda image: image.order)
+        _gallery_generation = generation
+    return _gallery
+
+def invalidate_gallery():
+    gallery_generation.bump()
+    public_pages.invalidate()
+
+@api_router.get("/gallery", response_model=List[GalleryImage])
+async def get_gallery_images():
+    """Get all gallery images: the site photos and uploaded images"""
+    return await load_gallery()
+
+@api_router.get("/gallery/{image_id}", response_model=GalleryImage)
+async def get_gallery_image(image_id: str):
+    """Get gallery image by ID"""
+    for image in await load_gallery():
+        if image.id == image_id:
+            return image
+    raise HTTPException(status_code=404, detail="Image not found")
+
+@api_router.post("/gallery", response_model=GalleryImage)
+async def upload_gallery_image(
+    file: UploadFile = File(...),
+    alt_text: str = Form(...),
+    caption: str = Form(...),
+    category: str = Form(...),
+    order: int = Form(0),
+    is_active: bool = Form(True),
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Upload new gallery image"""
+    image_url = await store_upload(file, "gallery")
+    
+    # Create gallery image record
+    gallery_image_data = {
+        "id": str(uuid.uuid4()),
+        "url": image_url,
+        "alt_text": alt_text,
+        "caption": caption,
+        "category": category,
+        "order": order,
+        "is_active": is_active,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    row = await db.insert('gallery', gallery_image_data)
+    invalidate_gallery()
+    return GalleryImage(**row)
+
+# Registered before /gallery/{image_id} so "reorder" isn't taken for an id
+@api_router.put("/gallery/reorder")
+async def reorder_gallery_images(
+    image_orders: List[GalleryImageOrder],
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Reorder gallery images"""
+    for item in image_orders:
+        await db.update('gallery', [('id', 'eq', item.id)], {
+            "order": item.order,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        })
+    invalidate_gallery()
+    
+    return {"message": "Images reordered successfully"}
+
+@api_router.put("/gallery/{image_id}", response_model=GalleryImage)
+async def update_gallery_image(
+    image_id: str,
+    image_update: GalleryImageUpdate,
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Update gallery image"""
+    update_data = {k: v for k, v in image_update.dict().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    
+    rows = await db.update('gallery', [('id', 'eq', image_id)], update_data)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Image not found")
+    invalidate_gallery()
+    
+    return GalleryImage(**rows[0])
+
+@api_router.delete("/gallery/{image_id}")
+async def delete_gallery_image(
+    image_id: str,
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Delete gallery image"""
+    if not await db.delete('gallery', [('id', 'eq', image_id)]):
+        raise HTTPException(status_code=404, detail="Image not found")
+    invalidate_gallery()
+    
+    return {"message": "Image deleted successfully"}
+
 
 # ============================================================================
 # LEADS MANAGEMENT ENDPOINTS
@@ -794,13 +862,9 @@ async def get_leads(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Get all leads with optional status filter"""
-    query = supabase.table('leads').select('*')
-    
-    if status:
-        query = query.eq('status', status)
-    
-    response = query.order('created_at', desc=True).execute()
-    return [Lead(**lead) for lead in response.data]
+    where = [('status', 'eq', status)] if status else []
+    leads = await db.select('leads', where, order=[('created_at', True)])
+    return [Lead(**lead) for lead in leads]
 
 @api_router.get("/leads/{lead_id}", response_model=Lead)
 async def get_lead(
@@ -808,22 +872,62 @@ async def get_lead(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Get lead by ID"""
-    response = supabase.table('leads').select('*').eq('id', lead_id).execute()
-    if not response.data:
+    lead = await loader.load(db, 'leads', lead_id)
+    if lead is None:
         raise HTTPException(status_code=404, detail="Lead not found")
-    return Lead(**response.data[0])
+    return Lead(**lead)
+
+# Contact-form submissions are acknowledged once fsynced to the journal in
+# LEAD_JOURNAL_DIR and inserted by its background drainer (see journal.py), so
+# a database blip doesn't lose them. An empty LEAD_JOURNAL_DIR inserts directly.
+LEAD_JOURNAL_DIR = os.environ.get('LEAD_JOURNAL_DIR', 'lead_journal')
+# Lead ids for submissions carrying an Idempotency-Key header
+LEAD_ID_NAMESPACE = uuid.UUID('6f1c2a57-3d3e-4b7a-9a51-2c0f3f5d9e84')
+
+async def insert_journaled_leads(records: List[Dict[str, Any]]):
+    """Insert the journaled leads the table doesn't have yet (a replayed batch skips the rest)"""
+    rows = list({record['id']: record for record in records}.values())
+    existing = await db.select('leads', [('id', 'in', [row['id'] for row in rows])], columns=['id'])
+    stored = {row['id'] for row in existing}
+    # updated_at is when the row reached the table: backups and the analytics
+    # snapshot copy rows changed after their last high-water mark, and a lead
+    # held in the journal through an outage is older than the rows since
+    now = datetime.now(timezone.utc).isoformat()
+    missing = [{**row, 'updated_at': now} for row in rows if row['id'] not in stored]
+    if missing:
+        await db.upsert('leads', missing)
+
+lead_journal = journal.Journal(Path(LEAD_JOURNAL_DIR), insert_journaled_leads) if LEAD_JOURNAL_DIR else None
 
 @api_router.post("/leads", response_model=Lead)
-async def create_lead(lead_data: LeadCreate):
+async def create_lead(lead_data: LeadCreate, idempotency_key: Optional[str] = Header(None)):
     """Create new lead (public endpoint for contact form)"""
     lead_dict = lead_data.dict()
-    lead_dict['id'] = str(uuid.uuid4())
+    # A resubmission with the same Idempotency-Key gets the same id, so it's stored once
+    lead_dict['id'] = str(uuid.uuid5(LEAD_ID_NAMESPACE, idempotency_key) if idempotency_key else uuid.uuid4())
     lead_dict['status'] = 'New'
     lead_dict['created_at'] = datetime.now(timezone.utc).isoformat()
     lead_dict['updated_at'] = datetime.now(timezone.utc).isoformat()
     
-    response = supabase.table('leads').insert(lead_dict).execute()
-    return Lead(**response.data[0])
+    if lead_journal is not None and lead_journal.running:
+        try:
+            await lead_journal.append(lead_dict)
+            return Lead(**lead_dict)
+        except OSError:
+            logger.exception("Lead journal append failed, inserting directly")
+    if not idempotency_key:
+        return Lead(**await db.insert('leads', lead_dict))
+    # A retry finds the row its first attempt stored, like insert_journaled_leads
+    existing = await db.get('leads', lead_dict['id'])
+    if existing is None:
+        try:
+            return Lead(**await db.insert('leads', lead_dict))
+        except Exception:
+            # Lost the race to a concurrent retry: its row is the answer
+            existing = await db.get('leads', lead_dict['id'])
+            if existing is None:
+                raise
+    return Lead(**existing)
 
 @api_router.put("/leads/{lead_id}", response_model=Lead)
 async def update_lead(
@@ -832,17 +936,14 @@ async def update_lead(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Update lead status"""
-    response = supabase.table('leads').select('*').eq('id', lead_id).execute()
-    if not response.data:
-        raise HTTPException(status_code=404, detail="Lead not found")
-    
     update_data = {k: v for k, v in lead_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    supabase.table('leads').update(update_data).eq('id', lead_id).execute()
+    rows = await db.update('leads', [('id', 'eq', lead_id)], update_data)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Lead not found")
     
-    updated_response = supabase.table('leads').select('*').eq('id', lead_id).execute()
-    return Lead(**updated_response.data[0])
+    return Lead(**rows[0])
 
 @api_router.delete("/leads/{lead_id}")
 async def delete_lead(
@@ -850,16 +951,21 @@ async def delete_lead(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Delete lead"""
-    response = supabase.table('leads').delete().eq('id', lead_id).execute()
-    if not response.data:
+    if not await db.delete('leads', [('id', 'eq', lead_id)]):
         raise HTTPException(status_code=404, detail="Lead not found")
+    invalidate_lead_snapshot(deleted_lead_id=lead_id)
     return {"message": "Lead deleted successfully"}
 
 @api_router.get("/leads/export/csv")
 async def export_leads_csv(current_user: AdminUser = Depends(get_current_user)):
     """Export all leads to CSV"""
-    response = supabase.table('leads').select('*').order('created_at', desc=True).execute()
-    leads = response.data
+    leads = await db.select('leads', order=[('created_at', True)])
+    
+    # Append archived leads (all older than anything left in the hot table)
+    hot_ids = {lead["id"] for lead in leads}
+    import archive
+    archived_leads = await asyncio.to_thread(archive.read_rows, 'leads', store=private_store())
+    leads.extend(lead for lead in archived_leads if lead["id"] not in hot_ids)
     
     # Create CSV content
     csv_content = "Name,Phone,Email,Service Interested,Project Type,Message,Status,Created At\n"
@@ -876,11 +982,53 @@ async def export_leads_csv(current_user: AdminUser = Depends(get_current_user)):
 # SETTINGS MANAGEMENT ENDPOINTS
 # ============================================================================
 
+# The public settings reads are served from a last-known-good copy per worker
+# (and on disk in SETTINGS_CACHE_DIR), so the site keeps its real settings
+# while the database is slow or down. Every write replaces the copy here and
+# bumps the table's generation, so other workers reload on their next read.
+SETTINGS_FRESH_SECONDS = float(os.environ.get('SETTINGS_FRESH_SECONDS', 60))
+public_settings = {
+    table: resilience.StaleWhileRevalidate(
+        table,
+        lambda table=table: db.first(table),
+        shared_cache.Generation(),
+        fresh_for=SETTINGS_FRESH_SECONDS,
+        directory=Path(os.environ.get('SETTINGS_CACHE_DIR', 'settings_cache'))
+    )
+    for table in ('contact_form_settings', 'cta_settings', 'general_settings')
+}
+
+async def read_public_settings(table: str, response: Optional[Response] = None) -> Optional[Dict[str, Any]]:
+    cached = await public_settings[table].get()
+    if response is not None:
+        response.headers["Cache-Status"] = cached.cache_status
+    return cached.value
+
+# Each settings table holds one row whose id never changes once created;
+# remembered per table so an update is a single UPDATE ... RETURNING
+_settings_row_ids: Dict[str, str] = {}
+
+async def update_settings_row(table: str, changes: Dict[str, Any], new_row: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply ``changes`` to the settings row, inserting ``new_row`` if there is none"""
+    row_id = _settings_row_ids.get(table)
+    rows = await db.update(table, [('id', 'eq', row_id)], changes) if row_id else []
+    if not rows:
+        # First write in this worker, or the row was replaced (e.g. by a restore)
+        current = await loader.first(db, table)
+        if current is not None:
+            rows = await db.update(table, [('id', 'eq', current['id'])], changes)
+        if not rows:
+            rows = [await db.insert(table, new_row)]
+    _settings_row_ids[table] = rows[0]['id']
+    loader.prime(table, rows[0], single=True)
+    public_settings[table].replace(rows[0])
+    return rows[0]
+
 @api_router.get("/settings/contact-form", response_model=ContactFormSettings)
-async def get_contact_form_settings():
+async def get_contact_form_settings(response: Response = None):
     """Get contact form settings"""
-    response = supabase.table('contact_form_settings').select('*').limit(1).execute()
-    if not response.data:
+    settings = await read_public_settings('contact_form_settings', response)
+    if settings is None:
         # Return default settings
         default_settings = ContactFormSettings(
             service_options=["Civil & Interior Work", "Agriculture Solutions", "Solar Equipment"],
@@ -889,7 +1037,7 @@ async def get_contact_form_settings():
             whatsapp_number="918404861022"
         )
         return default_settings
-    return ContactFormSettings(**response.data[0])
+    return ContactFormSettings(**settings)
 
 @api_router.put("/settings/contact-form", response_model=ContactFormSettings)
 async def update_contact_form_settings(
@@ -897,30 +1045,23 @@ async def update_contact_form_settings(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Update contact form settings"""
-    response = supabase.table('contact_form_settings').select('*').limit(1).execute()
-    
-    if not response.data:
-        # Create new settings
-        new_settings_data = settings_update.dict(exclude_unset=True)
-        new_settings_data['id'] = str(uuid.uuid4())
-        new_settings_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-        
-        response = supabase.table('contact_form_settings').insert(new_settings_data).execute()
-        return ContactFormSettings(**response.data[0])
-    
     update_data = {k: v for k, v in settings_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    supabase.table('contact_form_settings').update(update_data).eq('id', response.data[0]['id']).execute()
+    # Created from the submitted fields if the table is still empty
+    new_settings_data = settings_update.dict(exclude_unset=True)
+    new_settings_data['id'] = str(uuid.uuid4())
+    new_settings_data['updated_at'] = update_data["updated_at"]
     
-    updated_response = supabase.table('contact_form_settings').select('*').limit(1).execute()
-    return ContactFormSettings(**updated_response.data[0])
+    row = await update_settings_row('contact_form_settings', update_data, new_settings_data)
+    
+    return ContactFormSettings(**row)
 
 @api_router.get("/settings/cta", response_model=CTASettings)
-async def get_cta_settings():
+async def get_cta_settings(response: Response = None):
     """Get CTA settings"""
-    response = supabase.table('cta_settings').select('*').limit(1).execute()
-    if not response.data:
+    settings = await read_public_settings('cta_settings', response)
+    if settings is None:
         # Return default settings
         default_settings = CTASettings(
             whatsapp_template="Hello! I would like to know about {service_name} services.",
@@ -928,7 +1069,7 @@ async def get_cta_settings():
             contact_page_link="/contact"
         )
         return default_settings
-    return CTASettings(**response.data[0])
+    return CTASettings(**settings)
 
 @api_router.put("/settings/cta", response_model=CTASettings)
 async def update_cta_settings(
@@ -936,30 +1077,24 @@ async def update_cta_settings(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Update CTA settings"""
-    response = supabase.table('cta_settings').select('*').limit(1).execute()
-    
-    if not response.data:
-        # Create new settings
-        new_settings_data = settings_update.dict(exclude_unset=True)
-        new_settings_data['id'] = str(uuid.uuid4())
-        new_settings_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-        
-        response = supabase.table('cta_settings').insert(new_settings_data).execute()
-        return CTASettings(**response.data[0])
-    
     update_data = {k: v for k, v in settings_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    supabase.table('cta_settings').update(update_data).eq('id', response.data[0]['id']).execute()
+    # Created from the submitted fields if the table is still empty
+    new_settings_data = settings_update.dict(exclude_unset=True)
+    new_settings_data['id'] = str(uuid.uuid4())
+    new_settings_data['updated_at'] = update_data["updated_at"]
+    
+    row = await update_settings_row('cta_settings', update_data, new_settings_data)
+    public_pages.invalidate()
     
-    updated_response = supabase.table('cta_settings').select('*').limit(1).execute()
-    return CTASettings(**updated_response.data[0])
+    return CTASettings(**row)
 
 @api_router.get("/settings/general", response_model=GeneralSettings)
-async def get_general_settings():
+async def get_general_settings(response: Response = None):
     """Get general settings"""
-    response = supabase.table('general_settings').select('*').limit(1).execute()
-    if not response.data:
+    settings = await read_public_settings('general_settings', response)
+    if settings is None:
         # Return default settings
         default_settings = GeneralSettings(
             site_name="SYNERGY INDIA",
@@ -976,7 +1111,7 @@ async def get_general_settings():
             }
         )
         return default_settings
-    return GeneralSettings(**response.data[0])
+    return GeneralSettings(**settings)
 
 @api_router.put("/settings/general", response_model=GeneralSettings)
 async def update_general_settings(
@@ -984,24 +1119,18 @@ async def update_general_settings(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Update general settings"""
-    response = supabase.table('general_settings').select('*').limit(1).execute()
-    
-    if not response.data:
-        # Create new settings
-        new_settings_data = settings_update.dict(exclude_unset=True)
-        new_settings_data['id'] = str(uuid.uuid4())
-        new_settings_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-        
-        response = supabase.table('general_settings').insert(new_settings_data).execute()
-        return GeneralSettings(**response.data[0])
-    
     update_data = {k: v for k, v in settings_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    supabase.table('general_settings').update(update_data).eq('id', response.data[0]['id']).execute()
+    # Created from the submitted fields if the table is still empty
+    new_settings_data = settings_update.dict(exclude_unset=True)
+    new_settings_data['id'] = str(uuid.uuid4())
+    new_settings_data['updated_at'] = update_data["updated_at"]
+    
+    row = await update_settings_row('general_settings', update_data, new_settings_data)
+    public_pages.invalidate()
     
-    updated_response = supabase.table('general_settings').select('*').limit(1).execute()
-    return GeneralSettings(**updated_response.data[0])
+    return GeneralSettings(**row)
 
 @api_router.post("/settings/general/logo")
 async def upload_logo(
@@ -1009,30 +1138,22 @@ async def upload_logo(
     current_user: AdminUser = Depends(get_current_user)
 ):
     """Upload new logo"""
-    # Upload to Supabase storage
-    logo_url = await upload_to_supabase_storage(file, "logos")
-    
-    # Update general settings
-    response = supabase.table('general_settings').select('*').limit(1).execute()
-    
-    if response.data:
-        supabase.table('general_settings').update({
-            "logo_url": logo_url,
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }).eq('id', response.data[0]['id']).execute()
-    else:
-        # Create new general settings
-        supabase.table('general_settings').insert({
-            "id": str(uuid.uuid4()),
-            "site_name": "SYNERGY INDIA",
-            "logo_url": logo_url,
-            "office_address": "",
-            "phone": "",
-            "email": "",
-            "office_hours": "",
-            "social_media": {},
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }).execute()
+    logo_url = await store_upload(file, "logos")
+    
+    # Update general settings (created with just the logo if there are none)
+    now = datetime.now(timezone.utc).isoformat()
+    await update_settings_row('general_settings', {"logo_url": logo_url, "updated_at": now}, {
+        "id": str(uuid.uuid4()),
+        "site_name": "SYNERGY INDIA",
+        "logo_url": logo_url,
+        "office_address": "",
+        "phone": "",
+        "email": "",
+        "office_hours": "",
+        "social_media": {},
+        "updated_at": now
+    })
+    public_pages.invalidate()
     
     return {"message": "Logo uploaded successfully", "logo_url": logo_url}
 
@@ -1045,27 +1166,18 @@ async def upload_logo(
 async def get_dashboard_stats(current_user: AdminUser = Depends(get_current_user)):
     """Get dashboard statistics"""
     # Get stats
-    leads_response = supabase.table('leads').select('id', count='exact').execute()
-    total_leads = leads_response.count or 0
+    total_leads = await db.count('leads') or 0
     
     # Get today's enquiries
     today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
-    today_response = supabase.table('leads').select('id', count='exact').gte('created_at', today_start).execute()
-    today_enquiries = today_response.count or 0
+    today_enquiries = await db.count('leads', [('created_at', 'gte', today_start)]) or 0
     
-    # Count static services (always 5)
-    total_services = 5
-    
-    # Count static gallery images
-    gallery_dir = Path("uploads/gallery")
-    total_gallery_images = 0
-    if gallery_dir.exists():
-        total_gallery_images = len([f for f in gallery_dir.iterdir() 
-                                  if f.is_file() and f.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']])
+    total_services = len(load_service_catalog())
+    total_gallery_images = len(await load_gallery())
     
     # Get recent leads (last 5)
-    recent_response = supabase.table('leads').select('*').order('created_at', desc=True).limit(5).execute()
-    recent_leads = [Lead(**lead) for lead in recent_response.data]
+    recent = await db.select('leads', order=[('created_at', True)], limit=5)
+    recent_leads = [Lead(**lead) for lead in recent]
     
     return DashboardStats(
         total_leads=total_leads,
@@ -1076,6 +1188,72 @@ async def get_dashboard_stats(current_user: AdminUser = Depends(get_current_user
     )
 
 
+# ============================================================================
+# ANALYTICS ENDPOINTS
+# ============================================================================
+
+# Columnar snapshot of the leads table, refreshed incrementally on demand.
+# Built on first use: analytics pulls in pandas and archive pulls in pyarrow.
+lead_snapshot = None
+# Bumped by whichever worker deletes/archives/restores leads; every worker
+# drops its snapshot when the generation moves past the one it last saw
+lead_generation = shared_cache.Generation()
+_lead_snapshot_generation = 0
+
+def get_lead_snapshot():
+    global lead_snapshot, _lead_snapshot_generation
+    generation = lead_generation.current
+    if lead_snapshot is not None and generation != _lead_snapshot_generation:
+        lead_snapshot.invalidate()
+    _lead_snapshot_generation = generation
+    if lead_snapshot is None:
+        import analytics
+        import archive
+        lead_snapshot = analytics.LeadSnapshot(
+            lambda: db.sync,
+            archive_loader=lambda store=private_store(): archive.read_frame('leads', analytics.SNAPSHOT_COLUMNS,
+                                                                           store=store)
+        )
+    return lead_snapshot
+
+def invalidate_lead_snapshot(deleted_lead_id: Optional[str] = None):
+    """Invalidate the lead snapshot in every worker.
+
+    For a single deleted lead this worker just drops the row, unless it had
+    already fallen behind on other changes.
+    """
+    global _lead_snapshot_generation
+    generation = lead_generation.bump()
+    if lead_snapshot is None:
+        return
+    if deleted_lead_id is not None and _lead_snapshot_generation == generation - 1:
+        lead_snapshot.discard(deleted_lead_id)
+        _lead_snapshot_generation = generation
+
+@api_router.get("/analytics/leads", response_model=LeadAnalytics)
+async def get_lead_analytics(
+    bucket: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Get lead time series, status funnel and service x project type breakdown"""
+    import analytics
+    
+    if bucket not in analytics.BUCKET_FREQUENCIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid bucket. Use one of: {', '.join(analytics.BUCKET_FREQUENCIES)}"
+        )
+    
+    snapshot = get_lead_snapshot()
+    refreshed = await snapshot.refresh()
+    metrics.cache_lookup("lead_snapshot", hit=not refreshed)
+    # The group-bys are CPU-bound; keep them off the event loop
+    report = await asyncio.to_thread(analytics.summarize, snapshot.frame(), bucket, start, end)
+    return LeadAnalytics(**report, snapshot_refreshed_at=snapshot.refreshed_at)
+
+
 # ============================================================================
 # SECURITY & BACKUP ENDPOINTS
 # ============================================================================
@@ -1083,24 +1261,231 @@ async def get_dashboard_stats(current_user: AdminUser = Depends(get_current_user
 @api_router.get("/security/login-history", response_model=List[LoginHistory])
 async def get_login_history(current_user: AdminUser = Depends(get_current_user)):
     """Get login history"""
-    response = supabase.table('login_history').select('*').order('login_time', desc=True).limit(100).execute()
-    return [LoginHistory(**record) for record in response.data]
+    records = await db.select('login_history', order=[('login_time', True)], limit=100)
+    return [LoginHistory(**record) for record in records]
+
+@api_router.post("/archive/run")
+async def run_archive(
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Move old leads and login history from the hot tables into Parquet"""
+    if older_than_days < 1:
+        raise HTTPException(status_code=400, detail="older_than_days must be at least 1")
+    
+    import archive
+    try:
+        moved = await asyncio.to_thread(archive.archive_all, db.sync, older_than_days, store=private_store())
+    except storage.NotDurable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    invalidate_lead_snapshot()
+    
+    return {
+        "message": "Archive completed",
+        "older_than_days": older_than_days,
+        "moved": moved
+    }
+
+_background_tasks = set()
+
+def _start_backup_job(job_id: str, kind: str, func, *args, on_success=None, **kwargs) -> Dict[str, Any]:
+    """Run a blocking backup/restore function in a worker thread, tracking progress.
+
+    Raises 409 while another job runs in any worker (see backup.lock_jobs).
+    """
+    lock = backup.lock_jobs()
+    if lock is None:
+        raise HTTPException(status_code=409, detail="A backup or restore is already running")
+    progress = backup.JobStatus(job_id, job=kind, status="queued", started_at=datetime.now(timezone.utc))
+    
+    def on_done(task):
+        _background_tasks.discard(task)
+        try:
+            progress["finished_at"] = datetime.now(timezone.utc)
+            if task.exception():
+                progress.update({"status": "failed", "error": str(task.exception())})
+                logger.error(f"{kind} job {job_id} failed: {task.exception()}")
+            elif on_success:
+                on_success()
+            progress.save()
+        finally:
+            backup.unlock_jobs(lock)
+    
+    task = asyncio.create_task(asyncio.to_thread(func, *args, progress=progress, store=private_store(), **kwargs))
+    _background_tasks.add(task)
+    task.add_done_callback(on_done)
+    return progress
 
 @api_router.post("/backup/manual")
-async def manual_backup(current_user: AdminUser = Depends(get_current_user)):
-    """Manual backup (placeholder - implement based on requirements)"""
-    # This is a placeholder - actual implementation would depend on backup requirements
+async def manual_backup(
+    full: bool = False,
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Start a backup in the background (incremental unless full=true)"""
+    try:
+        storage.require_durable(private_store(), "Backups")
+    except storage.NotDurable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
     backup_id = str(uuid.uuid4())
-    timestamp = datetime.now(timezone.utc)
+    progress = _start_backup_job(backup_id, "backup", backup.run_backup, db.sync, full=full, backup_id=backup_id)
     
     return {
         "message": "Manual backup initiated",
         "backup_id": backup_id,
-        "timestamp": timestamp,
+        "job_id": backup_id,
+        "timestamp": progress["started_at"],
+        "status": "initiated"
+    }
+
+@api_router.get("/backup")
+async def list_backups(current_user: AdminUser = Depends(get_current_user)):
+    """List backup manifests, newest first"""
+    manifests = await asyncio.to_thread(backup.list_backups, store=private_store())
+    return [
+        {
+            "backup_id": manifest["backup_id"],
+            "kind": manifest["kind"],
+            "base_backup_id": manifest["base_backup_id"],
+            "status": manifest["status"],
+            "started_at": manifest["started_at"],
+            "completed_at": manifest["completed_at"],
+            "rows": sum(table["rows"] for table in manifest["tables"].values())
+        }
+        for manifest in reversed(manifests)
+    ]
+
+@api_router.get("/backup/jobs/{job_id}")
+async def get_backup_job(
+    job_id: str,
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Poll the progress of a backup or restore job (started by any worker)"""
+    job = await asyncio.to_thread(backup.load_job, job_id)
+    if job:
+        return job
+    
+    # Backups from before a redeploy are still visible through their manifest
+    manifest = await asyncio.to_thread(backup.load_manifest, job_id, store=private_store())
+    if not manifest:
+        raise HTTPException(status_code=404, detail="Backup job not found")
+    return {
+        "job_id": job_id,
+        "job": "backup",
+        "status": manifest["status"],
+        "started_at": manifest["started_at"],
+        "finished_at": manifest["completed_at"],
+        "tables_total": len(backup.BACKUP_TABLES),
+        "tables_done": len(manifest["tables"]),
+        "rows": sum(table["rows"] for table in manifest["tables"].values())
+    }
+
+@api_router.post("/backup/{backup_id}/restore")
+async def restore_backup(
+    backup_id: str,
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Restore the database from a backup (and the backups it builds on)"""
+    manifest = await asyncio.to_thread(backup.load_manifest, backup_id, store=private_store())
+    if not manifest:
+        raise HTTPException(status_code=404, detail="Backup not found")
+    if manifest["status"] != "completed":
+        raise HTTPException(status_code=400, detail=f"Backup is {manifest['status']}")
+    
+    job_id = str(uuid.uuid4())
+    
+    def on_restored():
+        # Restored rows keep their old updated_at, so the snapshot needs a full reload
+        invalidate_lead_snapshot()
+        invalidate_gallery()
+    
+    progress = _start_backup_job(
+        job_id, "restore", backup.run_restore, db.sync, backup_id,
+        on_success=on_restored
+    )
+    
+    return {
+        "message": "Restore initiated",
+        "backup_id": backup_id,
+        "job_id": job_id,
+        "timestamp": progress["started_at"],
         "status": "initiated"
     }
 
 
+# ============================================================================
+# HEALTH ENDPOINTS
+# ============================================================================
+
+def probe_database():
+    db.sync.ping()
+
+health_monitor = health.HealthMonitor({"database": probe_database, "storage": upload_storage.ping})
+
+@api_router.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and its event loop is answering"""
+    return health_monitor.liveness()
+
+@api_router.get("/health/ready")
+async def health_ready():
+    """Readiness: cached result of the last database and storage probes"""
+    report = health_monitor.readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@api_router.get("/health")
+async def health_check():
+    """Readiness under the older path uptime monitors poll.
+
+    Render and Railway check /health/live instead: an instance failing their
+    check is restarted or held back from a deploy, which can't help while
+    Supabase is down.
+    """
+    return await health_ready()
+
+
+# ============================================================================
+# DIAGNOSTICS ENDPOINTS
+# ============================================================================
+
+stall_watchdog = profiling.StallWatchdog(on_stall=lambda stall: metrics.LOOP_STALLS.inc())
+profile_lock = asyncio.Lock()
+
+@api_router.get("/admin/stalls")
+async def get_loop_stalls(current_user: AdminUser = Depends(get_current_user)):
+    """Recent event-loop stalls with the stack that was running, newest first"""
+    return {"threshold_ms": stall_watchdog.threshold * 1000, "stalls": stall_watchdog.recent()}
+
+@api_router.get("/admin/concurrency")
+async def get_concurrency(current_user: AdminUser = Depends(get_current_user)):
+    """This worker's adaptive concurrency limits, in-flight calls and queues"""
+    return {limiter.name: limiter.snapshot() for limiter in (db_limiter, storage_limiter)}
+
+@api_router.get("/admin/circuits")
+async def get_circuits(current_user: AdminUser = Depends(get_current_user)):
+    """This worker's circuit breakers"""
+    return {db_breaker.name: db_breaker.snapshot()}
+
+@api_router.get("/admin/profile", response_class=PlainTextResponse)
+async def profile_server(
+    seconds: float = 10.0,
+    interval_ms: float = 5.0,
+    all_threads: bool = False,
+    current_user: AdminUser = Depends(get_current_user)
+):
+    """Sample stacks for a time window; returns folded stacks for flamegraph tools"""
+    if not 0 < seconds <= profiling.MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {profiling.MAX_PROFILE_SECONDS:g}")
+    if profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    
+    async with profile_lock:
+        thread_ids = None if all_threads else [stall_watchdog.loop_thread]
+        return await asyncio.to_thread(
+            profiling.sample_stacks, seconds, max(interval_ms, 1.0) / 1000, thread_ids
+        )
+
+
 # ============================================================================
 # LEGACY ENDPOINTS (for backward compatibility)
 # ============================================================================
@@ -1115,46 +1500,154 @@ async def create_status_check(input: StatusCheckCreate):
     status_data['id'] = str(uuid.uuid4())
     status_data['timestamp'] = datetime.now(timezone.utc).isoformat()
     
-    response = supabase.table('status_checks').insert(status_data).execute()
-    return StatusCheck(**response.data[0])
+    return StatusCheck(**await db.insert('status_checks', status_data))
 
 @api_router.get("/status", response_model=List[StatusCheck])
 async def get_status_checks():
-    response = supabase.table('status_checks').select('*').execute()
-    return [StatusCheck(**status_check) for status_check in response.data]
+    status_checks = await db.select('status_checks')
+    return [StatusCheck(**status_check) for status_check in status_checks]
 
 
-# Include the router in the main app
-app.include_router(api_router)
+# ============================================================================
+# PRERENDERED PUBLIC PAGES
+# ============================================================================
 
-# Add static file serving for photos
-from fastapi.staticfiles import StaticFiles
-# Serve static files
-app.mount("/photos", StaticFiles(directory="../photos"), name="photos")
-app.mount("/static", StaticFiles(directory="../frontend/build/static"), name="static")
+# HTML snapshots of the public routes so they paint before the bundle has run
+# (see prerender.py); PRERENDER=false serves the bare index.html instead
+PRERENDER_ENABLED = os.environ.get('PRERENDER', 'true').lower() == 'true'
+FRONTEND_INDEX = Path("../frontend/build/index.html")
+
+async def load_public_page_data() -> Dict[str, Any]:
+    return jsonable_encoder({
+        "services": load_service_catalog(),
+        "gallery": await load_gallery(),
+        "settings": {"general": await get_general_settings(), "cta": await get_cta_settings()},
+    })
+
+# Rebuilds the Vercel copy of the site (static_export.py) after content edits
+VERCEL_DEPLOY_HOOK_URL = os.environ.get('VERCEL_DEPLOY_HOOK_URL')
+
+public_pages = prerender.Prerenderer(
+    FRONTEND_INDEX,
+    Path(os.environ.get('PRERENDER_DIR', 'prerendered')),
+    load_public_page_data,
+    deploy_hook=prerender.DeployHook(VERCEL_DEPLOY_HOOK_URL) if VERCEL_DEPLOY_HOOK_URL else None,
+)
+
+
+# ============================================================================
+# APP FACTORY
+# ============================================================================
+
+# Prometheus scrape target (outside /api so the React catch-all never sees it)
+async def get_metrics():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+# A dependency at its concurrency limit: shed the request rather than queue it indefinitely
+async def overloaded_response(request, exc: limits.Overloaded):
+    return JSONResponse(
+        {"detail": f"Service busy ({exc.dependency}), please retry shortly"},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# A dependency whose circuit breaker is open: not even attempted
+async def unavailable_response(request, exc: resilience.CircuitOpen):
+    return JSONResponse(
+        {"detail": f"Service temporarily unavailable ({exc.dependency}), please retry shortly"},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+async def timeout_response(request, exc: TimeoutError):
+    return JSONResponse({"detail": "The database did not answer in time"}, status_code=504)
 
 # Serve React app
-@app.get("/{full_path:path}")
 async def serve_react_app(full_path: str):
     # If it's an API call, let it pass through
     if full_path.startswith("api/"):
         raise HTTPException(status_code=404, detail="API endpoint not found")
     
+    if PRERENDER_ENABLED:
+        snapshot = public_pages.lookup(full_path)
+        if snapshot is not None:
+            return FileResponse(snapshot, headers={"Cache-Control": "no-cache"})
+    
     # Serve index.html for all other routes (React Router)
-    index_path = Path("../frontend/build/index.html")
-    if index_path.exists():
-        return FileResponse(index_path)
+    if FRONTEND_INDEX.exists():
+        return FileResponse(FRONTEND_INDEX)
     else:
         raise HTTPException(status_code=404, detail="Frontend not built")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Site photos: content-hash ETags, 304s and byte ranges (see static_files.py)
+photo_files = static_files.CachedStaticFiles(directory="../photos")
+# React build assets. check_dir=False lets the API start (and be tested)
+# without a frontend build; the output has content-hashed names, so it can be
+# cached forever
+build_files = static_files.CachedStaticFiles(
+    directory="../frontend/build/static",
+    check_dir=False,
+    cache_control="public, max-age=31536000, immutable"
 )
 
+def preload():
+    """Build the static catalogs and the photo and build ETags (gunicorn calls this pre-fork)"""
+    load_service_catalog()
+    load_gallery_catalog()
+    photo_files.warm()
+    build_files.warm()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect to dependencies and start the background monitors"""
+    init_clients()
+    if lead_journal is not None:
+        await lead_journal.start()
+    preload()
+    health_monitor.start()
+    stall_watchdog.start()
+    if PRERENDER_ENABLED:
+        public_pages.refresh()
+    yield
+    if lead_journal is not None:
+        await lead_journal.stop()
+    await public_pages.stop()
+    await stall_watchdog.stop()
+    await health_monitor.stop()
+
+def create_app() -> FastAPI:
+    """Assemble the ASGI app; no network or heavy imports happen until startup"""
+    app = FastAPI(title="SYNERGY INDIA Admin API", lifespan=lifespan)
+    app.include_router(api_router)
+    app.add_api_route("/metrics", get_metrics, include_in_schema=False)
+    app.add_exception_handler(limits.Overloaded, overloaded_response)
+    app.add_exception_handler(resilience.CircuitOpen, unavailable_response)
+    app.add_exception_handler(TimeoutError, timeout_response)
+    
+    # Serve static files
+    app.mount("/photos", photo_files, name="photos")
+    app.mount("/static", build_files, name="static")
+    if isinstance(upload_storage, storage.LocalStorage):
+        app.mount(upload_storage.url_prefix, static_files.CachedStaticFiles(directory=upload_storage.root), name="uploads")
+    app.add_api_route("/{full_path:path}", serve_react_app, methods=["GET"])
+    
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Server-Timing", "Cache-Status"],
+    )
+    # Inside TimingMiddleware, so lookups the loader saves are counted for the request
+    app.add_middleware(loader.LoaderMiddleware, db_getter=lambda: db)
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.add_middleware(instrumentation.TimingMiddleware)
+    return app
+
+app = create_app()
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
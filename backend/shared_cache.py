@@ -0,0 +1,33 @@
+"""
+Cross-worker cache invalidation
+
+Each worker keeps its own in-memory caches (e.g. the lead analytics
+snapshot). A Generation is a counter in shared memory: whichever worker
+changes the underlying data bumps it, and every worker compares it with the
+value its cache was built at before serving from that cache.
+
+The counter has to exist before the workers fork, which gunicorn.conf.py
+arranges by preloading the app - module-level Generations then live in the
+master and are inherited by every worker. In a single process (python
+server.py, plain uvicorn) it is simply a local counter.
+"""
+
+import ctypes
+import multiprocessing
+
+
+class Generation:
+    """Monotonic counter shared by all forked workers"""
+
+    def __init__(self):
+        self._value = multiprocessing.Value(ctypes.c_ulonglong, 0)
+
+    def bump(self) -> int:
+        """Mark the data as changed; returns the new generation"""
+        with self._value.get_lock():
+            self._value.value += 1
+            return self._value.value
+
+    @property
+    def current(self) -> int:
+        return self._value.value
@@ -0,0 +1,145 @@
+-- SQLite Database Schema for SYNERGY INDIA (DATA_BACKEND=sqlite)
+-- The same tables as supabase_schema.sql; applied by
+-- repository.SqliteRepository every time it opens the database.
+--
+-- Column types map the Postgres ones onto SQLite storage classes:
+--   UUID, VARCHAR, INET, TIMESTAMPTZ -> TEXT (timestamps as ISO 8601 in UTC,
+--   which sort correctly as text), TEXT[] and JSONB -> JSON text, BOOLEAN -> 0/1.
+-- The adapter decodes the columns declared JSON or BOOLEAN back into lists,
+-- dicts and bools, so rows look exactly like the PostgREST ones, and fills in
+-- missing ids itself (gen_random_uuid() is registered on every connection).
+
+CREATE TABLE IF NOT EXISTS admin_users (
+    id TEXT PRIMARY KEY NOT NULL,
+    username TEXT UNIQUE NOT NULL,
+    hashed_password TEXT NOT NULL,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    last_login TEXT
+);
+
+CREATE TABLE IF NOT EXISTS services (
+    id TEXT PRIMARY KEY NOT NULL,
+    title TEXT NOT NULL,
+    short_intro TEXT,
+    overview TEXT NOT NULL,
+    sub_services JSON NOT NULL DEFAULT '[]',
+    benefits JSON NOT NULL DEFAULT '[]',
+    cta_text TEXT NOT NULL,
+    images JSON NOT NULL DEFAULT '[]',
+    is_active BOOLEAN DEFAULT 1,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS gallery (
+    id TEXT PRIMARY KEY NOT NULL,
+    url TEXT NOT NULL,
+    alt_text TEXT NOT NULL,
+    caption TEXT NOT NULL,
+    category TEXT NOT NULL,
+    "order" INTEGER DEFAULT 0,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS leads (
+    id TEXT PRIMARY KEY NOT NULL,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    email TEXT,
+    service_interested TEXT NOT NULL,
+    project_type TEXT NOT NULL,
+    message TEXT,
+    status TEXT DEFAULT 'New',
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS contact_form_settings (
+    id TEXT PRIMARY KEY NOT NULL,
+    service_options JSON NOT NULL DEFAULT '[]',
+    project_type_options JSON NOT NULL DEFAULT '[]',
+    admin_email TEXT NOT NULL,
+    whatsapp_number TEXT NOT NULL,
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS cta_settings (
+    id TEXT PRIMARY KEY NOT NULL,
+    whatsapp_template TEXT NOT NULL,
+    call_number TEXT NOT NULL,
+    contact_page_link TEXT NOT NULL,
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS general_settings (
+    id TEXT PRIMARY KEY NOT NULL,
+    site_name TEXT NOT NULL,
+    logo_url TEXT NOT NULL,
+    office_address TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    email TEXT NOT NULL,
+    office_hours TEXT NOT NULL,
+    social_media JSON NOT NULL DEFAULT '{}',
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS login_history (
+    id TEXT PRIMARY KEY NOT NULL,
+    username TEXT NOT NULL,
+    ip_address TEXT,
+    user_agent TEXT,
+    login_time TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    success BOOLEAN DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS status_checks (
+    id TEXT PRIMARY KEY NOT NULL,
+    client_name TEXT NOT NULL,
+    timestamp TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+-- Indexes: the ones in supabase_schema.sql, plus (column, id) pairs for the
+-- keyset scans of the backup and analytics jobs and the newest-first lists
+CREATE INDEX IF NOT EXISTS idx_services_is_active ON services(is_active);
+CREATE INDEX IF NOT EXISTS idx_services_updated_at ON services(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_gallery_is_active ON gallery(is_active);
+CREATE INDEX IF NOT EXISTS idx_gallery_order ON gallery("order");
+CREATE INDEX IF NOT EXISTS idx_gallery_updated_at ON gallery(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_leads_created_at ON leads(created_at);
+CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_leads_updated_at ON leads(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_login_history_login_time ON login_history(login_time, id);
+CREATE INDEX IF NOT EXISTS idx_status_checks_timestamp ON status_checks(timestamp, id);
+
+-- Default rows for a fresh database (admin password: admin123)
+INSERT INTO admin_users (id, username, hashed_password)
+SELECT gen_random_uuid(), 'admin', 'ef92b778bafe771e89245b89ecbc08a44a4e166c06659911881f383d4473e94f'
+WHERE NOT EXISTS (SELECT 1 FROM admin_users);
+
+INSERT INTO contact_form_settings (id, service_options, project_type_options, admin_email, whatsapp_number)
+SELECT gen_random_uuid(),
+    '["Civil & Interior Work", "Agriculture Solutions", "Solar Equipment"]',
+    '["Residential", "Commercial", "Agricultural", "Industrial"]',
+    'info@synergyindia.com',
+    '918404861022'
+WHERE NOT EXISTS (SELECT 1 FROM contact_form_settings);
+
+INSERT INTO cta_settings (id, whatsapp_template, call_number, contact_page_link)
+SELECT gen_random_uuid(),
+    'Hello! I would like to know about {service_name} services.',
+    '+916123597570',
+    '/contact'
+WHERE NOT EXISTS (SELECT 1 FROM cta_settings);
+
+INSERT INTO general_settings (id, site_name, logo_url, office_address, phone, email, office_hours, social_media)
+SELECT gen_random_uuid(),
+    'SYNERGY INDIA',
+    'https://customer-assets.emergentagent.com/job_4e865656-4cd3-4df9-b985-379e174ef909/artifacts/e98t14ka_WhatsApp%20Image%202025-09-16%20at%2018.19.38_99f24a69.jpg',
+    '05, Chaudhary Market, Opposite Paras HMRI Hospital, Raja Bazar, Patna - 800014',
+    '+91-8404861022',
+    'info@synergyindia.com',
+    'Mon-Sat: 9 AM - 6 PM',
+    '{"facebook": "", "instagram": "", "twitter": "", "linkedin": ""}'
+WHERE NOT EXISTS (SELECT 1 FROM general_settings);
@@ -0,0 +1,137 @@
+"""
+Cold-start benchmark for the SYNERGY INDIA API
+
+Imports server.py in fresh interpreters with ``-X importtime`` and reports
+the median import cost per module and per top-level package, then times the
+lifespan startup (client creation, background monitors). Each run is a new
+process, so nothing is served from a warm module cache.
+
+Usage:
+    python startup_benchmark.py                 # 5 runs, top 25 modules
+    python startup_benchmark.py --runs 10 --top 40
+    python startup_benchmark.py --json startup.json
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT_DIR = Path(__file__).parent
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# Runs the lifespan hook once and prints how long it took, in seconds
+STARTUP_SNIPPET = """
+import asyncio, time
+started = time.perf_counter()
+import server
+imported = time.perf_counter()
+
+async def main():
+    async with server.app.router.lifespan_context(server.app):
+        ready = time.perf_counter()
+    return ready
+
+ready = asyncio.run(main())
+print(imported - started, ready - imported)
+"""
+
+
+def _run(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+
+
+def measure_imports(runs: int) -> Dict[str, Dict[str, float]]:
+    """Median self/cumulative import time in ms per module over ``runs`` cold imports"""
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for _ in range(runs):
+        result = _run(["-X", "importtime", "-c", "import server"])
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing server failed:\n{result.stderr[-2000:]}")
+        for match in IMPORTTIME_LINE.finditer(result.stderr):
+            self_us, cumulative_us, _, module = match.groups()
+            entry = samples.setdefault(module, {"self": [], "cumulative": []})
+            entry["self"].append(int(self_us) / 1000)
+            entry["cumulative"].append(int(cumulative_us) / 1000)
+    return {
+        module: {"self_ms": statistics.median(values["self"]), "cumulative_ms": statistics.median(values["cumulative"])}
+        for module, values in samples.items()
+    }
+
+
+def by_package(modules: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """Self time summed per top-level package, in ms"""
+    packages: Dict[str, float] = {}
+    for module, stats in modules.items():
+        package = module.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + stats["self_ms"]
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+def measure_startup(runs: int) -> Dict[str, float]:
+    """Median import and lifespan startup time in ms"""
+    imports, startups = [], []
+    for _ in range(runs):
+        result = _run(["-c", STARTUP_SNIPPET])
+        if result.returncode != 0:
+            raise RuntimeError(f"Starting the app failed:\n{result.stderr[-2000:]}")
+        imported, started = map(float, result.stdout.split()[-2:])
+        imports.append(imported * 1000)
+        startups.append(started * 1000)
+    return {"import_ms": statistics.median(imports), "lifespan_ms": statistics.median(startups)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure SYNERGY INDIA API cold-start cost")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=25, help="modules to list")
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    args = parser.parse_args()
+
+    modules = measure_imports(args.runs)
+    packages = by_package(modules)
+    total = modules.get("server", {}).get("cumulative_ms", 0.0)
+
+    print(f"⏱  import server: {total:.1f}ms (median of {args.runs})\n")
+    print(f"{'package':<32}{'self ms':>10}")
+    for package, self_ms in list(packages.items())[:args.top]:
+        print(f"{package:<32}{self_ms:>10.1f}")
+
+    print(f"\n{'module':<48}{'self ms':>10}{'cumul ms':>10}")
+    slowest = sorted(modules.items(), key=lambda item: item[1]["cumulative_ms"], reverse=True)
+    for module, stats in slowest[:args.top]:
+        print(f"{module:<48}{stats['self_ms']:>10.1f}{stats['cumulative_ms']:>10.1f}")
+
+    startup = None
+    if os.environ.get("SUPABASE_URL"):
+        startup = measure_startup(args.runs)
+        print(f"\n🚀 lifespan startup: {startup['lifespan_ms']:.1f}ms "
+              f"(import {startup['import_ms']:.1f}ms)")
+    else:
+        print("\nℹ️  Set SUPABASE_URL/SUPABASE_ANON_KEY/SUPABASE_STORAGE_BUCKET to also time lifespan startup")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "runs": args.runs,
+            "import_ms": total,
+            "packages": packages,
+            "modules": modules,
+            "startup": startup,
+        }, indent=2))
+        print(f"💾 Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Static export of the public site
+
+Renders everything the public pages read - the services, gallery and
+settings API responses, the prerendered HTML pages (see prerender.py) and the
+site photos - into a directory a CDN can serve with no Python in the request
+path:
+
+- each API response is written as ``<path>.json`` (``/api/services`` ->
+  ``api/services.json``), each page as ``<route>/index.html``, and the bare
+  React shell as ``app.html`` for every other client-side route
+- every exported file also gets a content-hashed copy under ``_export/``
+  that can be cached forever
+- with ``--precompress``, every text file in the directory (the React bundle
+  included) gets ``.gz`` and, when the brotli package is installed, ``.br``
+  siblings, for servers that pick precompressed files (nginx gzip_static,
+  S3/CloudFront uploads). Vercel compresses on its own and never serves them.
+- ``export-manifest.json`` lists each URL with its file, hashed copy, size,
+  SHA-256 and precompressed variants
+
+The default output is the React build, which is what ``vercel.json``
+deploys. On Vercel:
+
+- What the CDN serves is the prerendered pages, the photos and the app
+  shell (the catch-all rewrite to app.html). The app itself calls the API at
+  REACT_APP_BACKEND_URL (the contact form, the admin panel), so that still
+  has to be set for the build; the ``api/*.json`` files are there for hosts
+  that map /api to them (nginx ``try_files $uri.json``), not for Vercel.
+- Reading the data needs the server's environment (SUPABASE_URL,
+  SUPABASE_ANON_KEY, SUPABASE_STORAGE_BUCKET). Without it the export is
+  skipped and the plain React build is deployed: the public pages render from
+  their bundled content, but the prerendered pages are missing.
+- The export is a snapshot taken at build time. Set VERCEL_DEPLOY_HOOK_URL
+  on the backend to a deploy hook of the Vercel project and edits to
+  services, gallery or settings rebuild it (see prerender.DeployHook);
+  without it the CDN copy stays as it was until the next deploy.
+
+Usage:
+    python static_export.py                     # into ../frontend/build
+    python static_export.py --out dist --no-photos --precompress
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT_DIR = Path(__file__).parent
+
+EXPORT_DIR = "_export"
+MANIFEST = "export-manifest.json"
+APP_SHELL = "app.html"
+
+PUBLIC_ENDPOINTS = [
+    "/api/services",
+    "/api/gallery",
+    "/api/settings/general",
+    "/api/settings/cta",
+    "/api/settings/contact-form",
+]
+
+COMPRESSIBLE = {".html", ".json", ".js", ".css", ".svg", ".txt", ".map", ".ico", ".xml", ".webmanifest"}
+# Below this the compressed file (plus headers) isn't worth serving
+MIN_COMPRESS_SIZE = 256
+
+
+async def fetch_public_api(app, service_ids) -> Dict[str, bytes]:
+    """Response bodies of the public GET endpoints, through the app itself"""
+    import httpx
+
+    urls = PUBLIC_ENDPOINTS + [f"/api/services/{service_id}" for service_id in service_ids]
+    bodies = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://export") as client:
+        for url in urls:
+            response = await client.get(url)
+            response.raise_for_status()
+            bodies[url] = response.content
+    return bodies
+
+
+def app_shell(out: Path) -> str:
+    """The build's bare index.html, kept as app.html once index.html is the home page"""
+    index, shell = out / "index.html", out / APP_SHELL
+    if index.exists() and '<div id="root"></div>' in index.read_text(encoding="utf-8"):
+        # A fresh React build (not a page rendered into it): it references the current bundle
+        shutil.copyfile(index, shell)
+    return shell.read_text(encoding="utf-8") if shell.exists() else ""
+
+
+def compress(path: Path) -> Dict[str, str]:
+    """Write .gz/.br siblings of ``path``; returns encoding -> file name"""
+    if path.suffix not in COMPRESSIBLE or path.stat().st_size < MIN_COMPRESS_SIZE:
+        return {}
+    content = path.read_bytes()
+    encoded = {"gzip": (".gz", gzip.compress(content, compresslevel=9, mtime=0))}
+    if brotli is not None:
+        encoded["br"] = (".br", brotli.compress(content, quality=11))
+
+    written = {}
+    for encoding, (suffix, data) in encoded.items():
+        target = path.with_name(path.name + suffix)
+        if len(data) < len(content):
+            target.write_bytes(data)
+            written[encoding] = target.name
+        else:
+            target.unlink(missing_ok=True)
+    return written
+
+
+def export(server, out: Path, photos: bool = True, precompress: bool = False) -> Dict[str, Any]:
+    """Write the static site into ``out``; returns the manifest"""
+    import prerender
+
+    out.mkdir(parents=True, exist_ok=True)
+    shutil.rmtree(out / EXPORT_DIR, ignore_errors=True)
+    files: Dict[str, Path] = {}
+
+    service_ids = [service.id for service in server.load_service_catalog()]
+    bodies = asyncio.run(fetch_public_api(server.app, service_ids))
+    for url, body in bodies.items():
+        target = out / f"{url.lstrip('/')}.json"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(body)
+        files[url] = target
+
+    template = app_shell(out)
+    if template:
+        data = {
+            "services": json.loads(bodies["/api/services"]),
+            "gallery": json.loads(bodies["/api/gallery"]),
+            "settings": {
+                "general": json.loads(bodies["/api/settings/general"]),
+                "cta": json.loads(bodies["/api/settings/cta"]),
+            },
+        }
+        for route, (title, description, content) in prerender.render_pages(data).items():
+            target = out / route.strip("/") / "index.html"
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(prerender.inject(template, title, description, content), encoding="utf-8")
+            files[route] = target
+        files[f"/{APP_SHELL}"] = out / APP_SHELL
+    else:
+        print(f"⚠️  No React build in {out}, exporting the API responses only")
+
+    photos_dir = ROOT_DIR.parent / "photos"
+    if photos and photos_dir.is_dir():
+        shutil.copytree(photos_dir, out / "photos", dirs_exist_ok=True)
+        for photo in sorted((out / "photos").iterdir()):
+            if photo.is_file():
+                files[f"/photos/{photo.name}"] = photo
+
+    entries = {}
+    for url, path in files.items():
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        relative = path.relative_to(out)
+        hashed = Path(EXPORT_DIR) / relative.parent / f"{relative.stem}.{digest[:12]}{relative.suffix}"
+        (out / hashed).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, out / hashed)
+        entries[url] = {
+            "file": relative.as_posix(),
+            "hashed": hashed.as_posix(),
+            "size": len(content),
+            "sha256": digest,
+            "content_type": mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+        }
+
+    if precompress:
+        # Everything in the directory, so the React bundle is precompressed too
+        by_file = {entry["file"]: entry for entry in entries.values()}
+        for path in sorted(out.rglob("*")):
+            if path.is_file() and path.suffix not in (".gz", ".br"):
+                encodings = compress(path)
+                relative = path.relative_to(out)
+                entry = by_file.get(relative.as_posix())
+                if entry is not None:
+                    entry["encodings"] = {encoding: (relative.parent / name).as_posix() for encoding, name in encodings.items()}
+
+    manifest = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "files": entries,
+    }
+    (out / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    if precompress:
+        compress(out / MANIFEST)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the SYNERGY INDIA public site as static files")
+    parser.add_argument("--out", type=Path, default=ROOT_DIR.parent / "frontend" / "build",
+                        help="output directory (default: the React build)")
+    parser.add_argument("--no-photos", action="store_true", help="don't copy the site photos")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write .gz/.br siblings (not for Vercel, which ignores them)")
+    args = parser.parse_args()
+    out = args.out.resolve()
+
+    # The server resolves ../photos and the build relative to backend/
+    os.chdir(ROOT_DIR)
+    sys.path.insert(0, str(ROOT_DIR))
+    import server
+
+    try:
+        server.init_clients()
+    except RuntimeError as e:
+        # Keep the build deployable: app.html is what the catch-all rewrite serves
+        app_shell(out)
+        print(f"⚠️  {e}; skipping the export, deploying the plain React build")
+        return
+    server.preload()
+    manifest = export(server, out, photos=not args.no_photos, precompress=args.precompress)
+
+    files = manifest["files"].values()
+    total = sum(entry["size"] for entry in files)
+    print(f"📦 Exported {len(manifest['files'])} files ({total / 1024:.0f}KB) to {out}")
+    if args.precompress:
+        compressed = sum(1 for entry in files if entry.get("encodings"))
+        print(f"🗜  {compressed} precompressed (gzip{', br' if brotli is not None else ''})")
+    print(f"💾 Manifest written to {out / MANIFEST}")
+
+
+if __name__ == "__main__":
+    main()
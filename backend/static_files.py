@@ -0,0 +1,184 @@
+"""
+StaticFiles with content-hash ETags, conditional GET and byte ranges
+
+Used for /photos, /uploads and the React build. On top of Starlette's
+StaticFiles this:
+
+- tags each file with a strong ETag derived from a SHA-256 of its content
+  (cached per path until its mtime/size change), so a rebuilt or re-deployed
+  file that didn't change keeps its ETag; files are hashed in the worker
+  thread that looks them up, or up front by warm(), never on the event loop
+- answers If-None-Match / If-Modified-Since with 304 (If-None-Match wins
+  when both are sent, per RFC 9110)
+- serves single byte ranges as 206 Partial Content, honouring If-Range, so
+  interrupted downloads resume instead of restarting; unsatisfiable ranges
+  get 416 and multi-range requests fall back to the full file
+"""
+
+import hashlib
+import os
+import re
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+CHUNK_SIZE = 64 * 1024
+RANGE_HEADER = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+class CachedStaticFiles(StaticFiles):
+    def __init__(self, *args, cache_control: str = "public, no-cache", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+        self._etags: Dict[str, Tuple[int, int, str]] = {}
+
+    # ------------------------------------------------------------------ ETags
+
+    def etag(self, full_path: str, stat_result: os.stat_result) -> str:
+        cached = self._etags.get(full_path)
+        if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(full_path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(chunk)
+        etag = f'"{digest.hexdigest()[:32]}"'
+        self._etags[full_path] = (stat_result.st_mtime_ns, stat_result.st_size, etag)
+        return etag
+
+    def lookup_path(self, path: str):
+        # Starlette runs this in a worker thread; file_response then finds the ETag cached
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            self.etag(full_path, stat_result)
+        return full_path, stat_result
+
+    def warm(self):
+        """Hash every file up front (called pre-fork so workers share the cache)"""
+        for directory in self.all_directories:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    full_path = os.path.join(root, name)
+                    self.etag(full_path, os.stat(full_path))
+
+    # ------------------------------------------------------------- responses
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        full_path = str(full_path)
+        request_headers = Headers(scope=scope)
+        etag = self.etag(full_path, stat_result)
+        headers = {
+            "etag": etag,
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "cache-control": self.cache_control,
+            "accept-ranges": "bytes",
+        }
+
+        if status_code == 200 and self._not_modified(request_headers, etag, stat_result.st_mtime):
+            return Response(status_code=304, headers=headers)
+
+        byte_range = self._range(request_headers, etag, stat_result) if status_code == 200 else None
+        if byte_range == "unsatisfiable":
+            return Response(
+                status_code=416,
+                headers={**headers, "content-range": f"bytes */{stat_result.st_size}"},
+            )
+        if byte_range is not None:
+            return self._partial_response(full_path, scope, headers, *byte_range, stat_result.st_size)
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        response.headers.update(headers)
+        return response
+
+    @staticmethod
+    def _not_modified(request_headers: Headers, etag: str, mtime: float) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [_strip_weak(tag) for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _range(request_headers: Headers, etag: str, stat_result: os.stat_result):
+        """(start, end) inclusive, "unsatisfiable", or None to send the whole file"""
+        header = request_headers.get("range")
+        if not header:
+            return None
+
+        if_range = request_headers.get("if-range")
+        if if_range:
+            if if_range.startswith('"') or if_range.startswith("W/"):
+                # Weak tags never match for If-Range
+                if if_range != etag:
+                    return None
+            else:
+                try:
+                    if parsedate_to_datetime(if_range).timestamp() < int(stat_result.st_mtime):
+                        return None
+                except (TypeError, ValueError):
+                    return None
+
+        match = RANGE_HEADER.match(header.strip())
+        if match is None:
+            return None  # malformed or multi-range: serve the full file
+        first, last = match.groups()
+        size = stat_result.st_size
+        if first == "" and last == "":
+            return None
+        if first == "":
+            # Suffix range: the final N bytes
+            length = int(last)
+            if length == 0:
+                return "unsatisfiable"
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            return "unsatisfiable"
+        return start, end
+
+    @staticmethod
+    def _partial_response(full_path: str, scope: Scope, headers: Dict[str, str],
+                          start: int, end: int, size: int) -> Response:
+        length = end - start + 1
+        headers = {
+            **headers,
+            "content-range": f"bytes {start}-{end}/{size}",
+            "content-length": str(length),
+        }
+        media_type = FileResponse(full_path).media_type
+
+        if scope["method"] == "HEAD":
+            return Response(status_code=206, headers=headers, media_type=media_type)
+
+        async def body():
+            async with await anyio.open_file(full_path, "rb") as handle:
+                await handle.seek(start)
+                remaining = length
+                while remaining > 0:
+                    chunk = await handle.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+
+        return StreamingResponse(body(), status_code=206, headers=headers, media_type=media_type)
@@ -0,0 +1,462 @@
+"""
+Pluggable file storage for uploads (service images, gallery, logos)
+
+One async interface, three backends:
+
+- LocalStorage: files under a directory; the app serves them at /uploads
+  through static_files.CachedStaticFiles
+- SupabaseStorage: a Supabase Storage bucket (the original behaviour)
+- S3Storage: any S3-compatible bucket (AWS, R2, MinIO...); needs boto3
+
+STORAGE_BACKEND (supabase | local | s3) picks the backend; see from_env().
+The remote backends send their calls through ``limiter`` when one is set
+(limits.AdaptiveLimiter); the readiness ping bypasses it.
+
+Backups and archives go to a second, private bucket (private_from_env()):
+on Render and Railway the app's own disk is wiped on every deploy, so
+anything kept only there is lost. Jobs that run in worker threads reach it
+through BlockingStorage.
+"""
+
+import asyncio
+import mimetypes
+import os
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, List, Optional, Union
+
+CHUNK_SIZE = 256 * 1024
+LIST_PAGE = 1000
+
+# The backend/ directory (ARCHIVE_DIR, BACKUP_DIR) is on a disk that survives
+# deploys: a Render disk, a Railway volume, a VM
+PERSISTENT_DISK = os.environ.get('PERSISTENT_DISK', 'false').lower() == 'true'
+
+Source = Union[bytes, AsyncIterator[bytes]]
+
+
+@dataclass
+class ObjectInfo:
+    path: str
+    size: int
+    modified: Optional[datetime] = None
+    content_type: Optional[str] = None
+
+
+class ObjectNotFound(Exception):
+    pass
+
+
+class NotDurable(RuntimeError):
+    """Data would only be kept on a disk the next deploy wipes"""
+
+
+def require_durable(store: Optional["BlockingStorage"], what: str):
+    """Raise NotDurable unless ``what`` has a private bucket or a persistent disk to go to"""
+    if store is None and not PERSISTENT_DISK:
+        raise NotDurable(f"{what} need durable storage: set PRIVATE_STORAGE_BUCKET, "
+                         "or PERSISTENT_DISK=true if the backend directory is on a persistent disk")
+
+
+async def _iterate(source: Source) -> AsyncIterator[bytes]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+    else:
+        async for chunk in source:
+            yield chunk
+
+
+async def _spool(source: Source):
+    """Buffer ``source`` into a temp file (in memory up to 8MB) for SDKs that need a file"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    async for chunk in _iterate(source):
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled
+
+
+def _not_found(error: Exception) -> bool:
+    """Whether an SDK error says the object doesn't exist (rather than an outage or a rejected call)"""
+    # storage3 raises StorageException({"statusCode": "404", "error": "not_found", ...})
+    details = error.args[0] if error.args and isinstance(error.args[0], dict) else {}
+    if str(details.get("statusCode")) == "404" or details.get("error") == "not_found":
+        return True
+    # botocore's ClientError, httpx's HTTPStatusError
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+    return getattr(response, "status_code", None) == 404
+
+
+def _end(size: int, start: int, end: Optional[int]) -> int:
+    """Inclusive end offset of a read, clamped to the object"""
+    return size - 1 if end is None else min(end, size - 1)
+
+
+class StorageBackend(ABC):
+    """Async object storage keyed by slash-separated paths"""
+
+    limiter = None
+
+    async def _call(self, fn: Callable, *args, **kwargs):
+        """Run a blocking SDK call in a worker thread, inside the limiter if any"""
+        if self.limiter is None:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        async with self.limiter.slot():
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+    @abstractmethod
+    async def put(self, path: str, source: Source, content_type: Optional[str] = None) -> int:
+        """Store ``source`` (bytes or an async iterator of chunks); returns the size"""
+
+    @abstractmethod
+    def get(self, path: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Stream bytes ``start``..``end`` (inclusive; None = to the end)"""
+
+    @abstractmethod
+    async def stat(self, path: str) -> ObjectInfo:
+        """Size and metadata; raises ObjectNotFound"""
+
+    @abstractmethod
+    async def delete(self, path: str):
+        pass
+
+    @abstractmethod
+    async def list(self, directory: str) -> List[ObjectInfo]:
+        """Every object under ``directory``, recursively, in path order"""
+
+    @abstractmethod
+    def public_url(self, path: str) -> str:
+        pass
+
+    @abstractmethod
+    async def ping(self):
+        """Raise if the backend is unreachable (used by the readiness probe)"""
+
+    async def read(self, path: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        return b"".join([chunk async for chunk in self.get(path, start, end)])
+
+    @staticmethod
+    def new_path(directory: str, filename: str) -> str:
+        """Collision-free object path keeping the upload's extension"""
+        return f"{directory}/{uuid.uuid4()}{Path(filename or '').suffix}"
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: Union[str, Path], url_prefix: str = "/uploads"):
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def local_path(self, path: str) -> Path:
+        full = (self.root / path).resolve()
+        if not full.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Path escapes storage root: {path}")
+        return full
+
+    async def put(self, path: str, source: Source, content_type: Optional[str] = None) -> int:
+        target = self.local_path(path)
+        await asyncio.to_thread(target.parent.mkdir, parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial file
+        temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        size = 0
+        handle = await asyncio.to_thread(open, temp, "wb")
+        try:
+            async for chunk in _iterate(source):
+                await asyncio.to_thread(handle.write, chunk)
+                size += len(chunk)
+        except BaseException:
+            handle.close()
+            temp.unlink(missing_ok=True)
+            raise
+        handle.close()
+        await asyncio.to_thread(os.replace, temp, target)
+        return size
+
+    async def get(self, path: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        try:
+            handle = await asyncio.to_thread(open, self.local_path(path), "rb")
+        except FileNotFoundError:
+            raise ObjectNotFound(path)
+        try:
+            size = os.fstat(handle.fileno()).st_size
+            last = _end(size, start, end)
+            for offset in range(start, last + 1, CHUNK_SIZE):
+                yield await asyncio.to_thread(os.pread, handle.fileno(), min(CHUNK_SIZE, last + 1 - offset), offset)
+        finally:
+            handle.close()
+
+    async def stat(self, path: str) -> ObjectInfo:
+        try:
+            result = await asyncio.to_thread(os.stat, self.local_path(path))
+        except FileNotFoundError:
+            raise ObjectNotFound(path)
+        return ObjectInfo(
+            path=path,
+            size=result.st_size,
+            modified=datetime.fromtimestamp(result.st_mtime, timezone.utc),
+            content_type=mimetypes.guess_type(path)[0],
+        )
+
+    async def delete(self, path: str):
+        await asyncio.to_thread(self.local_path(path).unlink, missing_ok=True)
+
+    def _list(self, directory: str) -> List[ObjectInfo]:
+        found = []
+        for full in sorted(self.local_path(directory).rglob("*")):
+            # Dot files are uploads still being written
+            if full.is_file() and not full.name.startswith("."):
+                result = full.stat()
+                found.append(ObjectInfo(
+                    path=full.relative_to(self.root.resolve()).as_posix(),
+                    size=result.st_size,
+                    modified=datetime.fromtimestamp(result.st_mtime, timezone.utc),
+                    content_type=mimetypes.guess_type(full.name)[0],
+                ))
+        return found
+
+    async def list(self, directory: str) -> List[ObjectInfo]:
+        return await asyncio.to_thread(self._list, directory)
+
+    def public_url(self, path: str) -> str:
+        return f"{self.url_prefix}/{path}"
+
+    async def ping(self):
+        if not os.access(self.root, os.W_OK):
+            raise RuntimeError(f"{self.root} is not writable")
+
+
+class SupabaseStorage(StorageBackend):
+    """Supabase Storage bucket; the sync SDK runs in worker threads.
+
+    The SDK has no ranged download, so range reads fetch the object and
+    slice it - fine for the 1MB uploads this app accepts.
+    """
+
+    def __init__(self, client_getter: Callable, bucket: str):
+        self._client_getter = client_getter
+        self.bucket = bucket
+
+    def _bucket(self):
+        return self._client_getter().storage.from_(self.bucket)
+
+    async def put(self, path: str, source: Source, content_type: Optional[str] = None) -> int:
+        content = b"".join([chunk async for chunk in _iterate(source)])
+        # Overwrites, like the other backends (backup manifests are rewritten in place)
+        options = {"content-type": content_type or mimetypes.guess_type(path)[0] or "application/octet-stream",
+                   "upsert": "true"}
+        await self._call(self._bucket().upload, path, content, options)
+        return len(content)
+
+    async def get(self, path: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        try:
+            content = await self._call(self._bucket().download, path)
+        except Exception as e:
+            if _not_found(e):
+                raise ObjectNotFound(path) from e
+            raise
+        last = _end(len(content), start, end)
+        for offset in range(start, last + 1, CHUNK_SIZE):
+            yield content[offset:min(offset + CHUNK_SIZE, last + 1)]
+
+    async def stat(self, path: str) -> ObjectInfo:
+        # Listing the folder, filtered to the name, returns the metadata without the content
+        folder, _, name = path.rpartition("/")
+        for entry in await self._call(self._bucket().list, folder, {"limit": LIST_PAGE, "search": name}):
+            if entry["name"] == name and entry.get("id") is not None:
+                return self._info(path, entry)
+        raise ObjectNotFound(path)
+
+    async def delete(self, path: str):
+        await self._call(self._bucket().remove, [path])
+
+    @staticmethod
+    def _info(path: str, entry: dict) -> ObjectInfo:
+        metadata = entry.get("metadata") or {}
+        modified = entry.get("updated_at")
+        return ObjectInfo(
+            path=path,
+            size=int(metadata.get("size") or 0),
+            modified=datetime.fromisoformat(modified.replace("Z", "+00:00")) if modified else None,
+            content_type=metadata.get("mimetype"),
+        )
+
+    async def list(self, directory: str) -> List[ObjectInfo]:
+        # The API lists one folder at a time; folders are the entries without an id
+        found, folders = [], [directory.strip("/")]
+        while folders:
+            folder = folders.pop()
+            offset = 0
+            while True:
+                page = await self._call(self._bucket().list, folder, {"limit": LIST_PAGE, "offset": offset})
+                for entry in page:
+                    path = f"{folder}/{entry['name']}" if folder else entry["name"]
+                    if entry.get("id") is None:
+                        folders.append(path)
+                    else:
+                        found.append(self._info(path, entry))
+                if len(page) < LIST_PAGE:
+                    break
+                offset += LIST_PAGE
+        return sorted(found, key=lambda info: info.path)
+
+    def public_url(self, path: str) -> str:
+        return self._bucket().get_public_url(path)
+
+    async def ping(self):
+        await asyncio.to_thread(self._client_getter().storage.get_bucket, self.bucket)
+
+
+class S3Storage(StorageBackend):
+    """S3-compatible bucket via boto3 (sync client in worker threads)"""
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, region: Optional[str] = None,
+                 public_base_url: Optional[str] = None):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("S3 storage needs boto3: pip install boto3")
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.public_base_url = public_base_url
+        self._s3 = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+
+    async def put(self, path: str, source: Source, content_type: Optional[str] = None) -> int:
+        spooled = await _spool(source)
+        try:
+            size = spooled.seek(0, os.SEEK_END)
+            spooled.seek(0)
+            extra = {"ContentType": content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"}
+            await self._call(self._s3.upload_fileobj, spooled, self.bucket, path, ExtraArgs=extra)
+        finally:
+            spooled.close()
+        return size
+
+    async def get(self, path: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        byte_range = f"bytes={start}-" + ("" if end is None else str(end))
+        try:
+            response = await self._call(self._s3.get_object, Bucket=self.bucket, Key=path, Range=byte_range)
+        except self._s3.exceptions.NoSuchKey:
+            raise ObjectNotFound(path)
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def stat(self, path: str) -> ObjectInfo:
+        try:
+            head = await self._call(self._s3.head_object, Bucket=self.bucket, Key=path)
+        except Exception as e:
+            if _not_found(e):
+                raise ObjectNotFound(path) from e
+            raise
+        return ObjectInfo(path=path, size=head["ContentLength"], modified=head.get("LastModified"),
+                          content_type=head.get("ContentType"))
+
+    async def delete(self, path: str):
+        await self._call(self._s3.delete_object, Bucket=self.bucket, Key=path)
+
+    async def list(self, directory: str) -> List[ObjectInfo]:
+        arguments = {"Bucket": self.bucket, "Prefix": directory.strip("/") + "/"}
+        found = []
+        while True:
+            page = await self._call(self._s3.list_objects_v2, **arguments)
+            found.extend(ObjectInfo(path=item["Key"], size=item["Size"], modified=item.get("LastModified"))
+                         for item in page.get("Contents", []))
+            if not page.get("IsTruncated"):
+                return found
+            arguments["ContinuationToken"] = page["NextContinuationToken"]
+
+    def public_url(self, path: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url.rstrip('/')}/{path}"
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{path}"
+        return f"https://{self.bucket}.s3.amazonaws.com/{path}"
+
+    async def ping(self):
+        await asyncio.to_thread(self._s3.head_bucket, Bucket=self.bucket)
+
+
+class BlockingStorage:
+    """Blocking calls on a StorageBackend, for jobs running in worker threads.
+
+    With ``loop`` (the server's) the calls run there, inside the backend's
+    limiter; without one (the CLIs) each runs in a fresh event loop.
+    """
+
+    def __init__(self, backend: StorageBackend, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.backend = backend
+        self.loop = loop
+
+    def _run(self, coroutine):
+        if self.loop is None:
+            return asyncio.run(coroutine)
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def upload(self, path: str, local: Path) -> int:
+        return self._run(self.backend.put(path, local.read_bytes()))
+
+    def download(self, path: str, local: Path):
+        """Copy the object to ``local``, which never holds a partial file"""
+        content = self._run(self.backend.read(path))
+        local.parent.mkdir(parents=True, exist_ok=True)
+        temp = local.with_name(f".{local.name}.{uuid.uuid4().hex}.tmp")
+        temp.write_bytes(content)
+        os.replace(temp, local)
+
+    def put(self, path: str, content: bytes) -> int:
+        return self._run(self.backend.put(path, content))
+
+    def read(self, path: str) -> bytes:
+        return self._run(self.backend.read(path))
+
+    def list(self, directory: str) -> List[ObjectInfo]:
+        return self._run(self.backend.list(directory))
+
+
+def from_env(client_getter: Optional[Callable] = None, default: str = "supabase") -> StorageBackend:
+    """Backend chosen by STORAGE_BACKEND.
+
+    local:    LOCAL_STORAGE_DIR (default uploads), served under /uploads
+    supabase: SUPABASE_STORAGE_BUCKET, using the client from ``client_getter``
+    s3:       S3_BUCKET, S3_ENDPOINT_URL, S3_REGION, S3_PUBLIC_URL (+ AWS_* credentials)
+    """
+    backend = os.environ.get('STORAGE_BACKEND', default).lower()
+    if backend == "local":
+        return LocalStorage(os.environ.get('LOCAL_STORAGE_DIR', 'uploads'))
+    if backend == "supabase":
+        return SupabaseStorage(client_getter, os.environ.get('SUPABASE_STORAGE_BUCKET'))
+    if backend == "s3":
+        return S3Storage(
+            os.environ['S3_BUCKET'],
+            endpoint_url=os.environ.get('S3_ENDPOINT_URL'),
+            region=os.environ.get('S3_REGION'),
+            public_base_url=os.environ.get('S3_PUBLIC_URL'),
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}' (use local, supabase or s3)")
+
+
+def private_from_env(client_getter: Optional[Callable] = None, default: str = "supabase") -> Optional[StorageBackend]:
+    """Private bucket for backups and archives, on the STORAGE_BACKEND service.
+
+    PRIVATE_STORAGE_BUCKET names it (a Supabase bucket that is not public, or
+    an S3 bucket); None when it isn't set or STORAGE_BACKEND is local, where
+    the data can only be kept on disk (see PERSISTENT_DISK).
+    """
+    bucket = os.environ.get('PRIVATE_STORAGE_BUCKET')
+    backend = os.environ.get('STORAGE_BACKEND', default).lower()
+    if not bucket or backend == "local":
+        return None
+    if backend == "supabase":
+        return SupabaseStorage(client_getter, bucket)
+    return S3Storage(bucket, endpoint_url=os.environ.get('S3_ENDPOINT_URL'), region=os.environ.get('S3_REGION'))
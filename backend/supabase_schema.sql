@@ -144,6 +144,8 @@ CREATE INDEX idx_gallery_order ON gallery("order");
 CREATE INDEX idx_leads_created_at ON leads(created_at);
 CREATE INDEX idx_leads_status ON leads(status);
 CREATE INDEX idx_login_history_login_time ON login_history(login_time);
+-- Later index changes are versioned in migrations/; apply them with
+-- python schema_migrations.py (see explain_indexes.py for the query plans)
 
 -- Enable Row Level Security (RLS)
 ALTER TABLE admin_users ENABLE ROW LEVEL SECURITY;
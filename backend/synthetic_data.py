@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for SYNERGY INDIA load testing
+Produces realistic leads, login history and gallery rows at scale. Output is
+deterministic for a given --seed, config and --end (which defaults to the
+start of the current UTC day), whatever the sink, so benchmark runs are
+comparable.
+
+Usage:
+    python synthetic_data.py --leads 1000000 --out synthetic/                 # NDJSON
+    python synthetic_data.py --leads 1000000 --format csv --out synthetic/
+    python synthetic_data.py --leads 1000000 --target postgres --dsn postgresql://localhost/synergy
+    python synthetic_data.py --leads 1000000 --target mongo
+    python synthetic_data.py --leads 100000 --target sqlite                   # SQLITE_PATH
+    python synthetic_data.py --config loadtest.json --seed 7 --out synthetic/
+
+The NDJSON directory can also be loaded later with
+``python migrate_data.py --snapshot synthetic/ --blind``.
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import itertools
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+sys.path.append(str(Path(__file__).parent))
+
+
+CHUNK_ROWS = 50000
+
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Amit", "Ananya", "Anil", "Arjun", "Deepak", "Divya", "Gaurav", "Kavita",
+    "Manish", "Meena", "Neha", "Nitin", "Pooja", "Priya", "Rahul", "Rajesh", "Ravi", "Rohit",
+    "Sanjay", "Shalini", "Sneha", "Sunil", "Sunita", "Suresh", "Vikas", "Vinod", "Pankaj", "Ritu",
+]
+LAST_NAMES = [
+    "Kumar", "Singh", "Sharma", "Verma", "Gupta", "Yadav", "Prasad", "Mishra", "Jha", "Sinha",
+    "Pandey", "Tiwari", "Devi", "Chaudhary", "Mehta", "Rai", "Paswan", "Thakur", "Srivastava", "Roy",
+]
+EMAIL_DOMAINS = ["gmail.com", "yahoo.co.in", "outlook.com", "rediffmail.com", "example.com"]
+MESSAGES = [
+    "Please call me back about {service}.",
+    "Looking for a quote for {service} for my {project} project.",
+    "Interested in {service}. What is the approximate cost?",
+    "Need a site visit for {service} in Patna.",
+    "Want to know about government subsidy for {service}.",
+    "",
+]
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "Mozilla/5.0 (Linux; Android 14; SM-A546E) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15",
+]
+GALLERY_CATEGORIES = {
+    "Civil Work": "Civil Construction Work",
+    "Renovation": "Renovation & Remodeling",
+    "Interior Design": "Interior Design & Execution",
+    "Finishing": "Finishing & Aesthetic Works",
+    "Commercial": "Commercial Interiors",
+    "Agriculture": "Irrigation System Installation",
+    "Solar Energy": "Solar Plant Installation",
+}
+
+# Enquiries arrive mostly in Indian business hours (09:00-19:00 IST = 03:30-13:30 UTC)
+HOURLY_WEIGHTS_UTC = np.array(
+    [1, 1, 2, 6, 9, 10, 10, 9, 8, 9, 10, 9, 8, 6, 4, 3, 2, 2, 1, 1, 1, 1, 1, 1], dtype=float
+)
+
+
+class GeneratorConfig(BaseModel):
+    seed: int = 42
+    leads: int = 100000
+    login_history: int = 10000
+    gallery: int = 500
+    days: int = 365
+    # Exponent on the age distribution: 1 is uniform, >1 piles rows up near "now"
+    time_skew: float = 2.0
+    status_mix: Dict[str, float] = {"New": 0.45, "In Progress": 0.3, "Closed": 0.25}
+    # Defaults mirror ContactFormSettings returned by the API on a fresh install
+    service_options: List[str] = ["Civil & Interior Work", "Agriculture Solutions", "Solar Equipment"]
+    service_weights: Optional[List[float]] = None
+    project_type_options: List[str] = ["Residential", "Commercial", "Agricultural", "Industrial"]
+    email_rate: float = 0.7
+    login_success_rate: float = 0.93
+    usernames: List[str] = ["admin"]
+    end: Optional[datetime] = None
+
+
+def _probabilities(weights) -> np.ndarray:
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+class Generator:
+    """Column-at-a-time generation with numpy; one RNG stream per table"""
+
+    TABLES = ("leads", "login_history", "gallery")
+
+    def __init__(self, config: GeneratorConfig):
+        self.config = config
+        self.end = config.end or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _rng(self, table: str) -> np.random.Generator:
+        return np.random.default_rng([self.config.seed, self.TABLES.index(table)])
+
+    def _uuids(self, rng: np.random.Generator, count: int) -> List[str]:
+        raw = rng.bytes(16 * count)
+        return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+    def _timestamps(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        """Epoch seconds skewed toward the end of the window, in business hours"""
+        ages = np.floor(self.config.days * rng.random(count) ** self.config.time_skew)
+        hours = rng.choice(24, size=count, p=_probabilities(HOURLY_WEIGHTS_UTC))
+        seconds = hours * 3600 + rng.integers(0, 3600, size=count)
+        midnight = self.end.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        stamps = midnight - ages * 86400 + seconds
+        # Later-today times have not happened yet; move them to the previous day
+        return np.where(stamps > self.end.timestamp(), stamps - 86400, stamps)
+
+    @staticmethod
+    def _iso(stamps: np.ndarray) -> List[str]:
+        return [datetime.fromtimestamp(s, tz=timezone.utc).isoformat() for s in stamps.tolist()]
+
+    def _chunks(self, total: int) -> Iterator[int]:
+        for start in range(0, total, CHUNK_ROWS):
+            yield min(CHUNK_ROWS, total - start)
+
+    def leads(self) -> Iterator[List[Dict[str, Any]]]:
+        config = self.config
+        rng = self._rng("leads")
+        statuses = list(config.status_mix)
+        status_p = _probabilities(list(config.status_mix.values()))
+        service_p = _probabilities(config.service_weights or [1] * len(config.service_options))
+
+        for count in self._chunks(config.leads):
+            ids = self._uuids(rng, count)
+            first = rng.integers(0, len(FIRST_NAMES), size=count)
+            last = rng.integers(0, len(LAST_NAMES), size=count)
+            phones = rng.integers(6000000000, 9999999999, size=count)
+            has_email = rng.random(count) < config.email_rate
+            domains = rng.integers(0, len(EMAIL_DOMAINS), size=count)
+            services = rng.choice(len(config.service_options), size=count, p=service_p)
+            projects = rng.integers(0, len(config.project_type_options), size=count)
+            messages = rng.integers(0, len(MESSAGES), size=count)
+            status = rng.choice(len(statuses), size=count, p=status_p)
+            created = self._timestamps(rng, count)
+            # Leads that moved past "New" were touched some hours or days later
+            fresh = statuses.index("New") if "New" in statuses else -1
+            touched = np.where(status != fresh, created + rng.exponential(3 * 86400, size=count), created)
+            updated = np.minimum(touched, self.end.timestamp())
+            created_iso, updated_iso = self._iso(created), self._iso(updated)
+            # Plain lists index far faster than numpy scalars in the row loop
+            first, last, phones, has_email, domains, services, projects, messages, status = (
+                column.tolist() for column in (first, last, phones, has_email, domains, services, projects, messages, status)
+            )
+
+            rows = []
+            for i in range(count):
+                first_name, last_name = FIRST_NAMES[first[i]], LAST_NAMES[last[i]]
+                service = config.service_options[services[i]]
+                project = config.project_type_options[projects[i]]
+                rows.append({
+                    "id": ids[i],
+                    "name": f"{first_name} {last_name}",
+                    "phone": f"+91-{phones[i]}",
+                    "email": f"{first_name.lower()}.{last_name.lower()}{phones[i] % 1000}@{EMAIL_DOMAINS[domains[i]]}" if has_email[i] else None,
+                    "service_interested": service,
+                    "project_type": project,
+                    "message": MESSAGES[messages[i]].format(service=service, project=project.lower()) or None,
+                    "status": statuses[status[i]],
+                    "created_at": created_iso[i],
+                    "updated_at": updated_iso[i],
+                })
+            yield rows
+
+    def login_history(self) -> Iterator[List[Dict[str, Any]]]:
+        config = self.config
+        rng = self._rng("login_history")
+
+        for count in self._chunks(config.login_history):
+            ids = self._uuids(rng, count)
+            users = rng.integers(0, len(config.usernames), size=count).tolist()
+            octets = rng.integers(1, 255, size=(count, 4)).tolist()
+            agents = rng.integers(0, len(USER_AGENTS), size=count).tolist()
+            success = (rng.random(count) < config.login_success_rate).tolist()
+            times = self._iso(self._timestamps(rng, count))
+            yield [
+                {
+                    "id": ids[i],
+                    "username": config.usernames[users[i]],
+                    "ip_address": ".".join(str(octet) for octet in octets[i]),
+                    "user_agent": USER_AGENTS[agents[i]],
+                    "login_time": times[i],
+                    "success": success[i],
+                }
+                for i in range(count)
+            ]
+
+    def gallery(self) -> Iterator[List[Dict[str, Any]]]:
+        config = self.config
+        rng = self._rng("gallery")
+        categories = list(GALLERY_CATEGORIES)
+        order = 0
+
+        for count in self._chunks(config.gallery):
+            ids = self._uuids(rng, count)
+            picked = rng.integers(0, len(categories), size=count).tolist()
+            active = (rng.random(count) < 0.95).tolist()
+            created_iso = self._iso(self._timestamps(rng, count))
+            rows = []
+            for i in range(count):
+                category = categories[picked[i]]
+                rows.append({
+                    "id": ids[i],
+                    "url": f"/uploads/gallery/{ids[i]}.jpg",
+                    "alt_text": f"{GALLERY_CATEGORIES[category]} project by SYNERGY INDIA",
+                    "caption": GALLERY_CATEGORIES[category],
+                    "category": category,
+                    "order": order,
+                    "is_active": active[i],
+                    "created_at": created_iso[i],
+                    "updated_at": created_iso[i],
+                })
+                order += 1
+            yield rows
+
+    def tables(self) -> Dict[str, Iterator[List[Dict[str, Any]]]]:
+        return {table: getattr(self, table)() for table in self.TABLES}
+
+
+# ============================================================================
+# SINKS
+# ============================================================================
+
+def write_files(generator: Generator, out_dir: Path, file_format: str = "ndjson", compress: bool = False) -> Dict[str, int]:
+    """Stream every table to <table>.ndjson or <table>.csv (optionally gzipped)"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for table, chunks in generator.tables().items():
+        path = out_dir / f"{table}.{file_format}{'.gz' if compress else ''}"
+        opener = gzip.open if compress else open
+        count = 0
+        with opener(path, "wt", encoding="utf-8", newline="") as handle:
+            writer = None
+            for rows in chunks:
+                if file_format == "ndjson":
+                    handle.write("".join(json.dumps(row) + "\n" for row in rows))
+                else:
+                    if writer is None:
+                        writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+                        writer.writeheader()
+                    writer.writerows(rows)
+                count += len(rows)
+        written[table] = count
+        print(f"✅ {table}: {count} rows -> {path}")
+    return written
+
+
+def write_postgres(generator: Generator, dsn: str) -> Dict[str, int]:
+    """COPY every table into a Postgres database created from supabase_schema.sql"""
+    try:
+        import psycopg
+    except ImportError:
+        raise SystemExit("❌ The postgres target needs psycopg: pip install 'psycopg[binary]'")
+
+    written = {}
+    with psycopg.connect(dsn) as connection:
+        for table, chunks in generator.tables().items():
+            first = next(chunks, None)
+            if first is None:
+                written[table] = 0
+                continue
+            columns = list(first[0])
+            quoted = ", ".join(f'"{column}"' for column in columns)
+            count = 0
+            with connection.cursor() as cursor, cursor.copy(f"COPY {table} ({quoted}) FROM STDIN") as copy:
+                for rows in itertools.chain([first], chunks):
+                    for row in rows:
+                        copy.write_row([row[column] for column in columns])
+                    count += len(rows)
+            connection.commit()
+            written[table] = count
+            print(f"✅ {table}: {count} rows copied")
+    return written
+
+
+def write_backend(generator: Generator, target_name: str, concurrency: int = 16) -> Dict[str, int]:
+    """Bulk upsert into Supabase, MongoDB or SQLite through the migration tool"""
+    import migrate_data
+
+    def flatten(chunks):
+        for rows in chunks:
+            yield from rows
+
+    tables = {table: flatten(chunks) for table, chunks in generator.tables().items()}
+    target = migrate_data.open_target(target_name)
+    migrator = migrate_data.Migrator(target, blind=True, concurrency=concurrency)
+
+    async def run():
+        try:
+            await migrator.migrate(tables)
+        finally:
+            migrate_data.close_target(target)
+
+    asyncio.run(run())
+    return {table: counts["insert"] + counts["update"] for table, counts in migrator.stats.items()}
+
+
+def load_config(path: Optional[Path], overrides: Dict[str, Any]) -> GeneratorConfig:
+    data = json.loads(path.read_text()) if path else {}
+    data.update({key: value for key, value in overrides.items() if value is not None})
+    return GeneratorConfig(**data)
+
+
+def _parse_mix(text: Optional[str]) -> Optional[Dict[str, float]]:
+    if not text:
+        return None
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).parent / '.env')
+
+    parser = argparse.ArgumentParser(description="Generate synthetic SYNERGY INDIA data")
+    parser.add_argument("--config", type=Path, help="JSON file with GeneratorConfig fields")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--leads", type=int)
+    parser.add_argument("--login-history", type=int)
+    parser.add_argument("--gallery", type=int)
+    parser.add_argument("--days", type=int, help="spread rows over this many days")
+    parser.add_argument("--time-skew", type=float, help="1 = uniform, higher = more recent rows")
+    parser.add_argument("--status-mix", help='e.g. "New=0.5,In Progress=0.3,Closed=0.2"')
+    parser.add_argument("--end", type=datetime.fromisoformat, help="newest timestamp (ISO 8601), pin for reproducible output")
+    parser.add_argument("--target", choices=["files", "postgres", "mongo", "supabase", "sqlite"], default="files")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--out", type=Path, default=Path("synthetic"))
+    parser.add_argument("--dsn", default=os.environ.get('DATABASE_URL'), help="Postgres connection string")
+    args = parser.parse_args()
+
+    config = load_config(args.config, {
+        "seed": args.seed,
+        "leads": args.leads,
+        "login_history": args.login_history,
+        "gallery": args.gallery,
+        "days": args.days,
+        "time_skew": args.time_skew,
+        "status_mix": _parse_mix(args.status_mix),
+        "end": args.end,
+    })
+    generator = Generator(config)
+    started = datetime.now(timezone.utc)
+
+    if args.target == "files":
+        write_files(generator, args.out, args.format, args.gzip)
+    elif args.target == "postgres":
+        if not args.dsn:
+            raise SystemExit("❌ --dsn (or DATABASE_URL) is required for the postgres target")
+        write_postgres(generator, args.dsn)
+    else:
+        print(write_backend(generator, args.target))
+
+    print(f"🎉 Done in {(datetime.now(timezone.utc) - started).total_seconds():.2f}s")
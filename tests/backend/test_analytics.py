@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import analytics
+import repository
+
+NOW = datetime(2024, 3, 13, 12, 0, tzinfo=timezone.utc)
+
+
+def lead(number: int, updated_at: datetime, status: str = "New", created_at: datetime = NOW):
+    return {
+        "id": f"lead-{number}", "name": f"Lead {number}", "phone": "+910000000000",
+        "service_interested": "Solar Equipment", "project_type": "Residential", "status": status,
+        "created_at": created_at.isoformat(), "updated_at": updated_at.isoformat(),
+    }
+
+
+def test_incremental_refresh_merges_by_id_and_rereads_the_overlap(tmp_path):
+    db = repository.SqliteRepository(str(tmp_path / "leads.db"))
+    for number in range(3):
+        db.insert('leads', lead(number, NOW + timedelta(minutes=number)))
+    snapshot = analytics.LeadSnapshot(lambda: db, min_refresh_interval=0)
+
+    async def run():
+        await snapshot.refresh()
+        # An edit, and a late row stamped before the high-water mark
+        db.update('leads', [('id', 'eq', 'lead-0')], {"status": "Closed", "updated_at": (NOW + timedelta(minutes=5)).isoformat()})
+        db.insert('leads', lead(3, NOW + timedelta(minutes=1, seconds=30)))
+        await snapshot.refresh()
+        snapshot.discard('lead-1')
+        return snapshot.frame()
+
+    frame = asyncio.run(run()).set_index("id")
+    db.close()
+    assert sorted(frame.index) == ["lead-0", "lead-2", "lead-3"]
+    assert frame.loc["lead-0", "status"] == "Closed"
+
+
+def test_late_rows_outside_the_overlap_wait_for_the_full_reload(tmp_path):
+    db = repository.SqliteRepository(str(tmp_path / "leads.db"))
+    db.insert('leads', lead(0, NOW))
+    snapshot = analytics.LeadSnapshot(lambda: db, min_refresh_interval=0, overlap=timedelta(minutes=1))
+
+    async def run():
+        await snapshot.refresh()
+        db.insert('leads', lead(1, NOW - timedelta(minutes=10)))
+        await snapshot.refresh()
+        incremental = len(snapshot.frame())
+        await snapshot.refresh(force=True)
+        return incremental, len(snapshot.frame())
+
+    assert asyncio.run(run()) == (1, 2)
+    db.close()
+
+
+def test_a_lead_edited_mid_scan_does_not_hide_the_others(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics, "PAGE_SIZE", 2)
+    db = repository.SqliteRepository(str(tmp_path / "leads.db"))
+    for number in range(4):
+        db.insert('leads', lead(number, NOW + timedelta(minutes=number)))
+    select = db.select
+    pages = []
+
+    def edit_after_first_page(*args, **kwargs):
+        rows = select(*args, **kwargs)
+        pages.append(rows)
+        if len(pages) == 1:
+            # Moves from the first page to the end of the scan
+            db.update('leads', [('id', 'eq', 'lead-0')], {"updated_at": (NOW + timedelta(hours=1)).isoformat()})
+        return rows
+
+    monkeypatch.setattr(db, "select", edit_after_first_page)
+    rows = analytics.LeadSnapshot(lambda: db)._fetch_since(None)
+    db.close()
+    assert sorted({row["id"] for row in rows}) == ["lead-0", "lead-1", "lead-2", "lead-3"]
+
+
+def test_summarize_buckets_and_funnel():
+    monday = datetime(2024, 3, 11, 9, 0, tzinfo=timezone.utc)
+    rows = [
+        lead(0, monday, "New", created_at=monday),
+        lead(1, monday, "In Progress", created_at=monday + timedelta(days=1)),
+        lead(2, monday, "Closed", created_at=monday + timedelta(days=7)),
+        lead(3, monday, "Closed", created_at=monday + timedelta(days=8)),
+    ]
+    report = analytics.summarize(analytics._to_frame(rows), bucket="week")
+
+    assert report["total_leads"] == 4
+    assert [(entry["period"].date().isoformat(), entry["count"]) for entry in report["time_series"]] == [
+        ("2024-03-11", 2), ("2024-03-18", 2),
+    ]
+    funnel = {entry["status"]: entry for entry in report["status_funnel"]}
+    assert (funnel["New"]["reached"], funnel["In Progress"]["reached"], funnel["Closed"]["reached"]) == (4, 3, 2)
+    assert funnel["Closed"]["conversion"] == round(2 / 3, 4)
+    assert report["service_project_breakdown"] == [
+        {"service_interested": "Solar Equipment", "project_type": "Residential", "count": 4},
+    ]
+
+    daily = analytics.summarize(analytics._to_frame(rows), bucket="day", start=monday + timedelta(days=7))
+    assert daily["total_leads"] == 2
+    assert [entry["count"] for entry in daily["time_series"]] == [1, 1]
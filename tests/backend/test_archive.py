@@ -0,0 +1,67 @@
+import shutil
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import archive
+import repository
+import storage
+from tests.fake_supabase import FakeSupabase
+
+OLD = datetime.now(timezone.utc) - timedelta(days=400)
+
+
+def lead(number: int, status: str = "New", updated_at: datetime = OLD):
+    return {
+        "id": f"lead-{number}", "name": f"Lead {number}", "phone": "+910000000000", "email": None,
+        "service_interested": "Solar Equipment", "project_type": "Residential", "message": None,
+        "status": status, "created_at": OLD.isoformat(), "updated_at": updated_at.isoformat(),
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = repository.SqliteRepository(str(tmp_path / "hot.db"))
+    for number in range(5):
+        database.insert('leads', lead(number))
+    yield database
+    database.close()
+
+
+def test_archived_files_reach_the_bucket_before_rows_are_deleted(db, tmp_path):
+    fake = FakeSupabase()
+    store = storage.BlockingStorage(storage.SupabaseStorage(lambda: fake, "private"))
+
+    moved = archive.archive_all(db, 180, archive_dir=tmp_path / "cache", store=store)
+
+    assert moved == {"leads": 5, "login_history": 0}
+    assert db.count('leads') == 0
+    assert [info.path.split("/")[:2] for info in store.list("archive")] == [["archive", "leads"]]
+    # A fresh instance (empty local cache) reads them back from the bucket
+    shutil.rmtree(tmp_path / "cache")
+    rows = archive.read_rows('leads', archive_dir=tmp_path / "fresh", store=store)
+    assert sorted(row["id"] for row in rows) == [f"lead-{number}" for number in range(5)]
+
+
+def test_refuses_to_archive_to_an_ephemeral_disk(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "PERSISTENT_DISK", False)
+    with pytest.raises(storage.NotDurable):
+        archive.archive_all(db, 180, archive_dir=tmp_path / "cache")
+    assert db.count('leads') == 5
+
+    monkeypatch.setattr(storage, "PERSISTENT_DISK", True)
+    assert archive.archive_all(db, 180, archive_dir=tmp_path / "cache")["leads"] == 5
+
+
+def test_rows_archived_twice_keep_the_newest_version(tmp_path):
+    # A retried batch: the same ids written again after a later edit
+    archive.write_partitioned('leads', [lead(0), lead(1)], tmp_path)
+    archive.write_partitioned('leads', [lead(0, "Closed", OLD + timedelta(days=1))], tmp_path)
+    archive.write_partitioned('leads', [lead(1)], tmp_path)
+
+    rows = archive.read_rows('leads', archive_dir=tmp_path)
+    assert sorted((row["id"], row["status"]) for row in rows) == [("lead-0", "Closed"), ("lead-1", "New")]
+
+    frame = archive.read_frame('leads', ["id", "status"], archive_dir=tmp_path)
+    assert list(frame.columns) == ["id", "status"]
+    assert sorted(frame.itertuples(index=False, name=None)) == [("lead-0", "Closed"), ("lead-1", "New")]
@@ -0,0 +1,114 @@
+import shutil
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import backup
+import repository
+import storage
+from tests.fake_supabase import FakeSupabase
+
+NOW = datetime.now(timezone.utc)
+
+
+def lead(number: int, updated_at: datetime):
+    return {
+        "id": f"lead-{number}", "name": f"Lead {number}", "phone": "+910000000000",
+        "service_interested": "Solar Equipment", "project_type": "Residential",
+        "created_at": updated_at.isoformat(), "updated_at": updated_at.isoformat(),
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = repository.SqliteRepository(str(tmp_path / "source.db"))
+    for number in range(3):
+        database.insert('leads', lead(number, NOW - timedelta(hours=1) + timedelta(minutes=20 * number)))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def store():
+    fake = FakeSupabase()
+    return storage.BlockingStorage(storage.SupabaseStorage(lambda: fake, "private"))
+
+
+def test_backup_restores_from_the_bucket_on_a_fresh_disk(db, store, tmp_path):
+    manifest = backup.run_backup(db, backup_dir=tmp_path / "backups", store=store)
+    assert manifest["status"] == "completed"
+
+    # Redeployed: the local working copy is gone
+    shutil.rmtree(tmp_path / "backups")
+    assert [m["backup_id"] for m in backup.list_backups(tmp_path / "backups", store)] == [manifest["backup_id"]]
+    target = repository.SqliteRepository(str(tmp_path / "target.db"))
+    # The restored admin replaces the fresh database's default one
+    target.delete('admin_users', [('username', 'eq', 'admin')])
+    restored = backup.run_restore(target, manifest["backup_id"], backup_dir=tmp_path / "backups", store=store)
+    assert restored["leads"] == 3
+    assert sorted(row["id"] for row in target.select('leads')) == ["lead-0", "lead-1", "lead-2"]
+    target.close()
+
+
+def test_incremental_backup_rereads_the_overlap_window(db, store, tmp_path):
+    full = backup.run_backup(db, backup_dir=tmp_path, store=store)
+    # Committed after the full backup, stamped before its high-water mark
+    db.insert('leads', lead(3, NOW - timedelta(minutes=25)))
+    incremental = backup.run_backup(db, backup_dir=tmp_path, store=store)
+
+    assert incremental["kind"] == "incremental"
+    assert incremental["base_backup_id"] == full["backup_id"]
+    leads = incremental["tables"]["leads"]
+    assert leads["rows"] == 2  # the late row, and the newest one re-read
+    assert leads["high_water"] == full["tables"]["leads"]["high_water"]
+    # Tables with nothing in the window keep their mark
+    assert incremental["tables"]["gallery"]["high_water"] == full["tables"]["gallery"]["high_water"]
+
+
+def test_refuses_to_back_up_to_an_ephemeral_disk(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "PERSISTENT_DISK", False)
+    with pytest.raises(storage.NotDurable):
+        backup.run_backup(db, backup_dir=tmp_path)
+
+
+def test_job_lock_and_progress_are_shared_through_the_disk(tmp_path):
+    lock = backup.lock_jobs(tmp_path)
+    assert lock is not None
+    # Another worker opens the lock file itself and can't take it
+    assert backup.lock_jobs(tmp_path) is None
+
+    job_id = "6f1c0d0e-8a59-4d53-9c8f-3f3f4ad1b7a1"
+    progress = backup.JobStatus(job_id, tmp_path, job="backup", status="running", rows=0)
+    progress["rows"] += 10
+    progress.save()
+    assert backup.load_job(job_id, tmp_path)["rows"] == 10
+    assert backup.load_job(job_id, tmp_path)["status"] == "running"
+
+    # The worker died mid-job: the kernel dropped its lock
+    backup.unlock_jobs(lock)
+    assert backup.load_job(job_id, tmp_path)["status"] == "failed"
+    assert backup.load_job("../../etc/passwd", tmp_path) is None
+    backup.unlock_jobs(backup.lock_jobs(tmp_path))
+
+
+class UuidKeyed(repository.SqliteRepository):
+    """Rejects non-UUID ids the way Postgres does for a uuid column (22P02)"""
+
+    def select(self, table, where=(), order=(), limit=None, offset=0, columns=None, after=None):
+        ids = [value for column, _, value in where if column == "id"] + ([after[1]] if after else [])
+        for value in ids:
+            for item in value if isinstance(value, list) else [value]:
+                uuid.UUID(str(item))
+        return super().select(table, where, order, limit, offset, columns, after)
+
+
+def test_incremental_backup_pages_with_uuid_ids(store, tmp_path):
+    database = UuidKeyed(str(tmp_path / "uuid.db"))
+    for number in range(3):
+        database.insert('leads', {**lead(number, NOW - timedelta(minutes=5 * number)), "id": str(uuid.uuid4())})
+    backup.run_backup(database, backup_dir=tmp_path, store=store)
+    incremental = backup.run_backup(database, backup_dir=tmp_path, store=store)
+    assert incremental["status"] == "completed"
+    assert incremental["tables"]["leads"]["rows"] == 3
+    database.close()
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import multiprocessing
+import os
+
+import pytest
+
+import journal
+
+
+def records(count, start=0):
+    return [{"id": str(i), "name": f"lead {i}"} for i in range(start, start + count)]
+
+
+def write_segment(path, lines, tail=b""):
+    path.write_bytes(b"".join(json.dumps(line).encode() + b"\n" for line in lines) + tail)
+
+
+async def started(log):
+    """A started journal whose background drainer is stopped, so the test drives the drain"""
+    await log.start()
+    log._drainer.cancel()
+    try:
+        await log._drainer
+    except asyncio.CancelledError:
+        pass
+    log._drainer = None
+    return log
+
+
+def test_concurrent_appends_share_one_fsync(tmp_path, monkeypatch):
+    applied = []
+
+    async def apply(batch):
+        applied.extend(batch)
+
+    log = journal.Journal(tmp_path, apply)
+    writes = []
+    write = log._write
+    monkeypatch.setattr(log, "_write", lambda segment, data: (writes.append(data.count(b"\n")), write(segment, data)))
+
+    async def run():
+        await started(log)
+        # Every append returns only once its record is on disk
+        await asyncio.gather(*(log.append(record) for record in records(20)))
+        on_disk = log._active.path.read_bytes().count(b"\n")
+        await log.stop()
+        return on_disk
+
+    assert asyncio.run(run()) == 20
+    # Group commit: one write and fsync acknowledged all twenty
+    assert writes == [20]
+    assert [record["id"] for record in applied] == [str(i) for i in range(20)]
+    assert not list(tmp_path.glob("*.log"))
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    write_segment(tmp_path / "1-dead-000001.log", records(2), tail=b'{"id": "2", "na')
+    applied = []
+
+    async def apply(batch):
+        applied.extend(batch)
+
+    async def run():
+        log = await started(journal.Journal(tmp_path, apply))
+        await log._drain_all()
+        await log.stop()
+
+    asyncio.run(run())
+    assert [record["id"] for record in applied] == ["0", "1"]
+    assert not (tmp_path / "1-dead-000001.log").exists()
+
+
+def test_drain_resumes_from_the_saved_offset(tmp_path):
+    segment = tmp_path / "1-dead-000001.log"
+    write_segment(segment, records(3))
+    first_line = len(segment.read_bytes().split(b"\n")[0]) + 1
+    (tmp_path / "1-dead-000001.offset").write_text(str(first_line))
+    applied = []
+
+    async def apply(batch):
+        applied.extend(batch)
+
+    async def run():
+        log = await started(journal.Journal(tmp_path, apply))
+        assert log.pending == 2
+        await log._drain_all()
+        await log.stop()
+
+    asyncio.run(run())
+    assert [record["id"] for record in applied] == ["1", "2"]
+
+
+def _crashing_worker(directory):
+    async def reject(batch):
+        raise ConnectionError("database down")
+
+    async def run():
+        log = await started(journal.Journal(directory, reject))
+        for record in records(3):
+            await log.append(record)
+        # Killed without stop(): the segment is left behind, unlocked by the kernel
+        os._exit(0)
+
+    asyncio.run(run())
+
+
+def test_segments_of_a_dead_worker_are_taken_over(tmp_path):
+    worker = multiprocessing.get_context("fork").Process(target=_crashing_worker, args=(tmp_path,))
+    worker.start()
+    worker.join(10)
+    assert worker.exitcode == 0
+    assert len(list(tmp_path.glob("*.log"))) == 1
+    applied = []
+
+    async def apply(batch):
+        applied.extend(batch)
+
+    async def run():
+        log = await started(journal.Journal(tmp_path, apply))
+        await log._drain_all()
+        await log.stop()
+
+    asyncio.run(run())
+    assert [record["id"] for record in applied] == ["0", "1", "2"]
+    assert not list(tmp_path.glob("*.log"))
+
+
+def test_batch_applied_but_not_marked_is_reapplied(tmp_path, monkeypatch):
+    table = {}
+    deliveries = []
+
+    async def apply(batch):
+        deliveries.append([record["id"] for record in batch])
+        # Idempotent, like insert_journaled_leads: rows already there are skipped
+        for record in batch:
+            table.setdefault(record["id"], record)
+
+    save_offset = journal.Segment.save_offset
+    crashed = []
+
+    def crash_once(segment, offset):
+        if not crashed:
+            crashed.append(offset)
+            raise OSError("disk full")
+        save_offset(segment, offset)
+
+    monkeypatch.setattr(journal.Segment, "save_offset", crash_once)
+
+    async def run():
+        log = await started(journal.Journal(tmp_path, apply))
+        for record in records(3):
+            await log.append(record)
+        with pytest.raises(OSError):
+            await log._drain_all()
+        await log._drain_all()
+        await log.stop()
+
+    asyncio.run(run())
+    assert deliveries == [["0", "1", "2"], ["0", "1", "2"]]
+    assert sorted(table) == ["0", "1", "2"]
+
+
+def test_rejected_record_is_dead_lettered(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "MAX_ATTEMPTS", 2)
+    applied = []
+
+    async def apply(batch):
+        if any(record["id"] == "1" for record in batch):
+            raise ValueError("invalid input syntax for type uuid")
+        applied.extend(batch)
+
+    async def run():
+        log = await started(journal.Journal(tmp_path, apply))
+        for record in records(3):
+            await log.append(record)
+        with pytest.raises(ValueError):
+            await log._drain_all()
+        await log._drain_all()
+        pending = log.pending
+        await log.stop()
+        return pending
+
+    assert asyncio.run(run()) == 0
+    assert [record["id"] for record in applied] == ["0", "2"]
+    (entry,) = [json.loads(line) for line in (tmp_path / journal.DEAD_LETTER_FILE).read_text().splitlines()]
+    assert entry["record"]["id"] == "1"
+    assert "ValueError" in entry["error"]
+    assert not list(tmp_path.glob("*.log"))
+
+
+def test_outages_are_retried_not_dead_lettered(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "MAX_ATTEMPTS", 1)
+
+    async def apply(batch):
+        raise TimeoutError()
+
+    async def run():
+        log = await started(journal.Journal(tmp_path, apply))
+        await log.append(records(1)[0])
+        for _ in range(3):
+            with pytest.raises(TimeoutError):
+                await log._drain_all()
+        pending = log.pending
+        await log.stop(timeout=0.1)
+        return pending
+
+    assert asyncio.run(run()) == 1
+    assert not (tmp_path / journal.DEAD_LETTER_FILE).exists()
+
+
+def test_stop_is_not_lost_to_a_wake_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "ORPHAN_SCAN_SECONDS", 2.0)
+
+    async def apply(batch):
+        pass
+
+    async def run():
+        log = journal.Journal(tmp_path, apply)
+        await log.start()
+        await asyncio.sleep(0)
+        # The wake-up is through to wait_for but the drainer hasn't run yet when stop() cancels it
+        log._wake.set()
+        await asyncio.sleep(0)
+        # asyncio.wait, unlike wait_for, gives up on time whatever the drainer does
+        stopping = asyncio.ensure_future(log.stop())
+        done, _ = await asyncio.wait({stopping}, timeout=1)
+        return bool(done)
+
+    assert asyncio.run(run())
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+import limits
+import repository
+
+
+def test_limit_grows_while_latency_holds_and_shrinks_when_it_rises():
+    limiter = limits.AdaptiveLimiter("test", initial=10, max_limit=64)
+    # Growth only counts while the limit is what holds calls back
+    limiter.in_flight = 64
+    for _ in range(50):
+        limiter._adjust(0.01, failed=False)
+    grown = limiter.limit
+    assert grown > 20
+
+    for _ in range(20):
+        limiter._adjust(0.2, failed=False)
+    assert limiter.limit < grown / 2
+
+    before = limiter.limit
+    limiter._adjust(0.01, failed=True)
+    assert limiter.limit == pytest.approx(before * limits.BACKOFF)
+
+
+def test_limit_does_not_grow_when_underused():
+    limiter = limits.AdaptiveLimiter("test", initial=10)
+    for _ in range(50):
+        limiter._adjust(0.01, failed=False)
+    assert limiter.limit == 10
+
+
+def test_queued_call_times_out_and_full_queue_is_rejected():
+    limiter = limits.AdaptiveLimiter("test", initial=1, queue_timeout=0.05, max_queue=1)
+
+    async def run():
+        release = await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        # The one queue place is taken
+        with pytest.raises(limits.Overloaded):
+            await limiter.acquire()
+        started = time.monotonic()
+        with pytest.raises(limits.Overloaded) as error:
+            await waiter
+        assert time.monotonic() - started >= 0.04
+        assert error.value.retry_after >= 1
+        release()
+        return limiter.in_flight, len(limiter._waiters)
+
+    assert asyncio.run(run()) == (0, 0)
+
+
+def test_released_slot_is_handed_to_the_queue():
+    limiter = limits.AdaptiveLimiter("test", initial=1, queue_timeout=1.0)
+
+    async def run():
+        release = await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        release()
+        second = await waiter
+        assert limiter.in_flight == 1
+        second()
+        return limiter.in_flight
+
+    assert asyncio.run(run()) == 0
+
+
+class Slow:
+    name = "slow"
+
+    def ping(self):
+        time.sleep(0.2)
+
+
+def test_timed_out_call_keeps_its_slot_until_the_thread_finishes():
+    limiter = limits.AdaptiveLimiter("test", initial=1)
+    db = repository.AsyncRepository(Slow(), limiter=limiter, timeout=0.02)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await db.ping()
+        held = limiter.in_flight
+        await asyncio.sleep(0.4)
+        return held, limiter.in_flight
+
+    assert asyncio.run(run()) == (1, 0)
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+import migrate_data
+import repository
+
+
+class FailingTarget:
+    """Target whose third batch fails while others are still writing"""
+
+    def __init__(self):
+        self.started = []
+        self.in_flight = 0
+        self.in_flight_at_close = None
+
+    async def select(self, table, where=(), **options):
+        return []
+
+    async def upsert(self, table, rows):
+        batch = int(rows[0]["id"]) // 10
+        self.started.append(batch)
+        self.in_flight += 1
+        try:
+            if batch == 2:
+                raise RuntimeError("rejected")
+            await asyncio.sleep(0.05)
+        finally:
+            self.in_flight -= 1
+
+    def close(self):
+        self.in_flight_at_close = self.in_flight
+
+
+def test_a_failed_batch_stops_the_table_before_the_target_closes():
+    target = FailingTarget()
+    migrator = migrate_data.Migrator(target, batch_size=10, concurrency=4)
+    leads = [{"id": str(number), "name": "Lead", "phone": "+910000000000"} for number in range(200)]
+
+    async def run():
+        try:
+            await migrator.migrate_table("leads", leads)
+        finally:
+            target.close()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    # Nothing was scheduled past the batches already running, and all of them had stopped
+    assert max(target.started) < 2 + 4
+    assert target.in_flight_at_close == 0
+
+
+def migrate(target, tables, **options):
+    migrator = migrate_data.Migrator(target, **options)
+    asyncio.run(migrator.migrate(tables))
+    return migrator.stats
+
+
+def test_seeding_sqlite_twice_changes_nothing(tmp_path):
+    target = repository.AsyncRepository(repository.SqliteRepository(str(tmp_path / "x.db")))
+    first = migrate(target, migrate_data.seed_tables())
+    assert first["services"]["insert"] == len(migrate_data.SERVICES_DATA)
+
+    again = migrate(target, migrate_data.seed_tables())
+    assert all(counts["insert"] == counts["update"] == 0 for counts in again.values())
+    assert again["services"]["unchanged"] == len(migrate_data.SERVICES_DATA)
+    migrate_data.close_target(target)
+
+
+def test_repeated_natural_key_in_a_batch_is_written_once(tmp_path):
+    target = repository.AsyncRepository(repository.SqliteRepository(str(tmp_path / "x.db")))
+    photo = {"url": "https://example.com/a.jpg", "alt_text": "Site", "category": "Civil"}
+    gallery = [{**photo, "caption": "First"}, {**photo, "caption": "Second"}]
+    stats = migrate(target, {"gallery": gallery})
+    assert stats["gallery"] == {"insert": 1, "update": 0, "unchanged": 0, "skipped": 1}
+    (row,) = target.sync.select("gallery")
+    assert row["caption"] == "Second"
+    migrate_data.close_target(target)
@@ -0,0 +1,48 @@
+import asyncio
+
+import prerender
+
+
+def test_deploy_hook_is_debounced_and_flushed_on_stop():
+    hook = prerender.DeployHook("http://deploy.invalid/hook", delay=0.05)
+    posts = []
+    hook._post = lambda: posts.append(1)
+
+    async def run():
+        for _ in range(5):
+            hook.trigger()
+        await asyncio.sleep(0.2)
+        fired = len(posts)
+        # Pending when the worker stops: fired then instead of dropped
+        hook.delay = 60
+        hook.trigger()
+        await hook.stop()
+        return fired
+
+    assert asyncio.run(run()) == 1
+    assert len(posts) == 2
+
+
+def service(service_id, title):
+    return {"id": service_id, "title": title, "overview": "Overview", "short_intro": "Intro", "images": [],
+            "sub_services": [], "benefits": [], "cta_text": "Call us", "is_active": True}
+
+
+def test_service_pages_use_the_app_routes():
+    data = {
+        "services": [service("civil-construction-001", "Civil Construction"),
+                     service("3f0c9e4e-1f8a-4d63-9c1e-204815162342", "Added in the admin")],
+        "gallery": [],
+        "settings": {"general": {"site_name": "SYNERGY INDIA"}, "cta": {}},
+    }
+    pages = prerender.render_pages(data)
+    # The app's /services/:slug looks the number up in its bundled services
+    assert sorted(pages) == ["/", "/gallery", "/services", "/services/1"]
+    _, _, listing = pages["/services"]
+    assert 'href="/services/1"' in listing
+    assert "Added in the admin" in listing
+
+    template = '<html><head><title>App</title></head><body><div id="root"></div></body></html>'
+    html = prerender.inject(template, *pages["/services/1"])
+    assert "<title>Civil Construction - SYNERGY INDIA</title>" in html
+    assert "__PRERENDER_DATA__" not in html
@@ -0,0 +1,48 @@
+import pytest
+
+import limits
+import repository
+from tests.fake_supabase import FakeSupabase
+
+
+def test_exhausted_sqlite_pool_is_overloaded(tmp_path):
+    db = repository.SqliteRepository(str(tmp_path / "x.db"), pool_size=1, busy_timeout=0.05)
+    with db._connection():
+        with pytest.raises(limits.Overloaded):
+            db.count("admin_users")
+    # The connection went back to the pool
+    assert db.count("admin_users") == 1
+    db.close()
+
+
+def test_supabase_count_fetches_no_rows():
+    client = FakeSupabase({"leads": [{"id": str(i), "status": "New"} for i in range(3)]})
+    db = repository.SupabaseRepository(client)
+    assert db.count("leads") == 3
+    assert db.count("leads", [("id", "in", ["0", "2"])]) == 2
+
+
+class MissingFunction(Exception):
+    """Shaped like postgrest's APIError for a function that isn't in the schema cache"""
+
+    code = "PGRST202"
+
+
+def test_array_edits_fall_back_without_the_functions(monkeypatch):
+    service = {"id": "s1", "images": ["a"], "updated_at": "2026-01-01T00:00:00+00:00"}
+    client = FakeSupabase({"services": [service]})
+    calls = []
+
+    def missing(fn, params=None):
+        calls.append(fn)
+        raise MissingFunction(fn)
+
+    monkeypatch.setattr(client, "rpc", missing)
+    db = repository.SupabaseRepository(client)
+    assert db.array_append("services", "s1", "images", "b", max_length=2)["images"] == ["a", "b"]
+    assert db.array_append("services", "s1", "images", "c", max_length=2) is None
+    assert db.array_remove("services", "s1", "images", "a")["images"] == ["b"]
+    assert db.array_remove("services", "s1", "images", "a") is None
+    assert db.array_append("services", "nope", "images", "c") is None
+    # Each missing function is asked for once
+    assert calls == ["services_images_append", "services_images_remove"]
@@ -0,0 +1,96 @@
+import asyncio
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+import resilience
+
+
+async def call(breaker, error=None):
+    async with breaker.guard():
+        if error is not None:
+            raise error
+
+
+def test_opens_after_consecutive_failures_and_recovers_through_half_open(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = resilience.CircuitBreaker("db", failure_threshold=3, reset_timeout=30)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(TimeoutError):
+                await call(breaker, TimeoutError())
+        assert breaker.state == resilience.OPEN
+        with pytest.raises(resilience.CircuitOpen) as error:
+            await call(breaker)
+        assert error.value.retry_after == 30
+
+        # After the reset timeout one trial goes through; its failure reopens
+        now[0] += 30
+        with pytest.raises(ConnectionError):
+            await call(breaker, ConnectionError())
+        assert breaker.state == resilience.OPEN
+
+        now[0] += 30
+        async with breaker.guard():
+            assert breaker.state == resilience.HALF_OPEN
+            # Only the one trial while half-open
+            with pytest.raises(resilience.CircuitOpen):
+                await call(breaker)
+        assert breaker.state == resilience.CLOSED
+        assert breaker.failures == 0
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("error", [
+    # invalid input syntax for type uuid
+    APIError({"code": "22P02", "message": "invalid input syntax for type uuid"}),
+    APIError({"code": "23505", "message": "duplicate key value"}),
+    APIError({"code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned"}),
+    APIError({"code": 404, "message": "JSON could not be generated"}),
+    ValueError("Unsupported filter"),
+])
+def test_client_errors_pass_through_uncounted(error):
+    breaker = resilience.CircuitBreaker("db", failure_threshold=1)
+
+    async def run():
+        with pytest.raises(type(error)):
+            await call(breaker, error)
+
+    asyncio.run(run())
+    assert breaker.state == resilience.CLOSED
+    assert breaker.failures == 0
+
+
+@pytest.mark.parametrize("error", [
+    APIError({"code": "57014", "message": "canceling statement due to statement timeout"}),
+    APIError({"code": "PGRST001", "message": "Database client error"}),
+    APIError({"code": 503, "message": "JSON could not be generated"}),
+    httpx.ConnectError("connection refused"),
+    httpx.HTTPStatusError("bad gateway", request=httpx.Request("GET", "http://db"),
+                          response=httpx.Response(502)),
+])
+def test_outages_count(error):
+    assert resilience.is_outage(error)
+
+
+def test_client_error_in_half_open_leaves_it_half_open(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = resilience.CircuitBreaker("db", failure_threshold=1, reset_timeout=30)
+
+    async def run():
+        with pytest.raises(OSError):
+            await call(breaker, OSError())
+        now[0] += 30
+        with pytest.raises(APIError):
+            await call(breaker, APIError({"code": "22P02"}))
+        assert breaker.state == resilience.HALF_OPEN
+        # The next call is the trial
+        await call(breaker)
+        assert breaker.state == resilience.CLOSED
+
+    asyncio.run(run())
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+import static_files
+
+
+def test_files_are_hashed_off_the_event_loop(tmp_path):
+    (tmp_path / "photo.jpg").write_bytes(b"x" * 100_000)
+    files = static_files.CachedStaticFiles(directory=tmp_path)
+    hashed_on = []
+    etag = files.etag
+
+    def recording_etag(full_path, stat_result):
+        hashed_on.append(threading.current_thread())
+        return etag(full_path, stat_result)
+
+    files.etag = recording_etag
+    app = Starlette(routes=[Mount("/photos", files)])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.get("/photos/photo.jpg")
+            again = await client.get("/photos/photo.jpg", headers={"If-None-Match": first.headers["etag"]})
+            return first, again, threading.current_thread()
+
+    first, again, loop_thread = asyncio.run(run())
+    assert first.status_code == 200
+    assert again.status_code == 304
+    # Looked up (and hashed) in a worker thread; the response only reads the cache
+    assert hashed_on[0] is not loop_thread
+    assert len(files._etags) == 1
+
+
+def test_warm_hashes_every_file(tmp_path):
+    (tmp_path / "js").mkdir()
+    (tmp_path / "js" / "main.abc123.js").write_text("console.log(1)")
+    (tmp_path / "css.css").write_text("body{}")
+    files = static_files.CachedStaticFiles(directory=tmp_path, check_dir=False)
+    files.warm()
+    assert len(files._etags) == 2
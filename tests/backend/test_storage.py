@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+import storage
+from tests.fake_supabase import FakeBucket, FakeSupabase
+
+
+def test_supabase_stat_lists_instead_of_downloading():
+    fake = FakeSupabase()
+    bucket = storage.SupabaseStorage(lambda: fake, "uploads")
+
+    async def run():
+        await bucket.put("gallery/photo.jpg", b"x" * 1234)
+        await bucket.put("gallery/photo.jpg.bak", b"x")
+        fake.calls = 0
+        info = await bucket.stat("gallery/photo.jpg")
+        return info, fake.calls
+
+    info, calls = asyncio.run(run())
+    assert (info.path, info.size, calls) == ("gallery/photo.jpg", 1234, 1)
+    with pytest.raises(storage.ObjectNotFound):
+        asyncio.run(bucket.stat("gallery/missing.jpg"))
+
+
+def test_only_missing_objects_become_object_not_found(monkeypatch):
+    fake = FakeSupabase()
+    bucket = storage.SupabaseStorage(lambda: fake, "uploads")
+    with pytest.raises(storage.ObjectNotFound):
+        asyncio.run(bucket.read("gallery/missing.jpg"))
+
+    def unreachable(self, path, options=None):
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(FakeBucket, "download", unreachable)
+    with pytest.raises(ConnectionError):
+        asyncio.run(bucket.read("gallery/photo.jpg"))
+
+
+def test_local_range_reads(tmp_path):
+    local = storage.LocalStorage(tmp_path)
+    content = bytes(range(256)) * 2048
+
+    async def run():
+        await local.put("gallery/photo.jpg", content)
+        return await local.read("gallery/photo.jpg", 1000, 300_000), await local.read("gallery/photo.jpg")
+
+    part, whole = asyncio.run(run())
+    assert part == content[1000:300_001]
+    assert whole == content
+    with pytest.raises(storage.ObjectNotFound):
+        asyncio.run(local.read("gallery/missing.jpg"))
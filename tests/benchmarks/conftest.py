@@ -0,0 +1,99 @@
+"""
+Fixtures for the handler micro-benchmarks
+
+    pytest tests/benchmarks --benchmark-enable --benchmark-autosave
+    pytest tests/benchmarks --benchmark-enable --benchmark-compare --benchmark-compare-fail=mean:15%
+
+A plain ``pytest tests`` skips them (the 20k-lead export alone takes
+seconds); --benchmark-enable or --benchmark-only runs them.
+
+Runs are stored under .benchmarks/ at the repo root (pytest-benchmark's
+default); the second command compares against the latest saved run and
+fails when any benchmark's mean regressed by more than the threshold.
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from tests.fake_supabase import FakeSupabase
+from tests.load.harness import BACKEND_DIR, load_app, seed_tables
+
+# Image counts for the gallery catalog benchmark: the shipped photos/ folder and a
+# well-stocked portfolio
+GALLERY_SIZES = [9, 250]
+# Lead counts for the CSV export benchmark
+LEAD_COUNTS = [1_000, 20_000]
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("benchmark_enable") or config.getoption("benchmark_only"):
+        return
+    skip = pytest.mark.skip(reason="benchmark: run with --benchmark-enable or --benchmark-only")
+    here = Path(__file__).parent
+    for item in items:
+        if here in item.path.parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    fake = FakeSupabase(seed_tables(leads=0, login_history=0))
+    cwd = os.getcwd()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        load_app(fake, tmp_path_factory.mktemp("server"), monkeypatch=monkeypatch)
+        # Back in the original directory; the benchmarks that read files chdir themselves
+        os.chdir(cwd)
+
+        import server as server_module
+        yield server_module
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Drive a coroutine to completion on a dedicated loop"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture
+def admin_user(server):
+    user = {
+        "id": str(uuid.uuid4()),
+        "username": "admin",
+        "hashed_password": hashlib.sha256(b"admin123").hexdigest(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "last_login": None
+    }
+    server.supabase.tables["admin_users"] = [user]
+    return server.AdminUser(**user)
+
+
+@pytest.fixture
+def photos_dir(tmp_path, monkeypatch, request):
+    """A photos/ folder with ``request.param`` images next to a backend/ cwd"""
+    photos = tmp_path / "photos"
+    photos.mkdir()
+    shipped = sorted(p.name for p in (BACKEND_DIR.parent / "photos").iterdir())
+    for i in range(request.param):
+        name = shipped[i] if i < len(shipped) else f"project-{i:04d}.jpg"
+        (photos / name).write_bytes(b"\xff\xd8\xff")
+    (tmp_path / "backend").mkdir()
+    monkeypatch.chdir(tmp_path / "backend")
+    return photos
+
+
+@pytest.fixture
+def leads_table(server, tmp_path, monkeypatch, request):
+    """``request.param`` synthetic leads in the fake hot table, empty archive"""
+    leads = seed_tables(leads=request.param, login_history=0)["leads"]
+    monkeypatch.setitem(server.supabase.tables, "leads", leads)
+    import archive
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path / "archive")
+    return leads
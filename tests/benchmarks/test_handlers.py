@@ -0,0 +1,48 @@
+"""
+Micro-benchmarks for the pure-Python work in hot handlers
+
+Supabase is the in-memory fake with no simulated latency, so the numbers
+are model construction, serialisation and crypto cost only.
+"""
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+
+from tests.benchmarks.conftest import GALLERY_SIZES, LEAD_COUNTS
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_build_service_catalog(benchmark, server):
+    services = benchmark(server.build_service_catalog)
+    assert len(services) == 8
+
+
+def test_get_services(benchmark, server, run):
+    services = benchmark(lambda: run(server.get_services()))
+    assert len(services) == 8
+
+
+@pytest.mark.parametrize("photos_dir", GALLERY_SIZES, indirect=True)
+def test_build_gallery_images(benchmark, server, photos_dir):
+    images = benchmark(server.build_gallery_images)
+    assert len(images) == len(list(photos_dir.iterdir()))
+
+
+@pytest.mark.parametrize("leads_table", LEAD_COUNTS, indirect=True)
+def test_export_leads_csv(benchmark, server, run, admin_user, leads_table):
+    export = benchmark(lambda: run(server.export_leads_csv(current_user=admin_user)))
+    assert export["content"].count("\n") == len(leads_table) + 1
+
+
+def test_create_access_token(benchmark, server):
+    token = benchmark(server.create_access_token, {"sub": "admin"})
+    assert token.count(".") == 2
+
+
+def test_get_current_user(benchmark, server, run, admin_user):
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=server.create_access_token({"sub": "admin"})
+    )
+    user = benchmark(lambda: run(server.get_current_user(credentials)))
+    assert user.username == "admin"
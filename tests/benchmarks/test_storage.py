@@ -0,0 +1,53 @@
+"""
+Side-by-side benchmarks for the upload storage backends
+
+Local disk and Supabase (the in-memory fake, optionally with simulated
+latency via STORAGE_BENCH_LATENCY_MS) always run; S3 runs when S3_BUCKET
+points at a reachable bucket.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+PAYLOAD = os.urandom(900 * 1024)  # just under the 1MB upload limit
+BACKENDS = ["local", "supabase"] + (["s3"] if os.environ.get("S3_BUCKET") else [])
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, tmp_path, server):
+    import storage
+    from tests.fake_supabase import FakeSupabase
+
+    if request.param == "local":
+        return storage.LocalStorage(tmp_path / "uploads")
+    if request.param == "supabase":
+        fake = FakeSupabase(latency_ms=float(os.environ.get("STORAGE_BENCH_LATENCY_MS", 0)))
+        return storage.SupabaseStorage(lambda: fake, "bench")
+    return storage.S3Storage(
+        os.environ["S3_BUCKET"],
+        endpoint_url=os.environ.get("S3_ENDPOINT_URL"),
+        region=os.environ.get("S3_REGION"),
+    )
+
+
+def test_put(benchmark, backend, run):
+    path = backend.new_path("bench", "photo.jpg")
+    size = benchmark(lambda: run(backend.put(path, PAYLOAD, "image/jpeg")))
+    assert size == len(PAYLOAD)
+
+
+def test_get_full(benchmark, backend, run):
+    path = backend.new_path("bench", "photo.jpg")
+    run(backend.put(path, PAYLOAD, "image/jpeg"))
+    content = benchmark(lambda: run(backend.read(path)))
+    assert content == PAYLOAD
+
+
+def test_get_range(benchmark, backend, run):
+    path = backend.new_path("bench", "photo.jpg")
+    run(backend.put(path, PAYLOAD, "image/jpeg"))
+    content = benchmark(lambda: run(backend.read(path, 512 * 1024, 512 * 1024 + 65535)))
+    assert content == PAYLOAD[512 * 1024:512 * 1024 + 65536]
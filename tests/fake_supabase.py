@@ -0,0 +1,364 @@
+"""
+In-memory stand-in for the supabase-py client
+
+Implements the slice of the PostgREST query builder, RPC functions and
+storage API that the backend uses, backed by plain lists of dicts. An optional per-call latency
+emulates the network round trip to a hosted Supabase project; like the real
+sync client it blocks the calling thread.
+"""
+
+import copy
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+
+class APIResponse:
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _coerce(value: str, sample: Any):
+    """Turn a PostgREST filter literal into the stored value's type"""
+    value = value.strip('"')
+    if isinstance(sample, bool):
+        return value.lower() == "true"
+    if isinstance(sample, int):
+        return int(value)
+    if isinstance(sample, float):
+        return float(value)
+    if value == "null":
+        return None
+    return value
+
+
+def _compare(op: str, current: Any, expected: Any) -> bool:
+    if op == "is":
+        return current is expected or (expected is None and current is None)
+    if current is None:
+        return op == "neq" and expected is not None
+    if op == "eq":
+        return current == expected or str(current) == str(expected)
+    if op == "neq":
+        return not (current == expected or str(current) == str(expected))
+    if op == "in":
+        return current in expected or str(current) in {str(v) for v in expected}
+    if op == "gt":
+        return current > expected
+    if op == "gte":
+        return current >= expected
+    if op == "lt":
+        return current < expected
+    if op == "lte":
+        return current <= expected
+    raise ValueError(f"Unsupported operator {op}")
+
+
+def _split_top_level(expression: str) -> List[str]:
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in expression:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == "," and depth == 0 and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    parts.append(current)
+    return parts
+
+
+def _parse_logic(expression: str, combine=any):
+    """Compile a PostgREST or=(...)/and(...) tree into a row predicate"""
+    predicates = []
+    for part in _split_top_level(expression):
+        match = re.fullmatch(r"(and|or)\((.*)\)", part)
+        if match:
+            predicates.append(_parse_logic(match.group(2), all if match.group(1) == "and" else any))
+            continue
+        column, op, literal = part.split(".", 2)
+
+        def predicate(row, column=column, op=op, literal=literal):
+            current = row.get(column)
+            return _compare(op, current, _coerce(literal, current))
+        predicates.append(predicate)
+    return lambda row: combine(predicate(row) for predicate in predicates)
+
+
+class QueryBuilder:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self._client = client
+        self._table = table
+        self._filters = []
+        self._orders = []
+        self._limit = None
+        self._offset = 0
+        self._action = "select"
+        self._payload = None
+        self._count = None
+        self._head = None
+        self._columns = None
+
+    # Actions
+    def select(self, columns: str = "*", count: Optional[str] = None, head: Optional[bool] = None):
+        self._columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        self._count = count
+        self._head = head
+        return self
+
+    def insert(self, payload, **kwargs):
+        self._action, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "id", **kwargs):
+        self._action, self._payload = "upsert", payload
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, payload, **kwargs):
+        self._action, self._payload = "update", payload
+        return self
+
+    def delete(self, **kwargs):
+        self._action = "delete"
+        return self
+
+    # Filters
+    def _add(self, column, op, value):
+        self._filters.append(lambda row: _compare(op, row.get(column), value))
+        return self
+
+    def eq(self, column, value):
+        return self._add(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._add(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._add(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._add(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._add(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._add(column, "lte", value)
+
+    def in_(self, column, values):
+        return self._add(column, "in", list(values))
+
+    def is_(self, column, value):
+        return self._add(column, "is", None if value in (None, "null") else value)
+
+    def or_(self, expression: str):
+        self._filters.append(_parse_logic(expression))
+        return self
+
+    # Modifiers
+    def order(self, column, desc: bool = False, **kwargs):
+        self._orders.append((column, desc))
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def execute(self) -> APIResponse:
+        self._client._simulate_latency()
+        with self._client._lock:
+            rows = self._client.tables.setdefault(self._table, [])
+            return getattr(self, f"_execute_{self._action}")(rows)
+
+    def _matching(self, rows):
+        return [row for row in rows if all(f(row) for f in self._filters)]
+
+    def _execute_select(self, rows):
+        matched = self._matching(rows)
+        for column, desc in reversed(self._orders):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        total = len(matched)
+        end = None if self._limit is None else self._offset + self._limit
+        matched = matched[self._offset:end]
+        if self._columns:
+            matched = [{c: row.get(c) for c in self._columns} for row in matched]
+        if self._head:
+            matched = []
+        return APIResponse(copy.deepcopy(matched), total if self._count else None)
+
+    def _payload_rows(self):
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        return [dict(row) for row in payload]
+
+    def _execute_insert(self, rows):
+        inserted = []
+        for row in self._payload_rows():
+            row.setdefault("id", str(uuid.uuid4()))
+            rows.append(row)
+            inserted.append(row)
+        return APIResponse(copy.deepcopy(inserted))
+
+    def _execute_upsert(self, rows):
+        key = self._on_conflict
+        index = {row.get(key): row for row in rows}
+        written = []
+        for row in self._payload_rows():
+            row.setdefault("id", str(uuid.uuid4()))
+            if row.get(key) in index:
+                index[row[key]].update(row)
+                written.append(index[row[key]])
+            else:
+                rows.append(row)
+                index[row.get(key)] = row
+                written.append(row)
+        return APIResponse(copy.deepcopy(written))
+
+    def _execute_update(self, rows):
+        matched = self._matching(rows)
+        for row in matched:
+            row.update(copy.deepcopy(self._payload))
+        return APIResponse(copy.deepcopy(matched))
+
+    def _execute_delete(self, rows):
+        matched = self._matching(rows)
+        self._client.tables[self._table] = [row for row in rows if row not in matched]
+        return APIResponse(copy.deepcopy(matched))
+
+
+class FakeRpc:
+    """The SQL functions from backend/migrations that the backend calls"""
+
+    def __init__(self, client: "FakeSupabase", fn: str, params: Dict[str, Any]):
+        self._client = client
+        self._fn = fn
+        self._params = params
+
+    def execute(self) -> APIResponse:
+        self._client._simulate_latency()
+        table, _, rest = self._fn.partition("_")
+        column, _, action = rest.rpartition("_")
+        params = self._params
+        with self._client._lock:
+            rows = [row for row in self._client.tables.get(table, []) if str(row.get("id")) == str(params["row_id"])]
+            if not rows:
+                return APIResponse([])
+            row = rows[0]
+            values = row.setdefault(column, [])
+            if action == "append":
+                if params.get("max_length") is not None and len(values) >= params["max_length"]:
+                    return APIResponse([])
+                values.append(params["value"])
+            elif action == "remove":
+                if params["value"] not in values:
+                    return APIResponse([])
+                row[column] = [value for value in values if value != params["value"]]
+            else:
+                raise ValueError(f"Unknown function {self._fn}")
+            row["updated_at"] = datetime.now(timezone.utc).isoformat()
+            return APIResponse([copy.deepcopy(row)])
+
+
+class FakeStorageError(Exception):
+    """Shaped like storage3's StorageException: one dict argument"""
+
+
+class FakeBucket:
+    def __init__(self, client: "FakeSupabase", bucket: str):
+        self._client = client
+        self._bucket = bucket
+
+    def upload(self, path: str, file, file_options=None):
+        self._client._simulate_latency()
+        self._client.objects[f"{self._bucket}/{path}"] = bytes(file)
+        return {"path": path}
+
+    def get_public_url(self, path: str, options=None) -> str:
+        return f"https://fake.supabase.local/storage/v1/object/public/{self._bucket}/{path}"
+
+    def download(self, path: str, options=None) -> bytes:
+        self._client._simulate_latency()
+        try:
+            return self._client.objects[f"{self._bucket}/{path}"]
+        except KeyError:
+            raise FakeStorageError({"statusCode": "404", "error": "not_found", "message": "Object not found"})
+
+    def list(self, path: Optional[str] = None, options=None) -> List[Dict[str, Any]]:
+        """One folder's entries, like the Storage API: sub-folders come back without an id"""
+        self._client._simulate_latency()
+        options = options or {}
+        prefix = f"{self._bucket}/" + (f"{path.strip('/')}/" if path and path.strip('/') else "")
+        files, folders = {}, set()
+        for key, content in self._client.objects.items():
+            if key.startswith(prefix):
+                name, _, rest = key[len(prefix):].partition("/")
+                if rest:
+                    folders.add(name)
+                else:
+                    files[name] = content
+        search = options.get("search", "")
+        entries = [{"name": name, "id": None, "metadata": None} for name in folders] + [
+            {"name": name, "id": str(uuid.uuid5(uuid.NAMESPACE_URL, prefix + name)),
+             "updated_at": datetime.now(timezone.utc).isoformat(),
+             "metadata": {"size": len(content), "mimetype": "application/octet-stream"}}
+            for name, content in files.items()
+        ]
+        entries = sorted((entry for entry in entries if search in entry["name"]), key=lambda entry: entry["name"])
+        offset = options.get("offset", 0)
+        return entries[offset:offset + options.get("limit", 100)]
+
+    def remove(self, paths: List[str]):
+        self._client._simulate_latency()
+        for path in paths:
+            self._client.objects.pop(f"{self._bucket}/{path}", None)
+        return [{"name": path} for path in paths]
+
+
+class FakeStorage:
+    def __init__(self, client: "FakeSupabase"):
+        self._client = client
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self._client, bucket)
+
+    def list_buckets(self):
+        return []
+
+    def get_bucket(self, bucket: str):
+        self._client._simulate_latency()
+        return {"id": bucket, "name": bucket, "public": True}
+
+
+class FakeSupabase:
+    """Drop-in for ``supabase.Client`` backed by in-memory tables"""
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None, latency_ms: float = 0.0):
+        self.tables: Dict[str, List[Dict[str, Any]]] = copy.deepcopy(tables) if tables else {}
+        self.objects: Dict[str, bytes] = {}
+        self.latency = latency_ms / 1000.0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.storage = FakeStorage(self)
+
+    def _simulate_latency(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def table(self, name: str) -> QueryBuilder:
+        return QueryBuilder(self, name)
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> FakeRpc:
+        return FakeRpc(self, fn, params or {})
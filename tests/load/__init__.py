@@ -0,0 +1,15 @@
+"""
+Async load-test harness for the SYNERGY INDIA API
+
+Replays weighted user scenarios (public browsing, contact form submits and
+admin dashboard sessions) against the app in-process, with Supabase replaced
+by an in-memory fake (or the tables in a temporary SQLite database), or
+against a running server. Reports RPS, latency
+percentiles and error rates per endpoint and saves them as JSON so runs can
+be compared for regressions.
+
+    python -m tests.load --duration 30 --concurrency 50 --out results.json
+    python -m tests.load --backend sqlite --duration 30
+    python -m tests.load --base-url http://localhost:8000 --duration 60
+    python -m tests.load --compare baseline.json --out results.json
+"""
@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from tests.load.harness import compare_reports, print_report, run_load_test, save_report
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m tests.load", description="Load-test the SYNERGY INDIA API")
+    parser.add_argument("--base-url", help="test a running server (default: in-process app with fake Supabase)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["fake", "sqlite"], default="fake",
+                        help="in-process only: keep the tables in the fake Supabase or a temporary SQLite file")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0,
+                        help="in-process only: simulated round trip per Supabase call")
+    parser.add_argument("--leads", type=int, default=2000, help="in-process only: synthetic leads to seed")
+    parser.add_argument("--out", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed regression ratio (default 10%%)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(
+        base_url=args.base_url,
+        duration=args.duration,
+        concurrency=args.concurrency,
+        seed=args.seed,
+        db_latency_ms=args.db_latency_ms,
+        leads=args.leads,
+        backend=args.backend,
+    ))
+    print_report(report)
+
+    if args.out:
+        save_report(report, args.out.resolve() if not args.out.is_absolute() else args.out)
+        print(f"\n💾 Report saved to {args.out}")
+
+    if args.compare:
+        regressions = compare_reports(json.loads(args.compare.read_text()), report, args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against", args.compare)
+            for regression in regressions:
+                print("   •", regression)
+            sys.exit(1)
+        print("\n✅ No regressions against", args.compare)
+
+
+if __name__ == "__main__":
+    main()
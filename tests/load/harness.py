@@ -0,0 +1,316 @@
+"""
+Runner, in-process app wiring and reporting for the load-test harness
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+import pytest
+
+from tests.fake_supabase import FakeSupabase
+from tests.load.scenarios import ADMIN_PASSWORD, ADMIN_USERNAME, SCENARIOS
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+
+
+# ============================================================================
+# IN-PROCESS APP
+# ============================================================================
+
+def seed_tables(leads: int = 2000, login_history: int = 500, seed: int = 42) -> Dict[str, List[Dict[str, Any]]]:
+    """Fake database contents: default settings, the admin user and synthetic rows"""
+    sys.path.insert(0, str(BACKEND_DIR))
+    import migrate_data
+    import synthetic_data
+
+    now = datetime.now(timezone.utc).isoformat()
+    tables = {}
+    for table, rows in migrate_data.seed_tables().items():
+        tables[table] = [
+            {"id": row.get("id") or str(uuid.uuid4()), "created_at": now, "updated_at": now, **row}
+            for row in rows
+        ]
+    tables["admin_users"] = [{
+        "id": str(uuid.uuid4()),
+        "username": ADMIN_USERNAME,
+        "hashed_password": hashlib.sha256(ADMIN_PASSWORD.encode()).hexdigest(),
+        "created_at": now,
+        "last_login": None
+    }]
+
+    generator = synthetic_data.Generator(synthetic_data.GeneratorConfig(
+        seed=seed, leads=leads, login_history=login_history, gallery=0
+    ))
+    for table in ("leads", "login_history"):
+        tables[table] = tables.get(table, []) + [row for chunk in getattr(generator, table)() for row in chunk]
+    return tables
+
+
+def seed_sqlite(path: Path, tables: Dict[str, List[Dict[str, Any]]]):
+    """Replace the contents of the SQLite database at ``path`` with ``tables``"""
+    sys.path.insert(0, str(BACKEND_DIR))
+    import repository
+
+    database = repository.SqliteRepository(path)
+    for table, rows in tables.items():
+        # Drops the default rows the schema seeds, too
+        database.delete(table, [])
+        # seed_tables() stamps created_at on every table, the settings ones have none
+        known = database.columns[table]
+        database.upsert(table, [{column: value for column, value in row.items() if column in known} for row in rows])
+    database.close()
+
+
+def load_app(fake: FakeSupabase, state_dir: Path, sqlite_path: Optional[Path] = None,
+             monkeypatch: Optional[pytest.MonkeyPatch] = None):
+    """Import the FastAPI app with Supabase swapped for ``fake``.
+
+    With ``sqlite_path`` the tables are read from that SQLite database instead
+    (DATA_BACKEND=sqlite) and ``fake`` only serves storage.
+
+    What the server writes as it runs (the settings cache, the lead journal,
+    the prerendered pages) goes under ``state_dir``, never into backend/. The
+    server resolves its static directories relative to backend/, so the
+    working directory is switched there. With a test's ``monkeypatch`` the
+    environment, working directory and paths are restored afterwards; without
+    one (the CLI) they stay switched for the rest of the process.
+    """
+    patch = monkeypatch or pytest.MonkeyPatch()
+    for name, value in (("SUPABASE_URL", "http://fake.supabase.local"), ("SUPABASE_ANON_KEY", "fake-anon-key"),
+                        ("SUPABASE_STORAGE_BUCKET", "loadtest")):
+        if name not in os.environ:
+            patch.setenv(name, value)
+    patch.setenv("DATA_BACKEND", "sqlite" if sqlite_path else "supabase")
+    if sqlite_path:
+        patch.setenv("SQLITE_PATH", str(sqlite_path))
+    state = {name: Path(state_dir) / name.lower() for name in ("SETTINGS_CACHE_DIR", "LEAD_JOURNAL_DIR", "PRERENDER_DIR")}
+    for name, path in state.items():
+        patch.setenv(name, str(path))
+    patch.syspath_prepend(str(BACKEND_DIR))
+    patch.chdir(BACKEND_DIR)
+
+    import server
+
+    # Read from the environment when server was first imported, maybe by an earlier test
+    for cache in server.public_settings.values():
+        patch.setattr(cache, "path", state["SETTINGS_CACHE_DIR"] / f"{cache.name}.json")
+    patch.setattr(server.public_pages, "output_dir", state["PRERENDER_DIR"])
+    if server.lead_journal is not None:
+        patch.setattr(server.lead_journal, "directory", state["LEAD_JOURNAL_DIR"])
+    patch.setattr(server, "DATA_BACKEND", os.environ["DATA_BACKEND"])
+    patch.setattr(server, "supabase", server.instrumentation.InstrumentedClient(fake))
+    patch.setattr(server, "db", None)
+    server.init_clients()
+    # One INFO line per request drowns the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    return server.app
+
+
+# ============================================================================
+# RECORDING
+# ============================================================================
+
+class Recorder:
+    """Per-endpoint latency samples and error counts"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    def record(self, name: str, seconds: float, status: Optional[int]):
+        self.samples.setdefault(name, []).append(seconds)
+        statuses = self.statuses.setdefault(name, {})
+        key = str(status) if status is not None else "exception"
+        statuses[key] = statuses.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        for name, samples in sorted(self.samples.items()):
+            latencies = np.array(samples) * 1000
+            errors = self.errors.get(name, 0)
+            endpoints[name] = {
+                "requests": len(samples),
+                "rps": round(len(samples) / elapsed, 2),
+                "error_rate": round(errors / len(samples), 4),
+                "mean_ms": round(float(latencies.mean()), 3),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+                "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+                "max_ms": round(float(latencies.max()), 3),
+                "statuses": self.statuses[name],
+            }
+
+        all_latencies = np.array([s for samples in self.samples.values() for s in samples] or [0.0]) * 1000
+        total = sum(len(samples) for samples in self.samples.values())
+        return {
+            "totals": {
+                "requests": total,
+                "rps": round(total / elapsed, 2),
+                "error_rate": round(sum(self.errors.values()) / total, 4) if total else 0.0,
+                "p50_ms": round(float(np.percentile(all_latencies, 50)), 3),
+                "p95_ms": round(float(np.percentile(all_latencies, 95)), 3),
+                "p99_ms": round(float(np.percentile(all_latencies, 99)), 3),
+            },
+            "endpoints": endpoints,
+        }
+
+
+class Session:
+    """One virtual user's view of the HTTP client"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+
+    async def request(self, method: str, path: str, name: Optional[str] = None, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            pass
+        self.recorder.record(f"{method} {name or path}", time.perf_counter() - started,
+                             response.status_code if response is not None else None)
+        return response
+
+    async def get(self, path, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request("POST", path, **kwargs)
+
+    async def put(self, path, **kwargs):
+        return await self.request("PUT", path, **kwargs)
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+async def run_scenarios(client: httpx.AsyncClient, duration: float, concurrency: int,
+                        seed: int = 0, scenarios: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run ``concurrency`` closed-loop virtual users for ``duration`` seconds"""
+    scenarios = scenarios or SCENARIOS
+    names = list(scenarios)
+    weights = [scenarios[name][1] for name in names]
+    recorder = Recorder()
+    visits: Dict[str, int] = {name: 0 for name in names}
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+
+    async def virtual_user(number: int):
+        rng = random.Random(seed * 100003 + number)
+        session = Session(client, recorder, rng)
+        while loop.time() < deadline:
+            name = rng.choices(names, weights)[0]
+            visits[name] += 1
+            await scenarios[name][0](session)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    report = recorder.report(elapsed)
+    report["visits"] = visits
+    report["elapsed_s"] = round(elapsed, 3)
+    return report
+
+
+async def run_load_test(base_url: Optional[str] = None, duration: float = 30.0, concurrency: int = 20,
+                        seed: int = 0, db_latency_ms: float = 0.0, leads: int = 2000,
+                        scenarios: Optional[Dict[str, Any]] = None, backend: str = "fake",
+                        monkeypatch: Optional[pytest.MonkeyPatch] = None) -> Dict[str, Any]:
+    """Load-test a running server at ``base_url``, or the app in-process when it is None.
+
+    In-process the tables live in the fake Supabase (``backend="fake"``) or
+    in a temporary SQLite database (``backend="sqlite"``), and the server's
+    own files in a temporary directory (see load_app).
+    """
+    meta = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "mode": "http" if base_url else "in-process",
+        "base_url": base_url,
+        "duration_s": duration,
+        "concurrency": concurrency,
+        "seed": seed,
+        "db_latency_ms": None if base_url or backend != "fake" else db_latency_ms,
+        "backend": None if base_url else backend,
+        "python": platform.python_version(),
+    }
+
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            report = await run_scenarios(client, duration, concurrency, seed, scenarios)
+    else:
+        tables = seed_tables(leads=leads, seed=seed)
+        with tempfile.TemporaryDirectory(prefix="synergy-load-") as workdir:
+            sqlite_path = None
+            if backend == "sqlite":
+                sqlite_path = Path(workdir) / "load.db"
+                seed_sqlite(sqlite_path, tables)
+                fake = FakeSupabase({})
+            else:
+                fake = FakeSupabase(tables, latency_ms=db_latency_ms)
+            app = load_app(fake, Path(workdir), sqlite_path, monkeypatch)
+            transport = httpx.ASGITransport(app=app)
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30) as client:
+                    report = await run_scenarios(client, duration, concurrency, seed, scenarios)
+        if backend == "fake":
+            meta["db_calls"] = fake.calls
+
+    return {"meta": meta, **report}
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{'endpoint':<42}{'reqs':>8}{'rps':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, stats in report["endpoints"].items():
+        print(f"{name:<42}{stats['requests']:>8}{stats['rps']:>9.1f}{stats['error_rate'] * 100:>7.2f}"
+              f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}")
+    totals = report["totals"]
+    print(f"{'TOTAL':<42}{totals['requests']:>8}{totals['rps']:>9.1f}{totals['error_rate'] * 100:>7.2f}"
+          f"{totals['p50_ms']:>9.2f}{totals['p95_ms']:>9.2f}{totals['p99_ms']:>9.2f}")
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.10) -> List[str]:
+    """Endpoints whose p95 latency or error rate regressed beyond ``tolerance``"""
+    regressions = []
+    for name, stats in current["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            continue
+        if before["p95_ms"] and stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f}ms -> {stats['p95_ms']:.2f}ms")
+        if stats["error_rate"] > before["error_rate"] + 0.001:
+            regressions.append(f"{name}: error rate {before['error_rate']:.2%} -> {stats['error_rate']:.2%}")
+    if current["totals"]["rps"] < baseline["totals"]["rps"] * (1 - tolerance):
+        regressions.append(f"total: rps {baseline['totals']['rps']:.1f} -> {current['totals']['rps']:.1f}")
+    return regressions
+
+
+def save_report(report: Dict[str, Any], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,68 @@
+"""
+Weighted user scenarios for the load-test harness
+
+Each scenario is one visit: a short sequence of requests a real user of the
+site or admin panel would make. Endpoint names are route templates so
+per-endpoint stats are not split by ids.
+"""
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin123"
+
+
+async def public_browse(session):
+    """Visitor browsing the home, services and gallery pages"""
+    await session.get("/api/settings/general")
+    await session.get("/api/settings/cta")
+    services = await session.get("/api/services")
+    if services is not None and services.status_code == 200 and services.json():
+        service = session.rng.choice(services.json())
+        await session.get(f"/api/services/{service['id']}", name="/api/services/{service_id}")
+    await session.get("/api/gallery")
+
+
+async def form_submit(session):
+    """Visitor filling in the contact form"""
+    settings = await session.get("/api/settings/contact-form")
+    options = settings.json() if settings is not None and settings.status_code == 200 else {}
+    service_options = options.get("service_options") or ["Civil & Interior Work"]
+    project_types = options.get("project_type_options") or ["Residential"]
+    await session.post("/api/leads", json={
+        "name": "Load Test Visitor",
+        "phone": f"+91-9{session.rng.randrange(10**9):09d}",
+        "email": "loadtest@example.com",
+        "service_interested": session.rng.choice(service_options),
+        "project_type": session.rng.choice(project_types),
+        "message": "Submitted by the load-test harness"
+    })
+
+
+async def admin_session(session):
+    """Admin logging in and working through the dashboard"""
+    login = await session.post("/api/auth/login", json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    if login is None or login.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    await session.get("/api/auth/me", headers=headers)
+    await session.get("/api/dashboard/stats", headers=headers)
+    leads = await session.get("/api/leads", headers=headers)
+    await session.get("/api/analytics/leads", headers=headers)
+    await session.get("/api/security/login-history", headers=headers)
+
+    if leads is not None and leads.status_code == 200 and leads.json():
+        lead = session.rng.choice(leads.json())
+        await session.put(
+            f"/api/leads/{lead['id']}",
+            name="/api/leads/{lead_id}",
+            headers=headers,
+            json={"status": session.rng.choice(["New", "In Progress", "Closed"])}
+        )
+
+
+# Relative frequency of each visit type
+SCENARIOS = {
+    "public_browse": (public_browse, 80),
+    "form_submit": (form_submit, 15),
+    "admin_session": (admin_session, 5),
+}
@@ -0,0 +1,30 @@
+import asyncio
+
+import httpx
+
+from tests.fake_supabase import FakeSupabase
+from tests.load.harness import load_app, seed_sqlite, seed_tables
+
+
+def test_retried_lead_without_the_journal_is_stored_once(monkeypatch, tmp_path):
+    sqlite_path = tmp_path / "leads.db"
+    seed_sqlite(sqlite_path, seed_tables(leads=0, login_history=0))
+    app = load_app(FakeSupabase({}), tmp_path, sqlite_path, monkeypatch=monkeypatch)
+    import server
+
+    monkeypatch.setattr(server, "lead_journal", None)
+    lead = {"name": "Asha", "phone": "+919800000000", "service_interested": "Solar", "project_type": "Residential"}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            headers = {"Idempotency-Key": "form-submit-1"}
+            before = await server.db.count('leads')
+            first = await client.post("/api/leads", json=lead, headers=headers)
+            retry = await client.post("/api/leads", json=lead, headers=headers)
+            return first, retry, await server.db.count('leads') - before
+
+    first, retry, added = asyncio.run(run())
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert added == 1
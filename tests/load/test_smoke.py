@@ -0,0 +1,12 @@
+import asyncio
+
+from tests.load.harness import compare_reports, run_load_test
+
+
+def test_load_harness_smoke(monkeypatch):
+    report = asyncio.run(run_load_test(duration=1.0, concurrency=4, leads=200, monkeypatch=monkeypatch))
+
+    assert report["totals"]["requests"] > 0
+    assert report["totals"]["error_rate"] == 0.0
+    assert "GET /api/services" in report["endpoints"]
+    assert compare_reports(report, report) == []